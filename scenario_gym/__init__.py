@@ -12,6 +12,7 @@ from scenario_gym.scenario_gym import ScenarioGym
 from scenario_gym.sensor import Sensor
 from scenario_gym.state import State
 from scenario_gym.trajectory import Trajectory
+from scenario_gym.vector import VectorScenarioGym
 
 __all__ = [
     # api objects
@@ -30,6 +31,7 @@ __all__ = [
     "Sensor",
     "State",
     "Trajectory",
+    "VectorScenarioGym",
     # modules
     "action",
     "agent",
@@ -40,12 +42,16 @@ __all__ = [
     "manager",
     "metrics",
     "observation",
+    "precision",
+    "profiling",
     "recorder",
+    "results",
     "road_network",
     "scenario",
     "sensor",
     "state",
     "trajectory",
+    "vector",
     "viewer",
     "xosc_interface",
 ]
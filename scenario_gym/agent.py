@@ -8,6 +8,7 @@ from scenario_gym.controller import (
 )
 from scenario_gym.entity import Entity
 from scenario_gym.observation import Observation
+from scenario_gym.profiling import span
 from scenario_gym.scenario import Scenario
 from scenario_gym.sensor import EgoLocalizationSensor, Sensor
 from scenario_gym.state import State
@@ -51,10 +52,14 @@ class Agent:
 
     def step(self, state: State) -> ArrayLike:
         """Select an action from the current observation."""
-        obs = self.sensor.step(state)
-        action = self._step(obs)
+        entity = self.entity.ref
+        with span("sensor", self.sensor, entity=entity):
+            obs = self.sensor.step(state)
+        with span("policy", self, entity=entity):
+            action = self._step(obs)
         self.last_action = action
-        return self.controller.step(state, action)
+        with span("controller", self.controller, entity=entity):
+            return self.controller.step(state, action)
 
     def _reset(self) -> None:
         """Reset the agent state at the start of the scenario."""
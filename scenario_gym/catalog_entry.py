@@ -1,12 +1,14 @@
 from abc import ABC, abstractclassmethod
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
 
 from lxml.etree import Element
-from scenariogeneration import xosc
 
 from scenario_gym.utils import ArgsKwargs, load_properties_from_xml
 
+if TYPE_CHECKING:
+    from scenariogeneration import xosc
+
 
 @dataclass(frozen=True)
 class Catalog:
@@ -75,7 +77,7 @@ class CatalogObject(ABC):
         """
         raise NotImplementedError
 
-    def to_xosc(self) -> xosc.VersionBase:
+    def to_xosc(self) -> "xosc.VersionBase":
         """Write the object to an xosc object."""
         raise NotImplementedError
 
@@ -126,8 +128,10 @@ class BoundingBox(CatalogObject):
             "center_y": self.center_y,
         }
 
-    def to_xosc(self) -> xosc.BoundingBox:
+    def to_xosc(self) -> "xosc.BoundingBox":
         """Write the bounding box to an xosc bounding box."""
+        from scenariogeneration import xosc
+
         return xosc.BoundingBox(
             self.width,
             self.length,
@@ -227,8 +231,10 @@ class CatalogEntry(CatalogObject):
             "files": self.files,
         }
 
-    def to_xosc(self) -> xosc.VersionBase:
+    def to_xosc(self) -> "xosc.VersionBase":
         """Create an xosc entity object from the catalog entry."""
+        from scenariogeneration import xosc
+
         obj = xosc.MiscObject(
             self.catalog_entry,
             1.0,
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Optional, Union
+from typing import List, Optional, Sequence, Union
 
 import numpy as np
 
@@ -31,6 +31,22 @@ class Controller(ABC):
         """Return the agent's next pose from the action."""
         return self._step(state, action)
 
+    @classmethod
+    def step_many(
+        cls,
+        controllers: Sequence["Controller"],
+        states: Sequence[State],
+        actions: Sequence[Action],
+    ) -> List[ArrayLike]:
+        """
+        Return the next poses of many controllers of this class at once.
+
+        Each controller is stepped with the state and action at the same index
+        e.g. the controllers of the ego in different scenarios. By default the
+        controllers are stepped in turn but subclasses may vectorise the step.
+        """
+        return [c.step(s, a) for c, s, a in zip(controllers, states, actions)]
+
     @abstractmethod
     def _reset(self, state: State) -> None:
         """Reset the controller parameters."""
@@ -53,6 +69,16 @@ class ReplayTrajectoryController(Controller):
         """Return the agent's next pose from the action."""
         return action.pose
 
+    @classmethod
+    def step_many(
+        cls,
+        controllers: Sequence[Controller],
+        states: Sequence[State],
+        actions: Sequence[TeleportAction],
+    ) -> List[ArrayLike]:
+        """Return the poses of the actions."""
+        return [action.pose for action in actions]
+
 
 class VehicleController(Controller):
     """
@@ -139,6 +165,73 @@ class VehicleController(Controller):
 
         return pose
 
+    @classmethod
+    def step_many(
+        cls,
+        controllers: Sequence[Controller],
+        states: Sequence[State],
+        actions: Sequence[Union[VehicleAction, np.ndarray]],
+    ) -> List[ArrayLike]:
+        """Return the next poses of many vehicles by vectorising the model."""
+        accel, steer = np.array(
+            [
+                (a.acceleration, a.steering) if isinstance(a, VehicleAction) else a
+                for a in actions
+            ],
+            dtype=float,
+        ).T
+        return list(cls._integrate(controllers, states, accel, steer))
+
+    @staticmethod
+    def _integrate(
+        controllers: Sequence["VehicleController"],
+        states: Sequence[State],
+        accel: np.ndarray,
+        steer: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Apply the vehicle model of `_step` to arrays of actions.
+
+        Updates the speed of each controller and returns the new poses with
+        shape (num_controllers, 6).
+        """
+        params = np.array(
+            [
+                (
+                    c.max_accel,
+                    c.max_steer,
+                    c.speed,
+                    c.l,
+                    np.inf if c.max_speed is None else c.max_speed,
+                    -np.inf if c.allow_reverse else 0.0,
+                )
+                for c in controllers
+            ],
+            dtype=float,
+        ).reshape(-1, 6)
+        max_accel, max_steer, speed, l, max_speed, min_speed = params.T
+        accel = np.clip(accel, -max_accel, max_accel)
+        steer = np.clip(steer, -max_steer, max_steer)
+
+        poses = np.array(
+            [s.poses[c.entity] for c, s in zip(controllers, states)]
+        ).reshape(-1, 6)
+        dt = np.array([s.next_t - s.t for s in states], dtype=float)
+        h = poses[:, 3]
+
+        dx = speed * np.cos(h)
+        dy = speed * np.sin(h)
+        dh = speed * np.tan(steer) / l
+
+        poses[:, 0] += dx * dt
+        poses[:, 1] += dy * dt
+        poses[:, 3] += dh * dt
+
+        speed = np.minimum(max_speed, np.maximum(min_speed, speed + accel * dt))
+        for c, v in zip(controllers, speed):
+            c.speed = v
+        return poses
+
 
 class PIDController(VehicleController):
     """
@@ -256,3 +349,77 @@ class PIDController(VehicleController):
         self.e_lon_prev = e_lon
         self.e_lon_int = e_lon_I
         return super(self.__class__, self)._step(state, VehicleAction(accel, steer))
+
+    @classmethod
+    def step_many(
+        cls,
+        controllers: Sequence[Controller],
+        states: Sequence[State],
+        actions: Sequence[TeleportAction],
+    ) -> List[ArrayLike]:
+        """Return the next poses of many controllers by vectorising `_step`."""
+        n = len(controllers)
+        targets = np.array([(a.x, a.y) for a in actions], dtype=float)
+        params = np.array(
+            [
+                (
+                    c.speed,
+                    c.e_lat_prev,
+                    c.e_lon_prev,
+                    c.e_lon_int,
+                    c.steer_Kp,
+                    c.steer_Kd,
+                    c.accel_Kp,
+                    c.accel_Kd,
+                    c.accel_Ki,
+                )
+                for c in controllers
+            ],
+            dtype=float,
+        ).reshape(n, 9)
+        (
+            speed,
+            e_lat_prev,
+            e_lon_prev,
+            e_lon_int,
+            steer_Kp,
+            steer_Kd,
+            accel_Kp,
+            accel_Kd,
+            accel_Ki,
+        ) = params.T
+        poses = np.array(
+            [s.poses[c.entity][[0, 1, 3]] for c, s in zip(controllers, states)],
+            dtype=float,
+        ).reshape(n, 3)
+        dt = np.array([s.dt for s in states], dtype=float)
+
+        # errors in the local frame of each vehicle
+        e = targets - poses[:, :2]
+        c, s = np.cos(poses[:, 2]), np.sin(poses[:, 2])
+        e_lon = c * e[:, 0] + s * e[:, 1]
+        e_lat = -s * e[:, 0] + c * e[:, 1]
+
+        # steering
+        gain_adj = np.where(
+            speed > 15,
+            0.1,
+            np.where(speed > 5.0, 1.0 - 0.9 * (speed - 5.0) / 10.0, 1.0),
+        )
+        e_lat_D = (e_lat - e_lat_prev) / dt
+        steer = steer_Kp * gain_adj * e_lat + steer_Kd * gain_adj * e_lat_D
+
+        # acceleration
+        e_lon_D = (e_lon - e_lon_prev) / dt
+        e_lon_I = e_lon_int + e_lon * dt
+        accel = np.where(
+            np.abs(e_lon) > 0.1,
+            accel_Kp * e_lon + accel_Kd * e_lon_D + accel_Ki * e_lon_I,
+            0.0,
+        )
+
+        for k, ctrl in enumerate(controllers):
+            ctrl.e_lat_prev = e_lat[k]
+            ctrl.e_lon_prev = e_lon[k]
+            ctrl.e_lon_int = e_lon_I[k]
+        return list(cls._integrate(controllers, states, accel, steer))
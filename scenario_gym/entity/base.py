@@ -165,11 +165,20 @@ class Entity:
         }
 
     @classmethod
-    def from_dict(cls, data: Dict[str, Any]):
-        """Create the entity from the json dictionary."""
+    def from_dict(
+        cls, data: Dict[str, Any], trajectory: Optional[Trajectory] = None
+    ):
+        """
+        Create the entity from the json dictionary.
+
+        The trajectory may be passed if it has already been created from the
+        data e.g. with `Trajectory.from_many`.
+        """
+        if trajectory is None:
+            trajectory = Trajectory(np.array(data["trajectory"]))
         return cls(
             cls._catalog_entry_type().from_dict(data["catalog_entry"]),
-            trajectory=Trajectory(np.array(data["trajectory"])),
+            trajectory=trajectory,
             ref=data.get("ref"),
         )
 
@@ -1,16 +1,104 @@
-from typing import Dict, List, Optional, TypeVar
+import hashlib
+from collections import OrderedDict
+from itertools import compress
+from typing import Dict, List, Optional, Sequence, Tuple, TypeVar
 
 import numpy as np
-from scipy.interpolate import interp1d
 
-from scenario_gym.trajectory import Trajectory
-from scenario_gym.utils import ArrayLike
+from scenario_gym.precision import DTypeLike
+from scenario_gym.trajectory import Trajectory, TrajectoryBatch
+from scenario_gym.utils import ArrayLike, NDArray
 
 from .base import Entity
 
 State = TypeVar("State")
 
 
+class ReplayCache:
+    """
+    A least recently used cache of the trajectory batches of replayed entities.
+
+    Preparing a scenario packs the trajectories of its entities and builds the
+    tables used to interpolate them. When the same scenarios are loaded
+    repeatedly the prepared batches are reused from the cache. Entries are
+    keyed by a hash of the trajectory data so a scenario loaded again from its
+    file shares the entry of the previous load. The hash of each trajectory is
+    kept by its copies so looking up a copied scenario does not read the data.
+    The least recently used entries are evicted when the cached arrays exceed
+    `max_bytes`.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 2**20):
+        """
+        Create an empty cache.
+
+        Parameters
+        ----------
+        max_bytes : int
+            The memory budget of the cached arrays in bytes.
+
+        """
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, TrajectoryBatch] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Return the number of cached batches."""
+        return len(self._entries)
+
+    @staticmethod
+    def key(trajs: Sequence[Trajectory], dtype: Optional[DTypeLike] = None) -> str:
+        """Return a hash of the content of the trajectories and the dtype."""
+        key = "".join(traj.digest for traj in trajs)
+        if dtype is not None:
+            key += np.dtype(dtype).str
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    def get(
+        self, trajs: Sequence[Trajectory], dtype: Optional[DTypeLike] = None
+    ) -> TrajectoryBatch:
+        """
+        Return the prepared batch of the trajectories building it if needed.
+
+        The poses of the batch are stored with `dtype` or with the dtype of the
+        trajectories if it is None.
+        """
+        key = self.key(trajs, dtype=dtype)
+        batch = self._entries.get(key)
+        if batch is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return batch
+        self.misses += 1
+        batch = TrajectoryBatch.from_trajectories(trajs, dtype=dtype)
+        batch.prepare()
+        if batch.nbytes <= self.max_bytes:
+            self._entries[key] = batch
+            self.nbytes += batch.nbytes
+            while self.nbytes > self.max_bytes:
+                _, old = self._entries.popitem(last=False)
+                self.nbytes -= old.nbytes
+        return batch
+
+    def clear(self) -> None:
+        """Remove all cached batches."""
+        self._entries.clear()
+        self.nbytes = 0
+
+
+def pack_trajectories(
+    trajs: Sequence[Trajectory],
+    cache: Optional[ReplayCache] = None,
+    dtype: Optional[DTypeLike] = None,
+) -> TrajectoryBatch:
+    """Pack trajectories into a batch using the cache if one is given."""
+    if cache is None or not trajs:
+        return TrajectoryBatch.from_trajectories(trajs, dtype=dtype)
+    return cache.get(trajs, dtype=dtype)
+
+
 class BatchReplayEntity:
     """
     A single object used to represent multiple entities.
@@ -23,13 +111,22 @@ class BatchReplayEntity:
         self,
         timestep: Optional[float] = None,
         persist: bool = False,
+        cache: Optional[ReplayCache] = None,
+        dtype: Optional[DTypeLike] = None,
     ):
-        """Init the batch entity with no assigned entities."""
+        """
+        Init the batch entity with no assigned entities.
+
+        The poses are returned with `dtype` or with the dtype of the
+        trajectories if it is None.
+        """
         self.entities: List[Entity] = []
         self.trajectories: List[Trajectory] = []
         self.persist = persist
         self.timestep = timestep
-        self.max_t = 0.0
+        self.cache = cache
+        self.dtype = dtype
+        self.add_entities([], [])
 
     def step(self, state: State) -> Dict[Entity, ArrayLike]:
         """
@@ -39,23 +136,34 @@ class BatchReplayEntity:
         is set to True then only entities present at the current time will be
         returned.
         """
-        t = state.next_t
-        new_poses = {}
-        if len(self.entities) > 0:
-            pos = self.fn(t)  # (m, num_ents)
-            for e, p in zip(self.entities, pos):
-                if (
-                    self.persist
-                    or e.is_static()
-                    or (t >= e.trajectory.min_t and t <= e.trajectory.max_t)
-                ):
-                    new_poses[e] = p
-        return new_poses
+        poses, active = self._active_poses(state.next_t)
+        return dict(zip(compress(self.entities, active), poses[active]))
+
+    def step_array(self, state: State) -> Tuple[NDArray, NDArray]:
+        """
+        Take a single step in the gym returning the poses as an array.
+
+        Returns
+        -------
+        Tuple[NDArray, NDArray]
+            The poses of the entities present at the next timestamp with shape
+            (num_active, 6) and the index of each of these entities from
+            `indices`.
+
+        """
+        poses, active = self._active_poses(state.next_t)
+        return poses[active], self.indices[active]
+
+    def _active_poses(self, t: float) -> Tuple[NDArray, NDArray]:
+        """Return the pose of every entity at t and a mask of those present."""
+        active = self._always | ((self._min_t <= t) & (t <= self._max_t))
+        return self.fn(t), active
 
     def add_entities(
         self,
         entities: List[Entity],
         trajs: List[Trajectory],
+        indices: Optional[ArrayLike] = None,
     ) -> None:
         """
         Add entities that are to be batched together.
@@ -71,58 +179,34 @@ class BatchReplayEntity:
         trajs : List[Trajectory]
             The trajectory for each entity.
 
+        indices : Optional[ArrayLike]
+            An index for each entity returned by `step_array` e.g. the index
+            of the entity in the state. By default the position of the entity
+            in `entities` is used.
+
         """
         self.entities.clear()
         self.trajectories.clear()
-        self.max_t = 0.0
-        if entities:
-            self.entities.extend(entities)
-            self.trajectories.extend(trajs)
-
-            num_ents = len(self.entities)
-            datas = []
-            for t in self.trajectories:
-                d = np.nan_to_num(t.data)
-                if d.shape[0] == 1:
-                    d = np.repeat(d, 2, axis=0)
-                    d[-1, 0] += 1e-1  # to prevent nan
-                datas.append(d)
-
-            m = datas[0].shape[1] - 1
-            ts = np.array(
-                sorted(list(set([t for d in datas for t in d[:, 0]])))
-            )  # (N,)
-            self.max_t = ts[-1]
-
-            interpd = []
-            for d in datas:
-                x = interp1d(
-                    d[:, 0],
-                    d[:, 1:].T,
-                    bounds_error=False,
-                    fill_value=(d[0, 1:], d[-1, 1:]),
-                )(
-                    ts
-                ).T  # (N, m)
-                interpd.append(x)
-
-            X = np.concatenate(interpd, axis=1)  # (N, num_ents * m)
-            if self.timestep:
-                all_ts = np.arange(0.0, self.max_t, self.timestep)
-                all_Xs = interp1d(
-                    ts,
-                    X.T,
-                    bounds_error=False,
-                    fill_value=(X[0], X[-1]),
-                )(all_ts).T
-                self.fn = lambda t: all_Xs[np.abs(all_ts - t).argmin()].reshape(
-                    num_ents, m
-                )
-            else:
-                interp = interp1d(
-                    ts,
-                    X.T,
-                    bounds_error=False,
-                    fill_value=(X[0], X[-1]),
-                )
-                self.fn = lambda t: interp(t).reshape(num_ents, m)
+        self.entities.extend(entities)
+        self.trajectories.extend(trajs)
+        self.batch = pack_trajectories(trajs, cache=self.cache, dtype=self.dtype)
+        self.max_t = self.batch.max_t.max() if entities else 0.0
+        self.indices = np.arange(len(entities)) if indices is None else indices
+        self.indices = np.asarray(self.indices, dtype=int)
+        self._min_t, self._max_t = self.batch.min_t, self.batch.max_t
+        self._always = self.batch.is_static | self.persist
+        if self.timestep:
+            self._num_frames = max(1, int(np.ceil(self.max_t / self.timestep)))
+
+    def fn(self, t: float) -> NDArray:
+        """
+        Return the pose of each entity at time t.
+
+        If `timestep` is set then the poses are taken at the nearest time on the
+        grid of multiples of the timestep up to `max_t`. The index of the grid
+        point is computed directly from t.
+        """
+        if self.timestep:
+            frame = np.floor(t / self.timestep + 0.5)
+            t = min(max(frame, 0.0), self._num_frames - 1) * self.timestep
+        return self.batch.positions_at_t(t)
@@ -1,8 +1,7 @@
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
 from lxml.etree import Element
-from scenariogeneration import xosc
 
 from scenario_gym.catalog_entry import (
     ArgsKwargs,
@@ -13,6 +12,9 @@ from scenario_gym.catalog_entry import (
 from scenario_gym.entity.base import Entity
 from scenario_gym.trajectory import Trajectory
 
+if TYPE_CHECKING:
+    from scenariogeneration import xosc
+
 
 @dataclass
 class MiscObjectCatalogEntry(CatalogEntry):
@@ -60,8 +62,10 @@ class MiscObjectCatalogEntry(CatalogEntry):
         data["mass"] = self.mass
         return data
 
-    def to_xosc(self) -> xosc.MiscObject:
+    def to_xosc(self) -> "xosc.MiscObject":
         """Write the pedestrian to xosc."""
+        from scenariogeneration import xosc
+
         obj = xosc.MiscObject(
             self.catalog_entry,
             self.mass,
@@ -1,8 +1,7 @@
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
 from lxml.etree import Element
-from scenariogeneration import xosc
 
 from scenario_gym.catalog_entry import (
     ArgsKwargs,
@@ -14,6 +13,9 @@ from scenario_gym.catalog_entry import (
 from scenario_gym.entity.base import Entity
 from scenario_gym.trajectory import Trajectory
 
+if TYPE_CHECKING:
+    from scenariogeneration import xosc
+
 
 @dataclass
 class Axle(CatalogObject):
@@ -61,8 +63,10 @@ class Axle(CatalogObject):
             data.get("position_z"),
         )
 
-    def to_xosc(self) -> xosc.Axle:
+    def to_xosc(self) -> "xosc.Axle":
         """Write the vehicle catalog entry to an xosc element."""
+        from scenariogeneration import xosc
+
         return xosc.Axle(
             self.max_steering,
             self.wheel_diameter,
@@ -170,8 +174,10 @@ class VehicleCatalogEntry(CatalogEntry):
         )
         return data
 
-    def to_xosc(self) -> xosc.Vehicle:
+    def to_xosc(self) -> "xosc.Vehicle":
         """Create an xosc entity object from the catalog entry."""
+        from scenariogeneration import xosc
+
         obj = xosc.Vehicle(
             self.catalog_entry,
             getattr(
@@ -144,7 +144,7 @@ def import_argoverse_scenario(path: str) -> Scenario:
     assert "AV" in all_ids, "No AV found to use as ego."
     all_ids.remove("AV")
 
-    entities = []
+    entities, trajectory_data = [], []
     for track_id, df in dfs:
 
         if track_id != "AV" and not df["observed"].any():
@@ -188,15 +188,20 @@ def import_argoverse_scenario(path: str) -> Scenario:
             ],
             axis=0,
         )
-        trajectory = Trajectory(traj_data, fields=["t", "x", "y", "h"])
+        trajectory_data.append(traj_data)
 
         entity_ref = (
             f"entity_{1+all_ids.index(track_id)}" if track_id != "AV" else "ego"
         )
         entity = Entity(catalog_entry, ref=entity_ref)
-        entity.trajectory = trajectory
         entities.append(entity)
 
+    trajectories = Trajectory.from_many(
+        trajectory_data, fields=["t", "x", "y", "h"]
+    )
+    for entity, trajectory in zip(entities, trajectories):
+        entity.trajectory = trajectory
+
     ego = None
     for e in entities:
         if e.ref == "ego":
@@ -368,6 +368,7 @@ class NuScenesImporter:
             [ego_instance_token]
         )
         instance_tokens = [ego_instance_token] + list(instance_tokens)
+        trajectory_data = []
         for instance_token in instance_tokens:
             instance_data = instance_token_to_data[instance_token]
             entity_type = (
@@ -411,7 +412,7 @@ class NuScenesImporter:
                 ]
             ).T
 
-            trajectory = Trajectory(traj_data, fields=["t", "x", "y", "h"])
+            trajectory_data.append(traj_data)
 
             entity_ref = (
                 f"entity_{instance_token}"
@@ -419,9 +420,14 @@ class NuScenesImporter:
                 else "ego"
             )
             entity = Entity(getattr(Catalogs, instance_token), ref=entity_ref)
-            entity.trajectory = trajectory
             entities.append(entity)
 
+        trajectories = Trajectory.from_many(
+            trajectory_data, fields=["t", "x", "y", "h"]
+        )
+        for entity, trajectory in zip(entities, trajectories):
+            entity.trajectory = trajectory
+
         all_trajectory_data = np.vstack(
             [np.array(d.trajectory) for d in instance_token_to_data.values()]
         )
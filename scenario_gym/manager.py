@@ -1,8 +1,11 @@
+import hashlib
 import inspect
 import os
 import warnings
 from argparse import ArgumentParser
-from typing import Any, Dict, List, Optional, Type, Union
+from collections import Counter
+from multiprocessing import Pool
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type, Union
 
 import yaml
 
@@ -10,6 +13,7 @@ from scenario_gym.agent import Agent, ReplayTrajectoryAgent
 from scenario_gym.controller import ReplayTrajectoryController
 from scenario_gym.entity import Entity
 from scenario_gym.metrics import Metric
+from scenario_gym.results import Manifest, ResultSink
 from scenario_gym.scenario import Scenario
 from scenario_gym.scenario_gym import ScenarioGym
 from scenario_gym.sensor import EgoLocalizationSensor
@@ -25,6 +29,66 @@ def load_keywords(obj: Type, exclude: Optional[List[str]] = None) -> Dict[str, A
     }
 
 
+_worker_manager: Optional["ScenarioManager"] = None
+_worker_gym: Optional[ScenarioGym] = None
+
+
+def _init_worker(manager: "ScenarioManager") -> None:
+    """Store the manager and build the gym once in each worker process."""
+    global _worker_manager, _worker_gym
+    _worker_manager = manager
+    _worker_gym = manager.make_gym()
+
+
+def _run_in_worker(
+    args: Tuple[int, Union[str, Scenario], bool, bool, Dict[str, Any]]
+) -> Tuple[int, List[Any]]:
+    """Run a single scenario with the worker's gym."""
+    idx, scenario, render, record, kwargs = args
+    return idx, _worker_manager._run_on_gym(
+        _worker_gym, scenario, render=render, record=record, **kwargs
+    )
+
+
+def _scenario_digest(scenario: Scenario) -> str:
+    """Return a hash of the entities and trajectories of a scenario."""
+    digest = hashlib.sha1()
+    for entity in scenario.entities:
+        digest.update(f"{entity.ref}:{entity.trajectory.digest};".encode())
+    return digest.hexdigest()[:12]
+
+
+def _scenario_ids(scenarios: List[Union[str, Scenario]]) -> List[str]:
+    """
+    Get a unique identifier for each scenario or scenario file of a batch.
+
+    The filepath or scenario name is used if it is unique in the batch.
+    Otherwise, e.g. for unnamed scenarios, a hash of the scenario's
+    trajectories is added for scenario objects and repeats of the same file or
+    scenario are numbered in the order they occur. The identifiers depend only
+    on the scenarios so that a batch can be resumed from a manifest even if it
+    is reordered or filtered.
+    """
+    names = [s if isinstance(s, str) else s.name for s in scenarios]
+    counts = Counter(names)
+    keys = []
+    for scenario, name in zip(scenarios, names):
+        if isinstance(scenario, str) or (name is not None and counts[name] == 1):
+            keys.append(name)
+        else:
+            keys.append(f"{name or 'scenario'}-{_scenario_digest(scenario)}")
+    counts = Counter(keys)
+    seen = Counter()
+    ids = []
+    for key in keys:
+        if counts[key] == 1:
+            ids.append(key)
+        else:
+            ids.append(f"{key}#{seen[key]}")
+            seen[key] += 1
+    return ids
+
+
 class ScenarioManager:
     """Provides functionality to manage running large numbers of scenarios."""
 
@@ -242,6 +306,9 @@ class ScenarioManager:
         scenarios: List[str],
         render: bool = False,
         record: bool = False,
+        workers: int = 1,
+        sink: Optional[ResultSink] = None,
+        manifest: Optional[Union[str, Manifest]] = None,
         **kwargs,
     ) -> List[List[Any]]:
         """
@@ -259,28 +326,218 @@ class ScenarioManager:
         record : bool
             Whether to record each scenario to OpenScenario.
 
+        workers : int
+            The number of worker processes used to run the scenarios. If greater
+            than 1 then scenarios are run in a process pool where each worker
+            builds its gym once and has its own copy of the metrics.
+
+        sink : Optional[ResultSink]
+            A sink to which the results of each scenario are written as they
+            are produced.
+
+        manifest : Optional[Union[str, Manifest]]
+            A manifest, or its filepath, used to resume an interrupted batch by
+            skipping the scenarios that it records as completed.
+
         Returns
         -------
         List[List[Any]]
             The values for each metric after each scenario.
 
         """
-        results = []
-        gym = self.make_gym()
-        if record:
-            gym.record()
-        for scenario in scenarios:
-            if isinstance(scenario, str):
-                gym.load_scenario(scenario, create_agent=self.create_agent)
-            elif isinstance(scenario, Scenario):
-                gym._set_scenario(scenario, create_agent=self.create_agent)
-            else:
-                raise ValueError(f"{scenario}: should be a scenario or a file.")
-            gym.rollout(render=render, **kwargs)
+        return [
+            result
+            for _, result in self.iter_scenarios(
+                scenarios,
+                render=render,
+                record=record,
+                workers=workers,
+                sink=sink,
+                manifest=manifest,
+                **kwargs,
+            )
+        ]
+
+    def iter_scenarios(
+        self,
+        scenarios: List[Union[str, Scenario]],
+        render: bool = False,
+        record: bool = False,
+        workers: int = 1,
+        ordered: bool = True,
+        sink: Optional[ResultSink] = None,
+        manifest: Optional[Union[str, Manifest]] = None,
+        **kwargs,
+    ) -> Iterator[Tuple[Union[str, Scenario], List[Any]]]:
+        """
+        Run a batch of scenarios yielding the results of each as it finishes.
+
+        Parameters
+        ----------
+        scenarios : List[Union[str, Scenario]]
+            The filepaths of the OpenScenario files for the scenarios or
+            the raw scenario objects.
+
+        render : bool
+            Whether to render each scenario.
+
+        record : bool
+            Whether to record each scenario to OpenScenario.
+
+        workers : int
+            The number of worker processes used to run the scenarios.
+
+        ordered : bool
+            If True results are yielded in the order of the input scenarios.
+            Otherwise they are yielded as soon as they complete. Only relevant
+            when `workers` is greater than 1.
+
+        sink : Optional[ResultSink]
+            A sink to which the results of each scenario are written as they
+            are produced. The sink is flushed once all scenarios are run.
+
+        manifest : Optional[Union[str, Manifest]]
+            A manifest, or its filepath, used to resume an interrupted batch.
+            Each completed scenario is recorded in the manifest and scenarios
+            already completed are not run again. Their stored results are
+            yielded instead and are not written to the sink. The results of
+            every scenario are then yielded in the json serializable form in
+            which they are stored so fresh and resumed results are the same.
+
+        Yields
+        ------
+        Tuple[Union[str, Scenario], List[Any]]
+            The scenario and the values for each metric.
+
+        """
+        if isinstance(manifest, str):
+            manifest = Manifest(manifest)
+        ids = _scenario_ids(scenarios)
+        cached = {}
+        if manifest is not None:
+            cached = {sid: manifest.get(sid) for sid in ids if sid in manifest}
+        pending = [(s, sid) for s, sid in zip(scenarios, ids) if sid not in cached]
+        completed = self._iter_pending(
+            [s for s, _ in pending],
+            [sid for _, sid in pending],
+            render=render,
+            record=record,
+            workers=workers,
+            ordered=ordered,
+            sink=sink,
+            manifest=manifest,
+            **kwargs,
+        )
+        if not cached:
+            yield from completed
+        elif ordered:
+            for scenario, sid in zip(scenarios, ids):
+                if sid in cached:
+                    yield scenario, cached[sid]
+                else:
+                    yield next(completed)
+            yield from completed
+        else:
+            for scenario, sid in zip(scenarios, ids):
+                if sid in cached:
+                    yield scenario, cached[sid]
+            yield from completed
+
+    def _iter_pending(
+        self,
+        scenarios: List[Union[str, Scenario]],
+        ids: List[str],
+        render: bool = False,
+        record: bool = False,
+        workers: int = 1,
+        ordered: bool = True,
+        sink: Optional[ResultSink] = None,
+        manifest: Optional[Manifest] = None,
+        **kwargs,
+    ) -> Iterator[Tuple[Union[str, Scenario], List[Any]]]:
+        """Run the scenarios and record each result with its identifier."""
+        if workers > 1:
+            results = (
+                (scenarios[idx], ids[idx], result)
+                for idx, result in self._run_pool(
+                    scenarios,
+                    workers,
+                    ordered=ordered,
+                    render=render,
+                    record=record,
+                    **kwargs,
+                )
+            )
+        else:
+            gym = self.make_gym()
             if record:
-                gym.recorder.get_state()
-            results.append([m.get_state() for m in self.metrics])
-        return results
+                gym.record()
+            results = (
+                (
+                    scenario,
+                    sid,
+                    self._run_on_gym(
+                        gym, scenario, render=render, record=record, **kwargs
+                    ),
+                )
+                for scenario, sid in zip(scenarios, ids)
+            )
+
+        names = [m.name for m in self.metrics]
+        for scenario, sid, result in results:
+            if manifest is not None:
+                manifest.add(sid, result)
+                result = manifest.get(sid)
+            if sink is not None:
+                sink.write(sid, dict(zip(names, result)))
+            yield scenario, result
+        if sink is not None:
+            sink.flush()
+
+    def _run_on_gym(
+        self,
+        gym: ScenarioGym,
+        scenario: Union[str, Scenario],
+        render: bool = False,
+        record: bool = False,
+        **kwargs,
+    ) -> List[Any]:
+        """Rollout a scenario on an existing gym and return the metric values."""
+        if isinstance(scenario, str):
+            gym.load_scenario(scenario, create_agent=self.create_agent)
+        elif isinstance(scenario, Scenario):
+            gym.set_scenario(scenario, create_agent=self.create_agent)
+        else:
+            raise ValueError(f"{scenario}: should be a scenario or a file.")
+        gym.rollout(render=render, **kwargs)
+        if record:
+            gym.recorder.get_state()
+        return [m.get_state() for m in gym.metrics]
+
+    def _run_pool(
+        self,
+        scenarios: List[Union[str, Scenario]],
+        workers: int,
+        ordered: bool = True,
+        render: bool = False,
+        record: bool = False,
+        **kwargs,
+    ) -> Iterator[Tuple[int, List[Any]]]:
+        """
+        Run scenarios in a pool of worker processes.
+
+        The manager is sent to each worker once so that every worker has its own
+        metric instances and builds its gym once with `make_gym`. Yields the
+        index of each scenario with its metric values either in input order or
+        in the order that they complete.
+        """
+        tasks = [
+            (idx, scenario, render, record, kwargs)
+            for idx, scenario in enumerate(scenarios)
+        ]
+        with Pool(workers, initializer=_init_worker, initargs=(self,)) as pool:
+            imap = pool.imap if ordered else pool.imap_unordered
+            yield from imap(_run_in_worker, tasks)
 
     def save_config(self, path: str = "./params.yml") -> None:
         """
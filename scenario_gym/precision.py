@@ -0,0 +1,67 @@
+from contextlib import contextmanager
+from typing import Iterator, Optional, Union
+
+import numpy as np
+
+DTypeLike = Union[str, type, np.dtype]
+
+_dtype = np.dtype(np.float64)
+
+
+def resolve_dtype(dtype: Optional[DTypeLike] = None) -> np.dtype:
+    """
+    Return the dtype used to store poses.
+
+    Parameters
+    ----------
+    dtype : Optional[DTypeLike]
+        Either float32 or float64. If None then the global precision set with
+        `set_precision` is returned.
+
+    """
+    if dtype is None:
+        return _dtype
+    dtype = np.dtype(dtype)
+    if dtype not in (np.float32, np.float64):
+        raise ValueError(f"Unsupported precision: {dtype}. Use float32 or float64.")
+    return dtype
+
+
+def get_precision() -> np.dtype:
+    """Return the global dtype used to store poses."""
+    return _dtype
+
+
+def set_precision(dtype: DTypeLike) -> None:
+    """
+    Set the global dtype used to store poses.
+
+    Trajectories, packed trajectories, the state and the rasterized map sensor
+    store poses with this dtype unless one is passed explicitly. Times,
+    distances travelled and the timestamps of recorded poses are always kept
+    in float64 to avoid drift over long simulations. Only objects created
+    after the precision is set are affected.
+
+    float32 has about seven significant digits so positions far from the
+    origin e.g. in UTM coordinates are only stored to within a few centimetres.
+    Such scenarios should be translated close to the origin first.
+
+    Parameters
+    ----------
+    dtype : DTypeLike
+        Either float32 or float64.
+
+    """
+    global _dtype
+    _dtype = resolve_dtype(dtype)
+
+
+@contextmanager
+def precision(dtype: DTypeLike) -> Iterator[np.dtype]:
+    """Set the global precision within a context."""
+    prev = _dtype
+    set_precision(dtype)
+    try:
+        yield _dtype
+    finally:
+        set_precision(prev)
@@ -0,0 +1,252 @@
+import json
+import os
+from collections import defaultdict
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from functools import wraps
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+_active: List["Profiler"] = []
+_null = nullcontext()
+
+
+def component_name(obj: Any) -> str:
+    """Get the name used to report timings for an object or function."""
+    if hasattr(obj, "__qualname__"):
+        return obj.__qualname__
+    return obj.__class__.__name__
+
+
+class Profiler:
+    """
+    Accumulates the time spent in each phase of the simulation.
+
+    Timings are recorded against a phase (e.g. `sensor`, `metric`) and the
+    name of the component that was timed (e.g. the class of the sensor or
+    metric) so that slow components can be found without profiling the whole
+    process. The gym, agents and state are instrumented with `span` so the
+    same code runs whether or not a profiler is attached and the overhead
+    without one is a single check per span.
+
+    The phases recorded by the gym are:
+        - step: the full step of the gym.
+        - sensor, policy, controller: the parts of each agent's step.
+        - agent: the step of agents which override `Agent.step`.
+        - non_agents: stepping the entities without agents.
+        - state: the state update split into poses, actions and terminal and
+          the collisions detected at once in a vector gym.
+        - callback: each state callback.
+        - metric: each metric.
+        - render: rendering the state.
+        - replay: evaluating trajectories in a fast replay rollout.
+        - load: loading scenarios and road networks from files.
+        - road_network: computing cached road network geometry.
+
+    While a profiler is active (see `activate`) timings are also recorded from
+    outside the gym e.g. when loading scenarios and road networks and when
+    encoding video frames.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear all recorded timings."""
+        self._calls: Dict[Tuple[str, str], int] = defaultdict(int)
+        self._totals: Dict[Tuple[str, str], float] = defaultdict(float)
+
+    @staticmethod
+    def clock() -> float:
+        """Return the current time in seconds for timing."""
+        return perf_counter()
+
+    def record(
+        self,
+        phase: str,
+        name: str,
+        start: float,
+        end: float,
+        args: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Record a timed call.
+
+        Parameters
+        ----------
+        phase : str
+            The phase of the simulation.
+
+        name : str
+            The name of the timed component.
+
+        start : float
+            The time at which the call started from `clock`.
+
+        end : float
+            The time at which the call ended from `clock`.
+
+        args : Optional[Dict[str, Any]]
+            Additional information about the call e.g. the entity of an agent.
+            Not used by the base profiler.
+
+        """
+        key = (phase, name)
+        self._calls[key] += 1
+        self._totals[key] += end - start
+
+    @contextmanager
+    def span(self, phase: str, name: str, **args) -> Iterator[None]:
+        """Time the body of the context."""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, name, start, perf_counter(), args=args or None)
+
+    @contextmanager
+    def activate(self) -> Iterator["Profiler"]:
+        """Record timings from the functions instrumented with `span`."""
+        _active.append(self)
+        try:
+            yield self
+        finally:
+            _active.remove(self)
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """
+        Return the recorded timings.
+
+        Returns
+        -------
+        Dict[str, Dict[str, Dict[str, float]]]
+            The timings indexed by phase then component name. Each entry has
+            the number of calls, the total time and the mean time per call in
+            seconds.
+
+        """
+        summary = {}
+        for (phase, name), total in self._totals.items():
+            calls = self._calls[(phase, name)]
+            summary.setdefault(phase, {})[name] = {
+                "calls": calls,
+                "total": total,
+                "mean": total / calls,
+            }
+        return summary
+
+    def phase_totals(self) -> Dict[str, float]:
+        """Return the total time recorded for each phase."""
+        totals = defaultdict(float)
+        for (phase, _), total in self._totals.items():
+            totals[phase] += total
+        return dict(totals)
+
+    def report(self) -> str:
+        """Return a table of the timings sorted by total time."""
+        rows = sorted(self._totals.items(), key=lambda x: -x[1])
+        lines = [f"{'phase':<12}{'name':<40}{'calls':>8}{'total (s)':>12}"]
+        for (phase, name), total in rows:
+            calls = self._calls[(phase, name)]
+            lines.append(f"{phase:<12}{name:<40}{calls:>8}{total:>12.4f}")
+        return "\n".join(lines)
+
+
+class Tracer(Profiler):
+    """
+    Records a timeline of every timed call as well as the aggregate timings.
+
+    The timeline is stored as a list of trace events which can be saved as
+    json in the Chrome trace event format and opened in chrome://tracing or
+    Perfetto to inspect the latency of individual steps.
+    """
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self._origin = perf_counter()
+        super().__init__()
+
+    def reset(self) -> None:
+        """Clear all recorded timings and events."""
+        super().reset()
+        self.events: List[Dict[str, Any]] = []
+
+    def record(
+        self,
+        phase: str,
+        name: str,
+        start: float,
+        end: float,
+        args: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Record a timed call and add it to the timeline."""
+        super().record(phase, name, start, end)
+        event = {
+            "name": name,
+            "cat": phase,
+            "ph": "X",
+            "ts": (start - self._origin) * 1e6,
+            "dur": (end - start) * 1e6,
+            "pid": self.pid,
+            "tid": 0,
+        }
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the timeline in the Chrome trace event format."""
+        return {
+            "traceEvents": sorted(self.events, key=lambda e: e["ts"]),
+            "displayTimeUnit": "ms",
+        }
+
+    def save(self, path: str) -> None:
+        """Write the timeline to a json file."""
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f)
+
+
+def span(phase: str, name: Any, **args) -> AbstractContextManager:
+    """
+    Time the body of the context with the active profiler if there is one.
+
+    The simulation code is instrumented with `span` so that the same code runs
+    whether or not it is profiled. If no profiler is active then a shared null
+    context is returned so the overhead is a single check.
+
+    Parameters
+    ----------
+    phase : str
+        The phase of the simulation.
+
+    name : Any
+        The name of the timed component or the component itself in which case
+        it is named with `component_name` only if a profiler is active.
+
+    args:
+        Additional information about the call e.g. the entity of an agent.
+
+    """
+    if not _active:
+        return _null
+    if not isinstance(name, str):
+        name = component_name(name)
+    return _active[-1].span(phase, name, **args)
+
+
+def traced(phase: str, name: Optional[str] = None) -> Callable:
+    """Time every call of the decorated function with the active profiler."""
+
+    def decorator(fn: Callable) -> Callable:
+        label = name if name is not None else fn.__qualname__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _active:
+                return fn(*args, **kwargs)
+            with _active[-1].span(phase, label):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
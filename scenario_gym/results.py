@@ -0,0 +1,216 @@
+import csv
+import json
+import os
+from abc import ABC, abstractmethod
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+def to_jsonable(value: Any) -> Any:
+    """Convert a metric value to a json serializable object."""
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, Enum):
+        return value.name
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+class ResultSink(ABC):
+    """
+    Base class for writing scenario results to a file incrementally.
+
+    Results are buffered and appended to the file every `flush_every` results
+    so that partial results are available while a batch is running and are not
+    lost if it is interrupted.
+    """
+
+    def __init__(self, path: str, flush_every: int = 100):
+        """
+        Create the sink.
+
+        Parameters
+        ----------
+        path : str
+            The filepath of the output. Results are appended if it exists.
+
+        flush_every : int
+            The number of results buffered before they are written to the file.
+
+        """
+        self.path = path
+        self.flush_every = max(1, flush_every)
+        self._buffer: List[Dict[str, Any]] = []
+
+    def write(self, scenario: str, results: Dict[str, Any]) -> None:
+        """
+        Add the results of a scenario to the sink.
+
+        Parameters
+        ----------
+        scenario : str
+            The identifier of the scenario e.g. its filepath.
+
+        results : Dict[str, Any]
+            The metric values indexed by metric name.
+
+        """
+        self._buffer.append({"scenario": scenario, **to_jsonable(results)})
+        if len(self._buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered results to the file."""
+        if self._buffer:
+            self._write(self._buffer)
+            self._buffer = []
+
+    @abstractmethod
+    def _write(self, records: List[Dict[str, Any]]) -> None:
+        """Append the records to the file."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Flush any remaining results."""
+        self.flush()
+
+    def __enter__(self):
+        """Use the sink as a context manager."""
+        return self
+
+    def __exit__(self, *args) -> None:
+        """Close the sink."""
+        self.close()
+
+
+class JSONLSink(ResultSink):
+    """Writes the results of each scenario as a line of json."""
+
+    def _write(self, records: List[Dict[str, Any]]) -> None:
+        """Append the records to the file."""
+        with open(self.path, "a") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+
+
+class CSVSink(ResultSink):
+    """
+    Writes the results of each scenario as a row of a csv file.
+
+    The columns are taken from the first result written. Non-scalar metric
+    values are stored as json strings.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        flush_every: int = 100,
+        columns: Optional[List[str]] = None,
+    ):
+        """
+        Create the sink.
+
+        Parameters
+        ----------
+        path : str
+            The filepath of the output. Results are appended if it exists.
+
+        flush_every : int
+            The number of results buffered before they are written to the file.
+
+        columns : Optional[List[str]]
+            The columns of the file. If not given then the header of an
+            existing file or the keys of the first result are used.
+
+        """
+        super().__init__(path, flush_every=flush_every)
+        if columns is None and os.path.exists(path) and os.path.getsize(path):
+            with open(path, "r", newline="") as f:
+                columns = next(csv.reader(f))
+        self.columns = columns
+
+    def _write(self, records: List[Dict[str, Any]]) -> None:
+        """Append the records to the file."""
+        write_header = self.columns is None
+        if self.columns is None:
+            self.columns = list(records[0])
+        with open(self.path, "a", newline="") as f:
+            writer = csv.DictWriter(
+                f, fieldnames=self.columns, extrasaction="ignore"
+            )
+            if write_header:
+                writer.writeheader()
+            writer.writerows(
+                {
+                    k: json.dumps(v) if isinstance(v, (list, dict)) else v
+                    for k, v in record.items()
+                }
+                for record in records
+            )
+
+
+class Manifest:
+    """
+    Records the results of completed scenarios so that batches can be resumed.
+
+    Each completed scenario is appended to a json lines file as soon as it
+    finishes. When the manifest is loaded again the completed scenarios and
+    their results are read back so that they can be skipped. Results are
+    stored in their json serializable form.
+    """
+
+    def __init__(self, path: str):
+        """
+        Load the manifest.
+
+        Parameters
+        ----------
+        path : str
+            The filepath of the manifest. If it exists then the previously
+            completed scenarios are loaded from it.
+
+        """
+        self.path = path
+        self.completed: Dict[str, Any] = {}
+        self._newline = False
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                for line in f:
+                    self._newline = not line.endswith("\n")
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # the final line may be incomplete if interrupted
+                        continue
+                    self.completed[record["scenario"]] = record["results"]
+
+    def __contains__(self, scenario: str) -> bool:
+        """Check if the scenario has been completed."""
+        return scenario in self.completed
+
+    def __len__(self) -> int:
+        """Return the number of completed scenarios."""
+        return len(self.completed)
+
+    def get(self, scenario: str) -> Any:
+        """Get the results of a completed scenario."""
+        return self.completed[scenario]
+
+    def add(self, scenario: str, results: Any) -> None:
+        """Record the results of a completed scenario."""
+        results = to_jsonable(results)
+        with open(self.path, "a") as f:
+            if self._newline:
+                f.write("\n")
+                self._newline = False
+            f.write(json.dumps({"scenario": scenario, "results": results}) + "\n")
+        self.completed[scenario] = results
@@ -1,4 +1,5 @@
 from .base import RoadGeometry, RoadLike, RoadObject
+from .frenet import FrenetFrame
 from .objects import (
     Building,
     Crossing,
@@ -4,8 +4,9 @@ import numpy as np
 from shapely.geometry import LineString, Polygon
 from shapely.validation import make_valid
 
-from scenario_gym.utils import ArgsKwargs
+from scenario_gym.utils import ArgsKwargs, cached_property
 
+from .frenet import FrenetFrame
 from .utils import load_road_geometry_from_json, polygon_to_data
 
 
@@ -156,6 +157,11 @@ class RoadLike(RoadGeometry):
         super().__init__(id, boundary, elevation=elevation)
         self.center = center
 
+    @cached_property
+    def frenet(self) -> FrenetFrame:
+        """Get the Frenet frame of the center line."""
+        return FrenetFrame(self.center)
+
     def to_dict(self) -> Dict[str, Any]:
         """Return a dictionary with id, boundary and center."""
         data = super().to_dict()
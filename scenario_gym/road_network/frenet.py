@@ -0,0 +1,219 @@
+from typing import Optional, Union
+
+import numpy as np
+import shapely
+from shapely.geometry import LineString
+from shapely.strtree import STRtree
+
+from scenario_gym.utils import ArrayLike, NDArray
+
+
+class FrenetFrame:
+    """
+    Frenet (s, d) coordinates relative to a polyline such as a lane center.
+
+    `s` is the distance along the polyline to the nearest point on it and `d`
+    is the signed distance to that point, positive to the left of the
+    direction of travel. The first and last segments are extended beyond the
+    ends of the polyline so points before its start have negative `s` and
+    points after its end have `s` greater than its length.
+
+    The start point, unit direction, length, cumulative distance and heading
+    of every segment are precomputed so that many points are transformed with
+    vectorised operations rather than projecting each point with shapely. The
+    nearest segment is found by comparing all segments for short polylines
+    and with a spatial index of the segments for long ones. The inverse
+    transform is exact for points whose nearest point on the
+    polyline lies inside a segment.
+    """
+
+    _chunk_size = 2**20
+    _max_brute_force = 64
+
+    def __init__(self, center: Union[LineString, ArrayLike]):
+        """
+        Build the segment tables of the polyline.
+
+        Parameters
+        ----------
+        center : Union[LineString, ArrayLike]
+            The polyline as a shapely LineString or an array of shape (n, 2).
+            Repeated consecutive points are ignored.
+
+        """
+        if isinstance(center, LineString):
+            center = center.coords
+        xy = np.asarray(center, dtype=float)
+        if xy.ndim != 2 or xy.shape[1] < 2:
+            raise ValueError(f"Invalid shape: {xy.shape}. Expected: (n, 2).")
+        xy = xy[:, :2]
+        delta = np.diff(xy, axis=0)
+        keep = np.hstack([[True], (delta != 0).any(axis=1)])
+        xy = xy[keep]
+        if xy.shape[0] < 2:
+            raise ValueError("The polyline must have at least two distinct points.")
+
+        delta = np.diff(xy, axis=0)
+        self.points = xy
+        self.lengths = np.linalg.norm(delta, axis=1)
+        self.directions = delta / self.lengths[:, None]
+        self.normals = np.stack([-self.directions[:, 1], self.directions[:, 0]], 1)
+        self.headings = np.arctan2(delta[:, 1], delta[:, 0])
+        self.s = np.hstack([[0.0], np.cumsum(self.lengths)])
+        # bounds of the position along each segment with the ends extended
+        self._lo = np.zeros_like(self.lengths)
+        self._hi = self.lengths.copy()
+        self._lo[0], self._hi[-1] = -np.inf, np.inf
+        self._tree: Optional[STRtree] = None
+
+    @property
+    def length(self) -> float:
+        """Return the length of the polyline."""
+        return self.s[-1]
+
+    def __len__(self) -> int:
+        """Return the number of segments."""
+        return self.lengths.shape[0]
+
+    def nearest_segment(self, xy: ArrayLike) -> NDArray:
+        """
+        Return the index of the segment nearest to each point.
+
+        Parameters
+        ----------
+        xy : ArrayLike
+            Points with shape (..., 2).
+
+        """
+        xy = np.asarray(xy, dtype=float)
+        flat = xy.reshape(-1, 2)
+        if len(self) > self._max_brute_force:
+            return self._query_tree(flat).reshape(xy.shape[:-1])
+        starts, dirs, lengths = self.points[:-1], self.directions, self.lengths
+        idxs = np.empty(flat.shape[0], dtype=int)
+        step = max(1, self._chunk_size // len(self))
+        for i in range(0, flat.shape[0], step):
+            rel = flat[i : i + step, None, :] - starts[None]
+            along = np.clip((rel * dirs).sum(-1), 0.0, lengths)
+            dist = ((rel - along[..., None] * dirs) ** 2).sum(-1)
+            idxs[i : i + step] = dist.argmin(axis=1)
+        return idxs.reshape(xy.shape[:-1])
+
+    def _query_tree(self, xy: NDArray) -> NDArray:
+        """Find the nearest segments to (n, 2) points with a spatial index."""
+        if self._tree is None:
+            segments = np.stack([self.points[:-1], self.points[1:]], axis=1)
+            self._tree = STRtree(shapely.linestrings(segments))
+        idxs = np.zeros(xy.shape[0], dtype=int)
+        valid = np.isfinite(xy).all(axis=1)
+        if valid.any():
+            points = shapely.points(xy[valid])
+            found = self._tree.query_nearest(points, all_matches=False)
+            idxs[np.flatnonzero(valid)[found[0]]] = found[1]
+        return idxs
+
+    def to_frenet(self, xy: ArrayLike) -> NDArray:
+        """
+        Transform points to Frenet coordinates.
+
+        Parameters
+        ----------
+        xy : ArrayLike
+            Points with shape (..., 2).
+
+        Returns
+        -------
+        np.ndarray
+            The (s, d) coordinates of the points with shape (..., 2).
+
+        """
+        xy = np.asarray(xy, dtype=float)
+        idx = self.nearest_segment(xy)
+        rel = xy - self.points[idx]
+        dirs = self.directions[idx]
+        along = np.clip((rel * dirs).sum(-1), self._lo[idx], self._hi[idx])
+        offset = rel - along[..., None] * dirs
+        cross = dirs[..., 0] * rel[..., 1] - dirs[..., 1] * rel[..., 0]
+        d = np.sign(cross) * np.linalg.norm(offset, axis=-1)
+        return np.stack([self.s[idx] + along, d], axis=-1)
+
+    def segment_at(self, s: ArrayLike) -> NDArray:
+        """Return the index of the segment containing each distance s."""
+        idx = np.searchsorted(self.s, s, side="right") - 1
+        return np.clip(idx, 0, len(self) - 1)
+
+    def from_frenet(self, sd: ArrayLike) -> NDArray:
+        """
+        Transform Frenet coordinates to points.
+
+        Parameters
+        ----------
+        sd : ArrayLike
+            The (s, d) coordinates with shape (..., 2).
+
+        Returns
+        -------
+        np.ndarray
+            The points with shape (..., 2).
+
+        """
+        sd = np.asarray(sd, dtype=float)
+        s, d = sd[..., 0], sd[..., 1]
+        idx = self.segment_at(s)
+        along = (s - self.s[idx])[..., None]
+        return (
+            self.points[idx]
+            + along * self.directions[idx]
+            + d[..., None] * self.normals[idx]
+        )
+
+    def heading_at(self, s: ArrayLike) -> NDArray:
+        """Return the heading of the polyline at each distance s."""
+        return self.headings[self.segment_at(s)]
+
+    def poses_to_frenet(self, poses: ArrayLike) -> NDArray:
+        """
+        Transform poses to Frenet coordinates.
+
+        Parameters
+        ----------
+        poses : ArrayLike
+            Poses with shape (..., 6) and columns x, y, z, h, p, r.
+
+        Returns
+        -------
+        np.ndarray
+            Poses with shape (..., 6) and columns s, d, z, h, p, r where the
+            heading is relative to the heading of the polyline and wrapped to
+            [-pi, pi).
+
+        """
+        poses = np.array(poses, dtype=float)
+        sd = self.to_frenet(poses[..., :2])
+        h = poses[..., 3] - self.heading_at(sd[..., 0])
+        poses[..., :2] = sd
+        poses[..., 3] = (h + np.pi) % (2 * np.pi) - np.pi
+        return poses
+
+    def poses_from_frenet(self, poses: ArrayLike) -> NDArray:
+        """
+        Transform poses from Frenet coordinates.
+
+        The inverse of `poses_to_frenet` with headings wrapped to [-pi, pi).
+
+        Parameters
+        ----------
+        poses : ArrayLike
+            Poses with shape (..., 6) and columns s, d, z, h, p, r.
+
+        Returns
+        -------
+        np.ndarray
+            Poses with shape (..., 6) and columns x, y, z, h, p, r.
+
+        """
+        poses = np.array(poses, dtype=float)
+        h = poses[..., 3] + self.heading_at(poses[..., 0])
+        poses[..., :2] = self.from_frenet(poses[..., :2])
+        poses[..., 3] = (h + np.pi) % (2 * np.pi) - np.pi
+        return poses
@@ -5,12 +5,10 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, Type, Union
 
 import numpy as np
-from pyxodr.road_objects.network import RoadNetwork as xodrRoadNetwork
-from scipy.interpolate import LinearNDInterpolator, NearestNDInterpolator
-from scipy.spatial import Delaunay
 from shapely.geometry import MultiPolygon, Point, Polygon
 from shapely.ops import unary_union
 
+from scenario_gym.profiling import traced
 from scenario_gym.utils import ArrayLike, NDArray, cached_property
 
 from .base import RoadGeometry, RoadObject
@@ -23,7 +21,6 @@ from .objects import (
     Pavement,
     Road,
 )
-from .xodr import xodr_to_sg_roads
 
 
 class RoadNetwork:
@@ -47,6 +44,7 @@ class RoadNetwork:
     }
 
     @classmethod
+    @traced("load", "RoadNetwork.create_from_file")
     def create_from_file(cls, filepath: str):
         """
         Create the road network from a file.
@@ -117,6 +115,10 @@ class RoadNetwork:
             OpenDRIVE file. If unspecified, no types are ignored.
 
         """
+        from pyxodr.road_objects.network import RoadNetwork as xodrRoadNetwork
+
+        from .xodr import xodr_to_sg_roads
+
         path = Path(filepath).absolute()
         if not path.exists():
             raise FileNotFoundError(f"File not found at: {path}.")
@@ -304,6 +306,7 @@ class RoadNetwork:
         return geoms
 
     @cached_property
+    @traced("road_network", "driveable_surface")
     def driveable_surface(self) -> MultiPolygon:
         """Get the union of boundaries of driveable geometries."""
         merged = unary_union(
@@ -481,6 +484,9 @@ class RoadNetwork:
 
     def _interpolate_elevation(self) -> None:
         """Interpolate the elevation values of the geometries."""
+        from scipy.interpolate import LinearNDInterpolator, NearestNDInterpolator
+        from scipy.spatial import Delaunay
+
         elevs = [
             geom.elevation
             for geom in self.road_network_geometries
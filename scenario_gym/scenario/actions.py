@@ -56,6 +56,17 @@ class ScenarioAction(ABC):
         """Condition for when to apply the action."""
         raise NotImplementedError
 
+    @property
+    def trigger_time(self) -> Optional[float]:
+        """
+        Return the earliest time at which the action can be triggered.
+
+        If not None then the trigger condition will only be checked once the
+        state time is at least this value. Actions that can trigger at any time
+        should return None so their trigger condition is checked every step.
+        """
+        return None
+
     def copy(self):
         """Return a copy of the action."""
         return deepcopy(self)
@@ -102,6 +113,11 @@ class FixedTAction(ScenarioAction):
         """Update when the state time is greater than action time."""
         return state.t >= self.t
 
+    @property
+    def trigger_time(self) -> Optional[float]:
+        """Return the time of the action."""
+        return self.t
+
     def translate(self, x: np.ndarray, inplace: bool = False):
         """Translate the action."""
         act = self.copy() if not inplace else self
@@ -7,13 +7,12 @@ from copy import copy
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, Type
 
-import matplotlib.pyplot as plt
 import numpy as np
 
 from scenario_gym.entity import Entity, MiscObject, Pedestrian, Vehicle
 from scenario_gym.road_network import RoadNetwork
 from scenario_gym.scenario.actions import ScenarioAction, UpdateStateVariableAction
-from scenario_gym.trajectory import Trajectory
+from scenario_gym.trajectory import Trajectory, TrajectoryBatch
 from scenario_gym.utils import cached_property
 
 
@@ -176,6 +175,40 @@ class Scenario:
 
         return scenario
 
+    def subsample(
+        self,
+        points_per_s: Optional[float] = None,
+        points_per_t: Optional[float] = None,
+        inplace: bool = False,
+    ) -> Scenario:
+        """
+        Return a new scenario with the trajectories of all entities subsampled.
+
+        Gives the same trajectories as `Trajectory.subsample` for each entity
+        but subsamples all trajectories at once. Exactly one of `points_per_s`
+        or `points_per_t` must be passed.
+        """
+        scenario = self.copy() if not inplace else self
+        batch = TrajectoryBatch.from_trajectories(
+            [e.trajectory for e in scenario.entities]
+        )
+        trajectories = batch.subsample(
+            points_per_s=points_per_s, points_per_t=points_per_t
+        )
+        for e, trajectory in zip(scenario.entities, trajectories):
+            e.trajectory = trajectory
+        return scenario
+
+    def smooth_headings(self, inplace: bool = False) -> Scenario:
+        """Return a new scenario with the headings of all entities smoothed."""
+        scenario = self.copy() if not inplace else self
+        batch = TrajectoryBatch.from_trajectories(
+            [e.trajectory for e in scenario.entities]
+        )
+        for e, trajectory in zip(scenario.entities, batch.smooth_headings()):
+            e.trajectory = trajectory
+        return scenario
+
     def reset_start(self, entity: Optional[Entity] = None) -> Scenario:
         """Reset the start time to the start of an entity's trajectory."""
         if entity is None:
@@ -192,11 +225,14 @@ class Scenario:
     ):
         """Load the scenario from a dictionary."""
         entities = []
-        for e_data in data["entities"]:
+        trajectories = Trajectory.from_many(
+            [np.array(e_data["trajectory"]) for e_data in data["entities"]]
+        )
+        for e_data, trajectory in zip(data["entities"], trajectories):
             for Ent in e_classes:
                 if Ent.__name__ == e_data.get("entity_class", Entity):
                     break
-            entities.append(Ent.from_dict(e_data))
+            entities.append(Ent.from_dict(e_data, trajectory=trajectory))
 
         road_network = data.get("road_network")
         if road_network is not None:
@@ -366,6 +402,8 @@ Entities
             or saved.
 
         """
+        import matplotlib.pyplot as plt
+
         name = self.name if self.name is not None else "Scenario"
         plt.figure(figsize=figsize)
         if self.road_network is not None:
@@ -1,14 +1,37 @@
 import os
-from typing import Any, Callable, Dict, List, Optional, Type, Union
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from multiprocessing import Pool
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type, Union
 
-from scenario_gym.agent import Agent, _create_agent
-from scenario_gym.entity import Entity
+import numpy as np
+
+from scenario_gym.agent import Agent, ReplayTrajectoryAgent, _create_agent
+from scenario_gym.controller import ReplayTrajectoryController
+from scenario_gym.entity import BatchReplayEntity, Entity, ReplayCache
 from scenario_gym.metrics import Metric
+from scenario_gym.precision import DTypeLike
+from scenario_gym.profiling import Profiler, span
 from scenario_gym.scenario import Scenario
 from scenario_gym.state import State
+from scenario_gym.trajectory import TrajectoryBatch
 from scenario_gym.viewer import Viewer
 from scenario_gym.xosc_interface import import_scenario
 
+_worker_gym: Optional["ScenarioGym"] = None
+
+
+def _init_worker(Gym: Type["ScenarioGym"], kwargs: Dict[str, Any]) -> None:
+    """Build the gym once in each worker process."""
+    global _worker_gym
+    _worker_gym = Gym(**kwargs)
+
+
+def _rollout_in_worker(args: Tuple[str, bool]) -> None:
+    """Rollout a single scenario with the worker's gym."""
+    path, render = args
+    _worker_gym.load_scenario(path)
+    _worker_gym.rollout(render=render)
+
 
 class ScenarioGym:
     """The main class that loads and runs scenarios."""
@@ -18,9 +41,25 @@ class ScenarioGym:
         cls,
         paths: List[str],
         render: bool = False,
+        workers: int = 1,
         **kwargs,
     ) -> None:
-        """Rollout the scenarios in paths."""
+        """
+        Rollout the scenarios in paths.
+
+        If `workers` is greater than 1 then the scenarios are run in a pool of
+        worker processes which each build a gym once with the given keyword
+        arguments.
+        """
+        if workers > 1:
+            with Pool(
+                workers, initializer=_init_worker, initargs=(cls, kwargs)
+            ) as pool:
+                for _ in pool.imap_unordered(
+                    _rollout_in_worker, [(path, render) for path in paths]
+                ):
+                    pass
+            return
         gym = cls(**kwargs)
         for path in paths:
             gym.load_scenario(path)
@@ -36,6 +75,11 @@ class ScenarioGym:
         ] = None,
         state_callbacks: Optional[List[Callable[[State], None]]] = None,
         metrics: Optional[List[Metric]] = None,
+        max_history: Optional[int] = None,
+        fast_replay: bool = False,
+        profile: bool = False,
+        replay_cache: Optional[ReplayCache] = None,
+        dtype: Optional[DTypeLike] = None,
         **viewer_parameters,
     ):
         """
@@ -64,6 +108,30 @@ class ScenarioGym:
         metrics: List[Metric]
             List of metrics to measure.
 
+        max_history: Optional[int]
+            The maximum number of recorded poses kept for each entity in the
+            state. If None then the full history is kept and if 0 then no
+            history is recorded.
+
+        fast_replay: bool
+            If True then scenarios in which every entity replays its trajectory
+            are rolled out by evaluating the poses of all entities over many
+            timesteps at once instead of stepping the agents. Sensors are not
+            called in this mode and it is not used when rendering.
+
+        profile: bool
+            If True then the time spent in each phase of every step is recorded
+            by the profiler in `self.profiler`.
+
+        replay_cache: Optional[ReplayCache]
+            A cache of the packed trajectories of replayed entities. Loading a
+            scenario that is in the cache reuses its interpolation tables.
+
+        dtype: Optional[DTypeLike]
+            The dtype used to store poses in the state e.g. float32 to halve
+            memory use. Times are always float64. If None then the global
+            precision set with `scenario_gym.precision.set_precision` is used.
+
         viewer_parameters:
             Keyword arguments for viewer_class.
 
@@ -81,12 +149,15 @@ class ScenarioGym:
         if state_callbacks is None:
             state_callbacks = []
         self.state_callbacks = state_callbacks
-
-        if viewer_class is None:
-            self._get_viewer()
-        else:
-            self.viewer_class = viewer_class
-            self._render_enabled = True
+        self.max_history = max_history
+        self.replay_cache = replay_cache
+        self.dtype = dtype
+        self.fast_replay = fast_replay
+        self.profiler: Optional[Profiler] = Profiler() if profile else None
+
+        # the default viewer is imported when it is first needed
+        self.viewer_class = viewer_class
+        self._render_enabled = viewer_class is not None
         self.state: Optional[State] = None
         self.viewer: Optional[Viewer] = None
         self.reset_gym()
@@ -142,14 +213,15 @@ class ScenarioGym:
             vehicle_2, ..., pedestrian_1, ..., entity_1, ...
 
         """
-        if scenario_path.endswith(".json"):
-            scenario = Scenario.from_json(scenario_path, **kwargs)
-        else:
-            scenario = import_scenario(
-                scenario_path,
-                relabel=relabel,
-                **kwargs,
-            )
+        with self._profiling():
+            if scenario_path.endswith(".json"):
+                scenario = Scenario.from_json(scenario_path, **kwargs)
+            else:
+                scenario = import_scenario(
+                    scenario_path,
+                    relabel=relabel,
+                    **kwargs,
+                )
         self.set_scenario(
             scenario, scenario_path=scenario_path, create_agent=create_agent
         )
@@ -181,6 +253,9 @@ class ScenarioGym:
             persist=self.persist,
             conditions=self.terminal_conditions,
             state_callbacks=self.state_callbacks,
+            max_history=self.max_history,
+            replay_cache=self.replay_cache,
+            dtype=self.dtype,
         )
         self.create_agents(create_agent=create_agent)
         self.reset_scenario()
@@ -200,15 +275,18 @@ class ScenarioGym:
             without agents will replay their trajectories.
 
         """
-        non_agents, non_agent_trajs = [], []
-        for entity in self.state.scenario.entities:
+        non_agents, non_agent_trajs, non_agent_idxs = [], [], []
+        for idx, entity in enumerate(self.state.scenario.entities):
             agent = create_agent(self.state.scenario, entity)
             if agent is not None:
                 self.state.agents[entity] = agent
             else:
                 non_agents.append(entity)
                 non_agent_trajs.append(entity.trajectory)
-        self.state.non_agents.add_entities(non_agents, non_agent_trajs)
+                non_agent_idxs.append(idx)
+        self.state.non_agents.add_entities(
+            non_agents, non_agent_trajs, indices=non_agent_idxs
+        )
 
     def get_start_time(self, scenario: Scenario) -> float:
         """Get the start time of the scenario."""
@@ -224,34 +302,121 @@ class ScenarioGym:
                 for m in self.metrics:
                     m.reset(self.state)
 
+    def _profiling(self) -> AbstractContextManager:
+        """Return a context in which the gym's profiler is active."""
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.activate()
+
+    @contextmanager
+    def profile(self, profiler: Optional[Profiler] = None) -> Iterator[Profiler]:
+        """
+        Record the time spent in each phase of the steps run in the context.
+
+        Parameters
+        ----------
+        profiler : Optional[Profiler]
+            The profiler used to record the timings. If not given then a new
+            profiler is created.
+
+        Examples
+        --------
+        >>> with gym.profile() as profiler:
+        ...     gym.rollout()
+        >>> profiler.summary()
+
+        """
+        prev = self.profiler
+        self.profiler = profiler if profiler is not None else Profiler()
+        try:
+            yield self.profiler
+        finally:
+            self.profiler = prev
+
     def step(self) -> None:
         """Process a single step in the environment."""
-        self.state.next_t = self.state.t + self.timestep
-
-        # get the new poses
-        new_poses = {}
-        for entity, agent in self.state.agents.items():
-            if entity in self.state.poses:
-                pose = agent.step(self.state)
-                if pose is not None:
-                    new_poses[entity] = pose
-                elif self.persist:
-                    new_poses[entity] = self.state.poses[entity]
-            elif entity.trajectory.min_t >= self.state.t:
-                # the agent is initialised at its start position
-                new_poses[entity] = entity.trajectory.position_at_t(
-                    self.state.next_t
-                )
-        new_poses.update(self.state.non_agents.step(self.state))
+        state = self.state
+        state.next_t = state.t + self.timestep
+        with self._profiling(), span("step", "step", t=state.next_t):
+            # get the new poses
+            new_poses = {}
+            for entity, agent in state.agents.items():
+                if entity in state.poses:
+                    pose = self._agent_step(entity, agent)
+                    if pose is not None:
+                        new_poses[entity] = pose
+                    elif self.persist:
+                        new_poses[entity] = state.poses[entity]
+                elif entity.trajectory.min_t >= state.t:
+                    # the agent is initialised at its start position
+                    new_poses[entity] = entity.trajectory.position_at_t(
+                        state.next_t
+                    )
+            # update the poses and current time
+            if self._steps_pose_arrays():
+                with span("non_agents", state.non_agents):
+                    poses, idxs = state.non_agents.step_array(state)
+                state.step_pose_array(*self._pose_arrays(new_poses, poses, idxs))
+            else:
+                with span("non_agents", state.non_agents):
+                    new_poses.update(state.non_agents.step(state))
+                state.step(new_poses)
+
+            # metrics and rendering
+            self._step_metrics()
+            if self.viewer is not None:
+                with span("render", self.viewer):
+                    state.last_keystroke = self.render()
 
-        # update the poses and current time
-        self.state.step(new_poses)
+    def _agent_step(self, entity: Entity, agent: Agent) -> Any:
+        """
+        Step an agent.
+
+        `Agent.step` times its sensor, policy and controller when profiling so
+        agents which override it are timed as a whole.
+        """
+        if type(agent).step is Agent.step:
+            return agent.step(self.state)
+        with span("agent", agent, entity=entity.ref):
+            return agent.step(self.state)
 
-        # metrics and rendering
+    def _step_metrics(self) -> None:
+        """Step the metrics."""
         for m in self.metrics:
-            m.step(self.state)
-        if self.viewer is not None:
-            self.state.last_keystroke = self.render()
+            with span("metric", m):
+                m.step(self.state)
+
+    def _pose_arrays(
+        self,
+        agent_poses: Dict[Entity, np.ndarray],
+        poses: np.ndarray,
+        idxs: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Combine the new poses into entity-indexed arrays for the state.
+
+        Parameters
+        ----------
+        agent_poses : Dict[Entity, np.ndarray]
+            The new pose of each agent.
+
+        poses : np.ndarray
+            The new poses of the non-agent entities.
+
+        idxs : np.ndarray
+            The index of each non-agent pose in the state.
+
+        """
+        n = len(self.state.all_entities)
+        all_poses = np.full((n, 6), np.nan, dtype=self.state.dtype)
+        active = np.zeros(n, dtype=bool)
+        all_poses[idxs] = poses
+        active[idxs] = True
+        if agent_poses:
+            agent_idxs = [self.state.entity_indices[e] for e in agent_poses]
+            all_poses[agent_idxs] = list(agent_poses.values())
+            active[agent_idxs] = True
+        return all_poses, active
 
     def rollout(
         self, render: bool = False, video_path: Optional[str] = None
@@ -260,12 +425,109 @@ class ScenarioGym:
         self.reset_scenario()
         if render:
             self.state.last_keystroke = self.render(video_path=video_path)
+        if self.fast_replay and not render and self.is_replay_only():
+            with self._profiling():
+                self._replay_rollout()
         while not self.state.is_done:
             self.step()
         for agent in self.state.agents.values():
             agent.finish(self.state)
         self.close()
 
+    def _steps_pose_arrays(self) -> bool:
+        """
+        Return True if `step` can pass the new poses to the state as arrays.
+
+        If the state or the non-agents override their dict-based `step` or the
+        state overrides `update_poses` then these are called instead.
+        """
+        state = self.state
+        return (
+            type(state).step is State.step
+            and type(state).update_poses is State.update_poses
+            and type(state.non_agents).step is BatchReplayEntity.step
+        )
+
+    def has_default_step(self) -> bool:
+        """
+        Return True if the gym, state and non-agents use the default steps.
+
+        Rollouts which compute the step without calling `step` e.g. the fast
+        replay or a `VectorScenarioGym` can only be used if this is True.
+        """
+        if type(self).step is not ScenarioGym.step or not self._steps_pose_arrays():
+            return False
+        State_ = type(self.state)
+        return all(
+            getattr(State_, method) is getattr(State, method)
+            for method in (
+                "step_pose_array",
+                "update_pose_array",
+                "update_statistics",
+                "_post_step",
+                "check_terminal",
+            )
+        )
+
+    def is_replay_only(self) -> bool:
+        """
+        Return True if every entity replays its trajectory exactly.
+
+        Returns False if the step of the gym or the state is overridden since
+        the fast replay rollout would not run the overriding method.
+        """
+        if not self.has_default_step():
+            return False
+        return all(
+            type(agent) is ReplayTrajectoryAgent
+            and type(agent.controller) is ReplayTrajectoryController
+            for agent in self.state.agents.values()
+        )
+
+    def _replay_rollout(self, chunk_size: int = 256) -> None:
+        """
+        Rollout a scenario in which every entity replays its trajectory.
+
+        The poses of every entity are evaluated for `chunk_size` timesteps at a
+        time with a single call to a packed trajectory batch. The velocities,
+        distances, recorded poses and terminal step of the chunk are computed
+        in bulk by `State.iter_pose_arrays` and the timesteps are only walked to
+        update the actions, callbacks and metrics. Time is accumulated in the
+        same way as `step` so the results match the stepped rollout.
+        """
+        state = self.state
+        n = len(state.all_entities)
+        t0 = state.t
+        agents = state.agents
+
+        trajs = []
+        always = np.empty(n, dtype=bool)
+        for i, entity in enumerate(state.all_entities):
+            if entity in agents:
+                traj = agents[entity].trajectory
+                # agents stay once present and appear if they start after t0
+                always[i] = state.active_mask[i] or traj.min_t >= t0
+            else:
+                traj = entity.trajectory
+                always[i] = self.persist or entity.is_static()
+            trajs.append(traj)
+        batch = TrajectoryBatch.from_trajectories(trajs, dtype=state.dtype)
+        min_ts, max_ts = batch.min_t, batch.max_t
+        is_agent = np.array([e in agents for e in state.all_entities], dtype=bool)
+
+        while not state.is_done:
+            ts = np.cumsum(np.hstack([state.t, np.full(chunk_size, self.timestep)]))
+            ts = ts[1:]
+            with span("replay", "position_at_t"):
+                poses = batch.positions_at_t(ts)
+            active = always[None, :] | (
+                ~is_agent[None, :]
+                & (min_ts[None, :] <= ts[:, None])
+                & (ts[:, None] <= max_ts[None, :])
+            )
+            for _ in state.iter_pose_arrays(ts, poses, active):
+                self._step_metrics()
+
     def render(self, video_path: Optional[str] = None) -> None:
         """Render the state of the gym."""
         if self.viewer is None:
@@ -275,6 +537,8 @@ class ScenarioGym:
     def reset_viewer(self, video_path: Optional[str] = None) -> None:
         """Reset the viewer at the start of a new rollout."""
         if self.viewer is None:
+            if self.viewer_class is None:
+                self._get_viewer()
             if not self._render_enabled:
                 raise ValueError(
                     "Rendering is disabled since no `viewer_class` was provided "
@@ -87,15 +87,16 @@ class FutureCollisionDetector(Sensor):
 
     def _step(self, state: State) -> FutureCollisionObservation:
         """Return future collisions."""
-        ents = {e: None for e in state.scenario.entities if e != self.entity}
+        idx = state.entity_indices[self.entity]
+        others = [e for e in state.all_entities if e != self.entity]
+        other_idxs = [state.entity_indices[e] for e in others]
 
         # check for collisions over the horizon
         future_collision = False
-        for t in np.linspace(state.t, state.t + self.horizon, 10):
-            ego_pose = self.entity.trajectory.position_at_t(t)
-            for e in ents:
-                ents[e] = e.trajectory.position_at_t(t)
-            collisions = detect_collisions({self.entity: ego_pose}, ents)
+        ts = np.linspace(state.t, state.t + self.horizon, 10)
+        for poses in state.trajectories.positions_at_t(ts):
+            ents = dict(zip(others, poses[other_idxs]))
+            collisions = detect_collisions({self.entity: poses[idx]}, ents)
             if len(collisions[self.entity]) > 0:
                 future_collision = True
         return FutureCollisionObservation(
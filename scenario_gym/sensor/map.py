@@ -10,6 +10,7 @@ from shapely.vectorized import contains
 
 from scenario_gym.entity import Entity
 from scenario_gym.observation import SingleEntityObservation
+from scenario_gym.precision import DTypeLike, resolve_dtype
 from scenario_gym.road_network import RoadNetwork
 from scenario_gym.state import State
 from scenario_gym.utils import ArrayLike, NDArray
@@ -39,6 +40,10 @@ class RasterizedMapSensor(Sensor):
     The get method should be called `_{}_layer` where {} is replaced with the
     string layer name. This method is called each step with the state and the map
     coordiantes to return the value of the map at each coordinate.
+
+    The sampling coordinates are computed with the precision given by `dtype`
+    and layers returning floating point values are cast to it. Boolean layers
+    are returned as booleans.
     """
 
     _all_layers: List[str] = [
@@ -61,6 +66,7 @@ class RasterizedMapSensor(Sensor):
         freq: Optional[float] = 1.0,
         n: Optional[int] = None,
         channels_first: bool = False,
+        dtype: Optional[DTypeLike] = None,
     ):
         """
         Init the sensor.
@@ -94,6 +100,10 @@ class RasterizedMapSensor(Sensor):
         channels_first : bool
             If given returns (C, W, H) rather than (W, H, C)
 
+        dtype : Optional[DTypeLike]
+            The precision of the sampling coordinates and of floating point
+            layers. By default the global precision is used.
+
         """
         super().__init__(entity)
         self.layers = (
@@ -104,6 +114,7 @@ class RasterizedMapSensor(Sensor):
         self.height = height
         self.width = width
         self.channels_first = channels_first
+        self.dtype = resolve_dtype(dtype)
         if n is None:
             assert freq is not None, "At least one of n and freq must be provided."
             self.nw, self.nh = int(freq * width), int(freq * height)
@@ -116,6 +127,7 @@ class RasterizedMapSensor(Sensor):
                 np.linspace(-self.height / 2, self.height / 2, self.nh),
             )
         ).transpose(1, 2, 0)
+        self.X = self.X.astype(self.dtype, copy=False)
 
     def check_layers(self) -> None:
         """Check that all layers are implemented correctly."""
@@ -142,6 +154,8 @@ class RasterizedMapSensor(Sensor):
         coords = self._get_coords(pose).reshape(-1, 2)
         layers = [getattr(self, f"_{l}_layer")(state, coords) for l in self.layers]
         obs_map = np.array(layers).reshape(len(layers), self.nw, self.nw)
+        if obs_map.dtype.kind == "f":
+            obs_map = obs_map.astype(self.dtype, copy=False)
         return MapObservation(
             self.entity,
             *state.get_entity_data(self.entity),
@@ -159,12 +173,13 @@ class RasterizedMapSensor(Sensor):
         """Get the coordinates at which the map should be constructed."""
         X = self.X  # (nw, nh, 2)
 
-        xy, theta = pose[[0, 1]], pose[3] + math.pi / 2
+        xy, theta = pose[[0, 1]].astype(self.dtype), pose[3] + math.pi / 2
         R = np.array(
             [
                 [np.cos(theta), -np.sin(theta)],
                 [np.sin(theta), np.cos(theta)],
-            ]
+            ],
+            dtype=self.dtype,
         )
         return (X @ R.T) + xy[None, None, :]
 
@@ -1,2 +1,2 @@
-from scenario_gym.state.state import TERMINAL_CONDITIONS, State
-from scenario_gym.state.utils import detect_collisions
+from scenario_gym.state.state import TERMINAL_CONDITIONS, State, StateSnapshot
+from scenario_gym.state.utils import EntityArrayView, detect_collisions
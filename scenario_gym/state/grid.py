@@ -0,0 +1,180 @@
+from typing import Tuple
+
+import numpy as np
+
+from scenario_gym.utils import ArrayLike
+
+
+def _ragged_range(starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Concatenate the ranges starts[k], ..., starts[k] + counts[k] - 1."""
+    offsets = np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(starts, counts) + np.arange(offsets.shape[0]) - offsets
+
+
+class SpatialHashGrid:
+    """
+    A uniform grid of entity bounding boxes maintained incrementally.
+
+    Each entity is registered in every cell overlapped by its axis-aligned
+    bounding box. Cell memberships are stored as entries sorted by a hash of
+    the cell coordinates so that the entities in a cell are a contiguous
+    slice. The candidate pairs of entities sharing a cell are kept between
+    updates.
+
+    When the grid is updated only the entities whose range of cells has
+    changed are removed and reinserted and only the candidate pairs involving
+    them are recomputed. Entities typically move a small fraction of a cell
+    per step so most updates change nothing.
+    """
+
+    def __init__(self, num_entities: int, cell_size: float = 10.0):
+        """
+        Create an empty grid.
+
+        Parameters
+        ----------
+        num_entities : int
+            The number of entities that may be stored.
+
+        cell_size : float
+            The side length of the cells.
+
+        """
+        if cell_size <= 0:
+            raise ValueError(f"Cell size must be positive: {cell_size}.")
+        self.num_entities = num_entities
+        self.cell_size = float(cell_size)
+        self._cells = np.zeros((num_entities, 4), dtype=np.int64)
+        self._present = np.zeros(num_entities, dtype=bool)
+        self._keys = np.empty(0, dtype=np.int64)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._pairs = np.empty(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        """Return the number of entities in the grid."""
+        return int(self._present.sum())
+
+    def _cell_range(self, bounds: np.ndarray) -> np.ndarray:
+        """Return the (..., 4) range of cells ix0, iy0, ix1, iy1 of bounds."""
+        with np.errstate(invalid="ignore"):
+            return np.floor(bounds / self.cell_size).astype(np.int64)
+
+    @staticmethod
+    def _hash(ix: np.ndarray, iy: np.ndarray) -> np.ndarray:
+        """Hash cell coordinates to unique integer keys."""
+        return (ix << 32) + (iy & 0xFFFFFFFF)
+
+    def _entries(
+        self, idxs: np.ndarray, cells: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the keys and ids of the cells covered by each entity."""
+        ny = cells[:, 3] - cells[:, 1] + 1
+        counts = (cells[:, 2] - cells[:, 0] + 1) * ny
+        local = _ragged_range(np.zeros_like(counts), counts)
+        ny = np.repeat(ny, counts)
+        keys = self._hash(
+            np.repeat(cells[:, 0], counts) + local // ny,
+            np.repeat(cells[:, 1], counts) + local % ny,
+        )
+        return keys, np.repeat(idxs, counts)
+
+    def _encode(self, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+        """Encode pairs of entity indices with i < j as integers."""
+        return np.minimum(i, j) * self.num_entities + np.maximum(i, j)
+
+    def update(self, aabbs: ArrayLike, active: ArrayLike) -> np.ndarray:
+        """
+        Update the bounding boxes of the entities.
+
+        Parameters
+        ----------
+        aabbs : ArrayLike
+            Array of shape (num_entities, 4) with the bounds xmin, ymin, xmax,
+            ymax of each entity.
+
+        active : ArrayLike
+            Boolean array of shape (num_entities,) indicating which entities
+            are present. Entities with non-finite bounds are not present.
+
+        Returns
+        -------
+        np.ndarray
+            The indices of the entities whose cells changed.
+
+        """
+        aabbs = np.asarray(aabbs, dtype=np.float64)
+        present = np.asarray(active, dtype=bool) & np.isfinite(aabbs).all(axis=1)
+        cells = self._cell_range(aabbs)
+        changed = (present != self._present) | (
+            present & (cells != self._cells).any(axis=1)
+        )
+        idxs = np.flatnonzero(changed)
+        if idxs.size == 0:
+            return idxs
+
+        keep = ~changed[self._ids]
+        keys, ids = self._keys[keep], self._ids[keep]
+        i, j = np.divmod(self._pairs, self.num_entities)
+        pairs = self._pairs[~(changed[i] | changed[j])]
+
+        add = idxs[present[idxs]]
+        new_keys, new_ids = self._entries(add, cells[add])
+        order = np.argsort(new_keys, kind="stable")
+        new_keys, new_ids = new_keys[order], new_ids[order]
+        pos = np.searchsorted(keys, new_keys)
+        keys = np.insert(keys, pos, new_keys)
+        ids = np.insert(ids, pos, new_ids)
+
+        # pair each new entry with every entry sharing its cell
+        lo = np.searchsorted(keys, new_keys, side="left")
+        counts = np.searchsorted(keys, new_keys, side="right") - lo
+        others = ids[_ragged_range(lo, counts)]
+        owners = np.repeat(new_ids, counts)
+        distinct = owners != others
+        pairs = np.union1d(pairs, self._encode(owners[distinct], others[distinct]))
+
+        self._keys, self._ids, self._pairs = keys, ids, pairs
+        self._cells[changed] = cells[changed]
+        self._present = present
+        return idxs
+
+    def candidate_pairs(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the indices i < j of the entities sharing at least one cell."""
+        return np.divmod(self._pairs, self.num_entities)
+
+    def query(self, bounds: ArrayLike) -> np.ndarray:
+        """
+        Return the entities in the cells overlapping an axis-aligned box.
+
+        Parameters
+        ----------
+        bounds : ArrayLike
+            The bounds xmin, ymin, xmax, ymax of the box.
+
+        Returns
+        -------
+        np.ndarray
+            The sorted indices of the entities whose cells overlap the box. This
+            includes every entity whose bounding box intersects the box.
+
+        """
+        bounds = np.asarray(bounds, dtype=np.float64)
+        if not np.isfinite(bounds).all():
+            return np.empty(0, dtype=np.int64)
+        cells = self._cell_range(bounds)
+        num_cells = (cells[2] - cells[0] + 1) * (cells[3] - cells[1] + 1)
+        if num_cells > self._keys.shape[0]:
+            # cheaper to check every entry than every cell
+            ix, iy = self._keys >> 32, self._keys & 0xFFFFFFFF
+            iy = np.where(iy >= 1 << 31, iy - (1 << 32), iy)
+            inside = (
+                (ix >= cells[0])
+                & (ix <= cells[2])
+                & (iy >= cells[1])
+                & (iy <= cells[3])
+            )
+            return np.unique(self._ids[inside])
+        keys, _ = self._entries(np.zeros(1, dtype=np.int64), cells[None])
+        lo = np.searchsorted(self._keys, keys, side="left")
+        counts = np.searchsorted(self._keys, keys, side="right") - lo
+        return np.unique(self._ids[_ragged_range(lo, counts)])
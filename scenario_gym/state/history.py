@@ -0,0 +1,299 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from scenario_gym.precision import DTypeLike, resolve_dtype
+from scenario_gym.utils import ArrayLike
+
+
+class PoseHistory:
+    """
+    Preallocated buffers storing the recorded poses of each entity.
+
+    Each entity has a (capacity, 7) buffer of rows [t, x, y, z, h, p, r] which
+    is grown by doubling when it is full so appending is amortised O(1).
+    Recorded poses are returned as read-only views of the buffers without
+    copying.
+
+    If `max_length` is given then only the most recent `max_length` poses of
+    each entity are kept in a ring buffer so memory is constant. Each row is
+    written twice in a buffer of size 2 * max_length so that the window is
+    always a contiguous slice. Views of a bounded history are overwritten as
+    new poses are recorded so should be copied if they are to be kept. A
+    `max_length` of 0 disables recording.
+
+    If `dtype` is not float64 then each row is stored as a record of a float64
+    time and the pose in `dtype`. The recorded poses of an entity are returned
+    as views of a float64 copy of its buffer which is created on the first
+    call to `get` and afterwards only converts the rows recorded since the
+    last call.
+    """
+
+    def __init__(
+        self,
+        num_entities: int,
+        capacity: int = 64,
+        max_length: Optional[int] = None,
+        dtype: Optional[DTypeLike] = None,
+    ):
+        """
+        Create empty buffers for the entities.
+
+        Parameters
+        ----------
+        num_entities : int
+            The number of entities.
+
+        capacity : int
+            The initial number of rows allocated for each entity. Buffers are
+            allocated on the first recorded pose.
+
+        max_length : Optional[int]
+            The maximum number of poses kept for each entity. If None then the
+            full history is kept.
+
+        dtype : Optional[DTypeLike]
+            The dtype used to store the poses. By default the global precision
+            is used.
+
+        """
+        if max_length is not None:
+            max_length = int(max_length)
+            if max_length < 0:
+                raise ValueError("max_length must be non-negative.")
+        self.num_entities = num_entities
+        self.capacity = max(1, capacity)
+        self.max_length = max_length
+        self._buffers: List[Optional[np.ndarray]] = [None] * num_entities
+        self._counts = np.zeros(num_entities, dtype=int)
+        self._shared = np.zeros(num_entities, dtype=bool)
+        self._mirrors: List[Optional[np.ndarray]] = [None] * num_entities
+        self._mirrored = np.zeros(num_entities, dtype=int)
+        self.dtype = resolve_dtype(dtype)
+        if self.dtype == np.float64:
+            self._row = None
+        else:
+            self._row = np.dtype([("t", np.float64), ("pose", self.dtype, (6,))])
+
+    def _empty(self, rows: int) -> np.ndarray:
+        """Allocate a buffer with the given number of rows."""
+        if self._row is None:
+            return np.empty((rows, 7))
+        return np.empty(rows, dtype=self._row)
+
+    def _write(
+        self, buf: np.ndarray, rows: ArrayLike, t: ArrayLike, pose: np.ndarray
+    ):
+        """Write poses to rows of a buffer."""
+        if self._row is None:
+            buf[rows, 0] = t
+            buf[rows, 1:] = pose
+        else:
+            buf["t"][rows] = t
+            buf["pose"][rows] = pose
+
+    @property
+    def enabled(self) -> bool:
+        """Return True if poses are recorded."""
+        return self.max_length != 0
+
+    @property
+    def truncated(self) -> bool:
+        """Return True if any recorded poses have been discarded."""
+        return self.max_length is not None and bool(
+            (self._counts > self.max_length).any()
+        )
+
+    def __len__(self) -> int:
+        """Return the number of entities."""
+        return self.num_entities
+
+    def append(self, t: float, poses: np.ndarray, active: np.ndarray) -> None:
+        """
+        Record the poses of the active entities at time t.
+
+        Parameters
+        ----------
+        t : float
+            The time of the poses.
+
+        poses : np.ndarray
+            Entity-indexed array of poses with shape (num_entities, 6).
+
+        active : np.ndarray
+            Boolean mask of the entities whose poses should be recorded.
+
+        """
+        self._invalidate()
+        if self.max_length is not None:
+            return self._append_window(t, poses, active)
+        buffers, counts = self._buffers, self._counts
+        for i in np.flatnonzero(active):
+            buf, c = buffers[i], counts[i]
+            if buf is None:
+                buf = buffers[i] = self._empty(self.capacity)
+            elif c == buf.shape[0] or self._shared[i]:
+                new_buf = self._empty(max(2 * c, buf.shape[0]))
+                new_buf[:c] = buf[:c]
+                buf = buffers[i] = new_buf
+                self._shared[i] = False
+            self._write(buf, c, t, poses[i])
+            counts[i] = c + 1
+
+    def _append_window(
+        self, t: float, poses: np.ndarray, active: np.ndarray
+    ) -> None:
+        """Record poses into the ring buffers."""
+        k = self.max_length
+        if k == 0:
+            self._counts[active] += 1
+            return
+        buffers, counts = self._buffers, self._counts
+        for i in np.flatnonzero(active):
+            buf = buffers[i]
+            if buf is None:
+                buf = buffers[i] = self._empty(2 * k)
+            elif self._shared[i]:
+                buf = buffers[i] = buf.copy()
+                self._shared[i] = False
+            p = counts[i] % k
+            self._write(buf, [p, p + k], t, poses[i])
+            counts[i] += 1
+
+    def extend(
+        self, ts: np.ndarray, poses: np.ndarray, active: np.ndarray
+    ) -> np.ndarray:
+        """
+        Record the poses of the active entities over many timesteps.
+
+        Equivalent to calling `append` at each time but the poses of each entity
+        are written to its buffer in a single operation when the full history is
+        kept.
+
+        Parameters
+        ----------
+        ts : np.ndarray
+            The times of the poses with shape (T,).
+
+        poses : np.ndarray
+            Entity-indexed poses with shape (T, num_entities, 6).
+
+        active : np.ndarray
+            Boolean mask of shape (T, num_entities) of the poses to record.
+
+        Returns
+        -------
+        np.ndarray
+            The number of poses recorded for each entity after each timestep
+            with shape (T, num_entities) which may be passed to `rewind`.
+
+        """
+        self._invalidate()
+        counts = self._counts + np.cumsum(active, axis=0)
+        if self.max_length is not None:
+            for t, pose, act in zip(ts, poses, active):
+                self._append_window(t, pose, act)
+            return counts
+        buffers = self._buffers
+        for i in np.flatnonzero(active.any(axis=0)):
+            rows = active[:, i]
+            buf, c = buffers[i], self._counts[i]
+            end = counts[-1, i]
+            if buf is None or end > buf.shape[0] or self._shared[i]:
+                size = self.capacity if buf is None else buf.shape[0]
+                while size < end:
+                    size *= 2
+                new_buf = self._empty(size)
+                if buf is not None:
+                    new_buf[:c] = buf[:c]
+                buf = buffers[i] = new_buf
+                self._shared[i] = False
+            self._write(buf, slice(c, end), ts[rows], poses[rows, i])
+        self._counts = counts[-1].copy()
+        return counts
+
+    def rewind(self, counts: np.ndarray) -> None:
+        """
+        Show the recorded poses as of an earlier timestep of `extend`.
+
+        Sets the number of recorded poses of each entity so that the history
+        can be stepped through the timesteps written by the last call to
+        `extend`. Poses after the counts are overwritten as new poses are
+        recorded. The ring buffers of a bounded history overwrite earlier poses
+        so it can only be rewound if recording is disabled.
+
+        Parameters
+        ----------
+        counts : np.ndarray
+            The number of poses of each entity. Must be a row of the counts
+            returned by the last call to `extend`.
+
+        """
+        if self.max_length:
+            raise ValueError("A bounded history cannot be rewound.")
+        self._counts = np.array(counts)
+
+    def _invalidate(self) -> None:
+        """Mark the converted rows which are about to be overwritten."""
+        if self._row is not None:
+            np.minimum(self._mirrored, self._counts, out=self._mirrored)
+
+    def _mirror(self, idx: int) -> np.ndarray:
+        """Return the float64 copy of a buffer converting any new rows."""
+        buf, c = self._buffers[idx], self._counts[idx]
+        mirror, done = self._mirrors[idx], self._mirrored[idx]
+        if mirror is None or mirror.shape[0] != buf.shape[0]:
+            new_mirror = np.empty((buf.shape[0], 7))
+            if mirror is not None and self.max_length is None:
+                new_mirror[:done] = mirror[:done]
+            else:
+                done = 0
+            mirror = self._mirrors[idx] = new_mirror
+        if self.max_length is None:
+            rows = slice(done, c)
+        else:
+            k = self.max_length
+            rows = np.arange(max(done, c - k), c) % k
+            rows = np.concatenate([rows, rows + k])
+        mirror[rows, 0] = buf["t"][rows]
+        mirror[rows, 1:] = buf["pose"][rows]
+        self._mirrored[idx] = c
+        return mirror
+
+    def get(self, idx: int) -> np.ndarray:
+        """Return a read-only (num_poses, 7) view of an entity's history."""
+        buf = self._buffers[idx]
+        if buf is None:
+            return np.empty((0, 7))
+        if self._row is not None:
+            buf = self._mirror(idx)
+        c = self._counts[idx]
+        if self.max_length is None:
+            view = buf[:c]
+        else:
+            n = min(c, self.max_length)
+            start = (c - n) % self.max_length
+            view = buf[start : start + n]
+        view.flags.writeable = False
+        return view
+
+    def snapshot(self) -> Tuple[List[Optional[np.ndarray]], np.ndarray]:
+        """
+        Capture the recorded poses without copying the buffers.
+
+        The buffers are shared copy-on-write: both the history and the snapshot
+        keep the same arrays and a buffer is copied before it is next written.
+        """
+        self._shared[:] = True
+        return list(self._buffers), self._counts.copy()
+
+    def restore(
+        self, snapshot: Tuple[List[Optional[np.ndarray]], np.ndarray]
+    ) -> None:
+        """Restore the recorded poses from a snapshot."""
+        buffers, counts = snapshot
+        self._buffers = list(buffers)
+        self._counts = counts.copy()
+        self._shared[:] = True
+        self._mirrors = [None] * self.num_entities
+        self._mirrored[:] = 0
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from heapq import heapify, heappop, heappush
+from typing import List, Tuple, TypeVar
+
+from scenario_gym.scenario import ScenarioAction
+
+State = TypeVar("State")
+
+
+class ActionScheduler:
+    """
+    Schedules the scenario actions to be applied during a simulation.
+
+    Actions with a `trigger_time` are kept in a heap ordered by time and only
+    have their trigger condition checked once the state time reaches it. All
+    other actions have their trigger condition checked at every step.
+    """
+
+    def __init__(self, actions: List[ScenarioAction]):
+        """
+        Schedule the actions.
+
+        Parameters
+        ----------
+        actions : List[ScenarioAction]
+            The actions to be applied. Actions triggered at the same step are
+            returned in the order of this list.
+
+        """
+        self.actions = actions
+        self._heap: List[Tuple[float, int]] = []
+        self._polled: List[int] = []
+        for idx, action in enumerate(actions):
+            t = action.trigger_time
+            if t is None:
+                self._polled.append(idx)
+            else:
+                self._heap.append((t, idx))
+        heapify(self._heap)
+
+    def __len__(self) -> int:
+        """Return the number of unapplied actions."""
+        return len(self._heap) + len(self._polled)
+
+    @property
+    def unapplied(self) -> List[ScenarioAction]:
+        """Get the unapplied actions in their original order."""
+        idxs = sorted([idx for _, idx in self._heap] + self._polled)
+        return [self.actions[idx] for idx in idxs]
+
+    def pop_triggered(self, state: State) -> List[ScenarioAction]:
+        """Remove and return the actions whose trigger condition is met."""
+        triggered, deferred = [], []
+        heap = self._heap
+        while heap and heap[0][0] <= state.t:
+            item = heappop(heap)
+            if self.actions[item[1]].trigger_condition(state):
+                triggered.append(item[1])
+            else:
+                deferred.append(item)
+        for item in deferred:
+            heappush(heap, item)
+
+        if self._polled:
+            polled = []
+            for idx in self._polled:
+                if self.actions[idx].trigger_condition(state):
+                    triggered.append(idx)
+                else:
+                    polled.append(idx)
+            self._polled = polled
+
+        triggered.sort()
+        return [self.actions[idx] for idx in triggered]
+
+    def copy(self) -> ActionScheduler:
+        """Copy the scheduler without copying the actions."""
+        new = self.__class__.__new__(self.__class__)
+        new.actions = self.actions
+        new._heap = self._heap.copy()
+        new._polled = self._polled.copy()
+        return new
@@ -2,22 +2,75 @@ from __future__ import annotations
 
 import warnings
 from copy import deepcopy
-from typing import Any, Callable, Dict, List, Optional, Tuple, Type, TypeVar, Union
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 import numpy as np
 from shapely.geometry import MultiPolygon, Point, Polygon
 from shapely.vectorized import contains
 
 from scenario_gym.callback import StateCallback
-from scenario_gym.entity import BatchReplayEntity, Entity
-from scenario_gym.road_network import RoadObject
+from scenario_gym.entity import (
+    BatchReplayEntity,
+    Entity,
+    ReplayCache,
+    pack_trajectories,
+)
+from scenario_gym.precision import DTypeLike, resolve_dtype
+from scenario_gym.profiling import span
+from scenario_gym.road_network import FrenetFrame, RoadObject
 from scenario_gym.scenario import Scenario, ScenarioAction
-from scenario_gym.state.utils import detect_collisions
-from scenario_gym.trajectory import Trajectory, is_stationary
+from scenario_gym.state.grid import SpatialHashGrid
+from scenario_gym.state.history import PoseHistory
+from scenario_gym.state.scheduler import ActionScheduler
+from scenario_gym.state.utils import (
+    EntityArrayView,
+    aabbs_overlap,
+    box_aabbs,
+    box_dimensions,
+    boxes_intersect,
+    collision_dict,
+    oriented_boxes,
+)
+from scenario_gym.trajectory import Trajectory, TrajectoryBatch, is_stationary
 
 Agent = TypeVar("Agent")
 
 
+@dataclass
+class StateSnapshot:
+    """The simulation data of a state at a single timestep."""
+
+    t: Optional[float]
+    prev_t: Optional[float]
+    next_t: Optional[float]
+    is_done: bool
+    last_keystroke: Optional[int]
+    poses: np.ndarray
+    prev_poses: np.ndarray
+    prev_active: np.ndarray
+    velocities: np.ndarray
+    distances: np.ndarray
+    active: np.ndarray
+    history: Tuple[List[Optional[np.ndarray]], np.ndarray]
+    scheduler: ActionScheduler
+    action_apply_times: Dict[ScenarioAction, float]
+    entity_state: Dict[Entity, Any]
+    callbacks: List[StateCallback]
+    agents: Optional[Dict[Entity, Dict[str, Any]]]
+
+
 class State:
     """
     The global state of the gym.
@@ -38,6 +91,10 @@ class State:
         persist: bool = False,
         conditions: Optional[List[Union[str, Callable[[State], bool]]]] = None,
         state_callbacks: Optional[Dict[str, StateCallback]] = None,
+        max_history: Optional[int] = None,
+        replay_cache: Optional[ReplayCache] = None,
+        dtype: Optional[DTypeLike] = None,
+        grid_cell_size: float = 10.0,
     ):
         """
         Init the state.
@@ -62,6 +119,23 @@ class State:
             Can be used to add additional information to the state that can is then
             accessible by all agents.
 
+        max_history : Optional[int]
+            The maximum number of recorded poses kept for each entity. If None
+            the full history is kept. If 0 then no history is recorded.
+
+        replay_cache : Optional[ReplayCache]
+            A cache of packed trajectories reused when the same scenario is
+            simulated again.
+
+        dtype : Optional[DTypeLike]
+            The dtype used to store poses and velocities. Times and distances
+            travelled are always float64. By default the global precision is
+            used.
+
+        grid_cell_size : float
+            The cell size of the spatial hash grid of entity bounding boxes used
+            to find collisions and entities near a location.
+
         """
         self._scenario = scenario
         self.scenario_path = scenario_path
@@ -74,6 +148,10 @@ class State:
                 for cond in conditions
             ]
         self.state_callbacks = [] if state_callbacks is None else state_callbacks
+        self.max_history = max_history
+        self.replay_cache = replay_cache
+        self.dtype = resolve_dtype(dtype)
+        self.grid_cell_size = grid_cell_size
 
         self.next_t: Optional[float] = None
         self._t: Optional[float] = None
@@ -82,21 +160,36 @@ class State:
         self.last_keystroke: Optional[int] = None
 
         self._collisions: Optional[Dict[Entity, List[Entity]]] = None
+        self._collision_source: Optional[Callable[[], None]] = None
+        self._boxes: Optional[np.ndarray] = None
+        self._aabbs: Optional[np.ndarray] = None
         self._callbacks: Dict[Type[StateCallback], StateCallback] = {}
 
-        self.unapplied_actions: List[ScenarioAction]
+        self._scheduler: ActionScheduler
         self.action_apply_times: Dict[ScenarioAction, float]
 
         self.all_entities: List[Entity]
-        self.poses: Dict[Entity, np.ndarray]
-        self.prev_poses: Dict[Entity, np.ndarray]
-        self.velocities: Dict[Entity, np.ndarray]
-        self.distances: Dict[Entity, float]
+        self.entity_indices: Dict[Entity, int]
+        self.trajectories: TrajectoryBatch
+        self.poses: EntityArrayView
+        self.prev_poses: EntityArrayView
+        self.velocities: EntityArrayView
+        self.distances: EntityArrayView
         self.entity_state: Dict[Entity, Any]
-        self._recorded_poses: Dict[Entity, List[Tuple[float, np.ndarray]]]
+        self._poses: np.ndarray
+        self._prev_poses: np.ndarray
+        self._velocities: np.ndarray
+        self._distances: np.ndarray
+        self._active: np.ndarray
+        self._history: PoseHistory
+        self._grid: SpatialHashGrid
+        self._box_dims: np.ndarray
+        self._max_offset: float
 
         self.agents: Dict[Entity, Agent] = {}
-        self.non_agents = BatchReplayEntity(persist=persist)
+        self.non_agents = BatchReplayEntity(
+            persist=persist, cache=replay_cache, dtype=self.dtype
+        )
 
     @property
     def scenario(self) -> Scenario:
@@ -117,21 +210,18 @@ class State:
         self.is_done = False
 
         # set initial poses
-        # always use extrapolation for previous poses to get the initial velocity
-        velocities, poses = {}, {}
-        for entity in self.all_entities:
-            pose = entity.trajectory.position_at_t(
-                t_0,
-                extrapolate=(
-                    entity.is_static()
-                    or ((False, False) if self.persist else False)
-                ),
-            )
-            if pose is not None:
-                poses[entity] = pose
-                velocities[entity] = entity.trajectory.velocity_at_t(t_0)
-        self.update_poses(t_0, poses)
-        self.velocities.update(velocities)
+        # static entities are extrapolated and persistent entities are fixed
+        trajs = self.trajectories
+        static = trajs.is_static
+        poses = np.where(
+            static[:, None],
+            trajs.positions_at_t(t_0, extrapolate=True),
+            trajs.positions_at_t(t_0),
+        )
+        active = static | trajs.active_mask(t_0) | self.persist
+        poses[~active] = np.nan
+        self.update_pose_array(t_0, poses, active)
+        self._velocities[active] = trajs.velocities_at_t(t_0)[active]
         self.prev_t = t_0 - 0.1
         self.update_actions()
 
@@ -147,32 +237,162 @@ class State:
         self.next_t: Optional[float] = None
         self._t: Optional[float] = None
         self._prev_t: Optional[float] = None
-        self.unapplied_actions = self.scenario.actions.copy()
+        self._scheduler = ActionScheduler(self.scenario.actions.copy())
         self.action_apply_times = {
             a: float("nan") for a in self.scenario.actions.copy()
         }
 
         self.all_entities = self.scenario.entities.copy()
-        self.poses: Dict[Entity, np.ndarray] = {}
-        self.prev_poses: Dict[Entity, np.ndarray] = {}
-        self.velocities: Dict[Entity, np.ndarray] = {}
-        self.distances: Dict[Entity, float] = dict.fromkeys(self.all_entities, 0.0)
+        self.entity_indices = {e: i for i, e in enumerate(self.all_entities)}
+        self.trajectories = pack_trajectories(
+            [e.trajectory for e in self.all_entities],
+            cache=self.replay_cache,
+            dtype=self.dtype,
+        )
+        n = len(self.all_entities)
+        self._active = np.zeros(n, dtype=bool)
+        self._poses = np.full((n, 6), np.nan, dtype=self.dtype)
+        self._velocities = np.full((n, 6), np.nan, dtype=self.dtype)
+        self._distances = np.zeros(n)
+        self._set_views(self._poses, self._active, self._poses, self._active)
         self.entity_state: Dict[Entity, Any] = dict.fromkeys(self.all_entities)
-        self._recorded_poses: Dict[Entity, List[Tuple[float, np.ndarray]]] = {}
-        for entity in self.all_entities:
-            self._recorded_poses[entity] = []
+        self._history = PoseHistory(
+            n, max_length=self.max_history, dtype=self.dtype
+        )
+        self._grid = SpatialHashGrid(n, cell_size=self.grid_cell_size)
+        self._box_dims = box_dimensions(self.all_entities)
+        self._max_offset = float(
+            np.hypot(self._box_dims[:, 2], self._box_dims[:, 3]).max(initial=0.0)
+        )
+        self._boxes = None
 
     def step(self, new_poses: Dict[Entity, np.ndarray]) -> None:
         """Update by one timestep."""
         self._clear_cache()
-        self.update_poses(self.next_t, new_poses.copy())
-        self.update_actions()
+        with span("state", "poses"):
+            self.update_poses(self.next_t, new_poses)
+        self._post_step()
+
+    def step_pose_array(self, poses: np.ndarray, active: np.ndarray) -> None:
+        """
+        Update by one timestep from entity-indexed arrays.
+
+        See `update_pose_array` for the format of the arrays.
+        """
+        self._clear_cache()
+        with span("state", "poses"):
+            self.update_pose_array(self.next_t, poses, active)
+        self._post_step()
+
+    def iter_pose_arrays(
+        self, ts: np.ndarray, poses: np.ndarray, active: np.ndarray
+    ) -> Iterator[None]:
+        """
+        Update the state over many timesteps from precomputed poses.
+
+        Equivalent to calling `step_pose_array` at each time but the velocities,
+        distances travelled, recorded poses and `max_length` terminal condition
+        of every timestep are computed at once. The state is then moved through
+        the timesteps applying the actions, callbacks and other terminal
+        conditions and yields after each one e.g. so that metrics can be
+        updated. Iteration stops after the first terminal timestep.
+
+        Recorded poses are written in bulk unless the history is bounded in
+        which case they are appended at each timestep.
+
+        Parameters
+        ----------
+        ts : np.ndarray
+            The times of the timesteps with shape (T,).
+
+        poses : np.ndarray
+            Entity-indexed poses with shape (T, num_entities, 6). Rows of
+            inactive entities are ignored.
+
+        active : np.ndarray
+            Boolean array of shape (T, num_entities) indicating which entities
+            are present at each time.
+
+        """
+        if ts.shape[0] == 0:
+            return
+        with span("state", "poses"):
+            poses = np.asarray(poses, dtype=self.dtype)
+            prev_ts = np.hstack([self.t, ts[:-1]])
+            prev = np.concatenate([self._poses[None], poses[:-1]])
+            new = active & ~np.concatenate([self._active[None], active[:-1]])
+            rows = np.flatnonzero(new.any(axis=1))
+            if rows.size > 0:
+                # entities appear at their extrapolated previous position
+                start = self.trajectories.positions_at_t(
+                    prev_ts[rows], extrapolate=True
+                )
+                prev[rows] = np.where(new[rows, :, None], start, prev[rows])
+
+            dts = ts - prev_ts
+            delta = np.subtract(poses, prev, dtype=float)
+            velocities = (delta / dts[:, None, None]).astype(self.dtype, copy=False)
+            moved = np.where(active, np.linalg.norm(delta[..., :3], axis=-1), 0.0)
+            distances = np.cumsum(
+                np.concatenate([self._distances[None], moved]), axis=0
+            )[1:]
+
+            max_length = TERMINAL_CONDITIONS["max_length"]
+            conditions = [
+                c for c in self.terminal_conditions if c is not max_length
+            ]
+            if len(conditions) < len(self.terminal_conditions):
+                ends = ts + dts > self.scenario.length
+            else:
+                ends = np.zeros(ts.shape[0], dtype=bool)
+
+            history = self._history
+            bulk = not history.max_length
+            if bulk:
+                counts = history.extend(ts, poses, active)
+                initial = counts[0] - active[0]
+
+        k = -1
+        try:
+            for k in range(ts.shape[0]):
+                self._clear_cache()
+                self.next_t = self.t = ts[k]
+                self._poses, self._prev_poses = poses[k], prev[k]
+                self._velocities, self._distances = velocities[k], distances[k]
+                self._active = active[k]
+                self._set_views(poses[k], active[k], prev[k], active[k])
+                if bulk:
+                    history.rewind(counts[k])
+                else:
+                    history.append(ts[k], poses[k], active[k])
+
+                with span("state", "actions"):
+                    self.update_actions()
+                self.update_callbacks()
+                with span("state", "terminal"):
+                    self.is_done = bool(ends[k]) or any(
+                        cond(self) for cond in conditions
+                    )
+                yield
+                if self.is_done:
+                    return
+        finally:
+            if bulk:
+                history.rewind(counts[k] if k >= 0 else initial)
+
+    def _post_step(self) -> None:
+        """Update actions, callbacks and the terminal state after new poses."""
+        with span("state", "actions"):
+            self.update_actions()
         self.update_callbacks()
-        self.is_done = self.check_terminal()
+        with span("state", "terminal"):
+            self.is_done = self.check_terminal()
 
     def _clear_cache(self) -> None:
         """Clear cached data on step."""
         self._collisions = None
+        self._collision_source = None
+        self._boxes = None
         self._callbacks = {}
 
     @property
@@ -204,50 +424,167 @@ class State:
         """
         Update poses of all entities.
 
-        The poses dictionary will be replaced with the new_poses and previous poses
+        The poses will be replaced with the new_poses and previous poses
         will be updated for those entities in new_poses. For an entity in new_poses
         which is not in the current poses (i.e. a new entity) the previous pose will
         be estimated using trajectory extrapolation (to correctly calculate the
         initial velocity).
+        """
+        n = len(self.all_entities)
+        poses = np.full((n, 6), np.nan, dtype=self.dtype)
+        active = np.zeros(n, dtype=bool)
+        if new_poses:
+            idxs = [self.entity_indices[e] for e in new_poses]
+            poses[idxs] = np.array(list(new_poses.values()))
+            active[idxs] = True
+        self.update_pose_array(t, poses, active)
+
+    def update_pose_array(
+        self, t: float, poses: np.ndarray, active: np.ndarray
+    ) -> None:
+        """
+        Update poses of all entities from an entity-indexed array.
+
+        Parameters
+        ----------
+        t : float
+            The time of the new poses.
+
+        poses : np.ndarray
+            Array of shape (num_entities, 6) with the pose of each entity in the
+            order of `all_entities`. Rows of inactive entities are ignored. The
+            array should not be modified after it is passed to the state. It is
+            converted to the dtype of the state if needed.
+
+        active : np.ndarray
+            Boolean array of shape (num_entities,) indicating which entities are
+            present at time t.
+
         """
         self.t = t
+        poses = np.asarray(poses, dtype=self.dtype)
 
-        prev_poses = {}
-        for e in new_poses:
-            if e in self.poses:
-                prev_poses[e] = self.poses[e]
-            elif self.prev_t is not None:
-                prev_poses[e] = e.trajectory.position_at_t(
+        prev_poses, prev_active = self._poses, self._active
+        if self.prev_t is None:
+            prev_mask = np.zeros_like(active)
+        else:
+            prev_mask = active
+            new_idxs = np.flatnonzero(active & ~prev_active)
+            if new_idxs.size > 0:
+                prev_poses = prev_poses.copy()
+                prev_poses[new_idxs] = self.trajectories.positions_at_t(
                     self.prev_t, extrapolate=True
-                )
-        self.prev_poses = prev_poses
-        self.poses = new_poses
+                )[new_idxs]
+
+        self._prev_poses = prev_poses
+        self._poses = poses
+        self._active = active
         if self.prev_t is not None:
             self.update_statistics()
-        for entity, pose in self.poses.items():
-            self._recorded_poses[entity].append((self.t, pose))
+        else:
+            self._velocities = np.full_like(poses, np.nan)
+        self._set_views(poses, active, prev_poses, prev_mask)
+        self._history.append(self.t, poses, active)
 
     def update_statistics(self) -> None:
         """Update entity velocities and distance travelled."""
-        self.velocities = {}
-        for entity in self.poses:
-            self.velocities[entity] = (
-                self.poses[entity] - self.prev_poses[entity]
-            ) / self.dt
-            self.distances[entity] += np.linalg.norm(
-                (self.poses[entity] - self.prev_poses[entity])[:3]
-            )
+        delta = np.subtract(self._poses, self._prev_poses, dtype=float)
+        self._velocities = (delta / self.dt).astype(self.dtype, copy=False)
+        self._distances[self._active] += np.linalg.norm(
+            delta[self._active, :3], axis=1
+        )
+
+    def _set_views(
+        self,
+        poses: np.ndarray,
+        active: np.ndarray,
+        prev_poses: np.ndarray,
+        prev_active: np.ndarray,
+    ) -> None:
+        """Create the dictionary views of the entity-indexed arrays."""
+        ents, idxs = self.all_entities, self.entity_indices
+        self.poses = EntityArrayView(ents, idxs, poses, active)
+        self.prev_poses = EntityArrayView(ents, idxs, prev_poses, prev_active)
+        self.velocities = EntityArrayView(ents, idxs, self._velocities, active)
+        self.distances = EntityArrayView(ents, idxs, self._distances)
+
+    @property
+    def pose_array(self) -> np.ndarray:
+        """Get the (num_entities, 6) array of current entity poses."""
+        return self._poses
+
+    @property
+    def prev_pose_array(self) -> np.ndarray:
+        """Get the (num_entities, 6) array of previous entity poses."""
+        return self._prev_poses
+
+    @property
+    def velocity_array(self) -> np.ndarray:
+        """Get the (num_entities, 6) array of current entity velocities."""
+        return self._velocities
+
+    @property
+    def distance_array(self) -> np.ndarray:
+        """Get the (num_entities,) array of distances travelled."""
+        return self._distances
+
+    @property
+    def active_mask(self) -> np.ndarray:
+        """Get the (num_entities,) mask of entities present in the state."""
+        return self._active
+
+    def frenet_pose_array(self, frame: FrenetFrame) -> np.ndarray:
+        """
+        Get the (num_entities, 6) array of current poses in Frenet coordinates.
+
+        The columns are s, d, z, h, p, r with the heading relative to the frame
+        (see `FrenetFrame.poses_to_frenet`). Rows of entities which are not
+        present are nan.
+
+        Parameters
+        ----------
+        frame : FrenetFrame
+            The Frenet frame e.g. `lane.frenet` for a lane.
+
+        """
+        poses = frame.poses_to_frenet(self._poses)
+        poses[~self._active] = np.nan
+        return poses
+
+    def pose_array_from_frenet(
+        self, frame: FrenetFrame, poses: np.ndarray
+    ) -> np.ndarray:
+        """
+        Transform an entity-indexed array of poses from Frenet coordinates.
+
+        The inverse of `frenet_pose_array` returning poses with the dtype of the
+        state which may be passed to `update_pose_array`.
+
+        Parameters
+        ----------
+        frame : FrenetFrame
+            The Frenet frame of the poses.
+
+        poses : np.ndarray
+            Array of shape (num_entities, 6) with columns s, d, z, h, p, r.
+
+        """
+        return frame.poses_from_frenet(poses).astype(self.dtype, copy=False)
+
+    @property
+    def unapplied_actions(self) -> List[ScenarioAction]:
+        """Get the actions which have not yet been applied."""
+        return self._scheduler.unapplied
+
+    @unapplied_actions.setter
+    def unapplied_actions(self, actions: List[ScenarioAction]) -> None:
+        self._scheduler = ActionScheduler(actions)
 
     def update_actions(self) -> None:
         """Update state actions."""
-        unapplied: List[ScenarioAction] = []
-        for act in self.unapplied_actions:
-            if act.trigger_condition(self):
-                self.apply_action(act)
-                self.action_apply_times[act] = self.t
-            else:
-                unapplied.append(act)
-        self.unapplied_actions = unapplied
+        for act in self._scheduler.pop_triggered(self):
+            self.apply_action(act)
+            self.action_apply_times[act] = self.t
 
     def apply_action(self, action: ScenarioAction) -> None:
         """Apply an action to the state."""
@@ -263,7 +600,8 @@ class State:
     def update_callbacks(self) -> None:
         """Update all state callbacks."""
         for m in self.state_callbacks:
-            m(self)
+            with span("callback", m):
+                m(self)
 
     def check_terminal(self) -> bool:
         """Check if the state is terminal."""
@@ -273,21 +611,107 @@ class State:
         self,
         entity: Optional[Entity] = None,
     ) -> Union[np.ndarray, Dict[Entity, np.ndarray]]:
-        """Get recorded poses for each or a given entity."""
+        """
+        Get recorded poses for each or a given entity.
+
+        Poses are returned as read-only views of arrays of shape (num_poses, 7)
+        with columns t, x, y, z, h, p, r.
+        """
         if entity is not None:
-            poses = self._recorded_poses.get(entity, None)
-            if not poses:
+            idx = self.entity_indices.get(entity)
+            if idx is None:
                 return np.empty((0, 7))
-            ts, poses = map(np.array, zip(*poses))
-            return np.concatenate([ts[:, None], poses], axis=1)
-        data: Dict[Entity, np.ndarray] = {}
-        for ent, poses in self._recorded_poses.items():
-            if not poses:
-                data[ent] = np.empty((0, 7))
-            else:
-                ts, poses = map(np.array, zip(*poses))
-                data[ent] = np.concatenate([ts[:, None], poses], axis=1)
-        return data
+            return self._history.get(idx)
+        return {
+            ent: self._history.get(idx) for ent, idx in self.entity_indices.items()
+        }
+
+    def _shared_memo(self) -> Dict[int, Any]:
+        """Get a deepcopy memo so that scenario data is never copied."""
+        scenario = self.scenario
+        shared = [scenario, scenario.road_network, *scenario.actions]
+        for entity in self.all_entities:
+            shared.extend((entity, entity.catalog_entry, entity.trajectory))
+        for agent in self.agents.values():
+            shared.append(agent.trajectory)
+        return {id(obj): obj for obj in shared}
+
+    def snapshot(self, include_agents: bool = True) -> StateSnapshot:
+        """
+        Capture the simulation data of the state at the current time.
+
+        Entity poses, velocities, recorded poses, applied actions and the state
+        callbacks are captured so that the simulation can later be restored to
+        this time with `restore`. The scenario, road network, entities and
+        trajectories are shared rather than copied and the recorded poses are
+        shared copy-on-write.
+
+        Parameters
+        ----------
+        include_agents : bool
+            Whether to capture the internal state of the agents. The attributes
+            of each agent (including its sensor and controller) are copied.
+
+        """
+        memo = self._shared_memo()
+        return StateSnapshot(
+            t=self._t,
+            prev_t=self._prev_t,
+            next_t=self.next_t,
+            is_done=self.is_done,
+            last_keystroke=self.last_keystroke,
+            poses=self._poses,
+            prev_poses=self._prev_poses,
+            prev_active=self.prev_poses.mask,
+            velocities=self._velocities,
+            distances=self._distances.copy(),
+            active=self._active,
+            history=self._history.snapshot(),
+            scheduler=self._scheduler.copy(),
+            action_apply_times=self.action_apply_times.copy(),
+            entity_state=deepcopy(self.entity_state, memo),
+            callbacks=deepcopy(self.state_callbacks, memo),
+            agents=(
+                {e: deepcopy(a.__dict__, memo) for e, a in self.agents.items()}
+                if include_agents
+                else None
+            ),
+        )
+
+    def restore(self, snapshot: StateSnapshot) -> None:
+        """
+        Restore the state to a snapshot taken with `snapshot`.
+
+        The state callbacks and agents are updated in place so that existing
+        references to them remain valid. A snapshot may be restored any number
+        of times.
+        """
+        self._clear_cache()
+        self._t, self._prev_t = snapshot.t, snapshot.prev_t
+        self.next_t = snapshot.next_t
+        self.is_done = snapshot.is_done
+        self.last_keystroke = snapshot.last_keystroke
+        self._poses = snapshot.poses
+        self._prev_poses = snapshot.prev_poses
+        self._velocities = snapshot.velocities
+        self._distances = snapshot.distances.copy()
+        self._active = snapshot.active
+        self._set_views(
+            self._poses, self._active, self._prev_poses, snapshot.prev_active
+        )
+        self._history.restore(snapshot.history)
+        self._scheduler = snapshot.scheduler.copy()
+        self.action_apply_times = snapshot.action_apply_times.copy()
+
+        memo = self._shared_memo()
+        for saved, cb in zip(snapshot.callbacks, self.state_callbacks):
+            memo[id(saved)] = cb
+        self.entity_state = deepcopy(snapshot.entity_state, memo)
+        for saved, cb in zip(snapshot.callbacks, self.state_callbacks):
+            cb.__dict__.update(deepcopy(saved.__dict__, memo))
+        if snapshot.agents is not None:
+            for entity, data in snapshot.agents.items():
+                self.agents[entity].__dict__.update(deepcopy(data, memo))
 
     def get_entity_data(
         self, entity: Entity
@@ -303,10 +727,39 @@ class State:
             self.entity_state.get(entity, None),
         )
 
+    def _update_boxes(self) -> np.ndarray:
+        """
+        Return the oriented bounding boxes of the entities at the current time.
+
+        The spatial hash grid is updated with the new boxes the first time they
+        are computed after the poses change. See `oriented_boxes` for the
+        format of the boxes.
+        """
+        if self._boxes is None:
+            self._boxes = oriented_boxes(self._poses, self._box_dims)
+            self._aabbs = box_aabbs(self._boxes)
+            self._grid.update(self._aabbs, self._active)
+        return self._boxes
+
     def collisions(self) -> Dict[Entity, List[Entity]]:
-        """Return collisions between entities at the current time."""
+        """
+        Return collisions between entities at the current time.
+
+        If a collision source is set e.g. by a `VectorScenarioGym` detecting
+        the collisions of many states at once then it is called to set the
+        collisions of this state on first use.
+        """
+        if self._collisions is None and self._collision_source is not None:
+            self._collision_source()
         if self._collisions is None:
-            self._collisions = detect_collisions(self.poses)
+            boxes = self._update_boxes()
+            i, j = self._grid.candidate_pairs()
+            overlap = aabbs_overlap(self._aabbs, i, j)
+            i, j = i[overlap], j[overlap]
+            hit = boxes_intersect(boxes, i, j)
+            self._collisions = collision_dict(
+                self.all_entities, np.flatnonzero(self._active), i[hit], j[hit]
+            )
         return self._collisions
 
     def get_callback(
@@ -337,6 +790,19 @@ class State:
             *self.poses[e][:2]
         )
 
+    def _query_points(self, bounds: Tuple[float, ...]) -> np.ndarray:
+        """
+        Return candidate entities whose pose point may lie within bounds.
+
+        The grid stores bounding boxes which may be offset from the pose so the
+        bounds are widened by the largest distance from a pose to the center
+        of its box.
+        """
+        self._update_boxes()
+        pad = self._max_offset
+        xmin, ymin, xmax, ymax = bounds
+        return self._grid.query((xmin - pad, ymin - pad, xmax + pad, ymax + pad))
+
     def get_entities_in_area(
         self, area: Union[MultiPolygon, Polygon]
     ) -> List[Entity]:
@@ -349,9 +815,10 @@ class State:
             A shapely geometry covering the chosen area.
 
         """
-        pos = np.array([pose[:2] for pose in self.poses.values()])
+        idxs = self._query_points(area.bounds)
+        pos = self._poses[idxs, :2]
         in_area = contains(area, pos[:, 0], pos[:, 1])
-        return [e for e, b in zip(self.poses, in_area) if b]
+        return [self.all_entities[i] for i in idxs[in_area]]
 
     def get_entities_in_radius(self, x: float, y: float, r: float) -> List[Entity]:
         """
@@ -369,10 +836,19 @@ class State:
             The radius of the center.
 
         """
-        return self.get_entities_in_area(Point(x, y).buffer(r))
+        idxs = self._query_points((x - r, y - r, x + r, y + r))
+        pos = self._poses[idxs, :2]
+        in_radius = np.hypot(pos[:, 0] - x, pos[:, 1] - y) <= r
+        return [self.all_entities[i] for i in idxs[in_radius]]
 
     def to_scenario(self, name: Optional[str] = None) -> Scenario:
         """Create a scenario from the historical data in the state."""
+        if not self._history.enabled or self._history.truncated:
+            raise ValueError(
+                "Cannot create a scenario from the state since the full pose "
+                "history was not recorded. Set `max_history=None` to keep the "
+                "full history."
+            )
         if name is None:
             name = (
                 f"Simulation of {self.scenario.name}"
@@ -384,7 +860,7 @@ class State:
             new_entity = deepcopy(entity)
             if is_stationary(poses):
                 poses = poses[None, 0]
-            new_entity.trajectory = Trajectory(poses)
+            new_entity.trajectory = Trajectory(poses, dtype=self.dtype)
             entities.append(new_entity)
         return Scenario(
             entities,
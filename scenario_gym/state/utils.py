@@ -1,10 +1,199 @@
-from itertools import chain
-from typing import Dict, List, Optional
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 import numpy as np
 
 from scenario_gym.entity import Entity
-from scenario_gym.utils import detect_geom_collisions
+
+
+def box_dimensions(entities: Iterable[Entity]) -> np.ndarray:
+    """
+    Return the bounding box dimensions of entities.
+
+    Returns an array of shape (n, 4) with columns length, width, center_x and
+    center_y.
+    """
+    return np.array(
+        [
+            (bb.length, bb.width, bb.center_x, bb.center_y)
+            for bb in (e.bounding_box for e in entities)
+        ],
+        dtype=np.float64,
+    ).reshape(-1, 4)
+
+
+def oriented_boxes(poses: np.ndarray, dims: np.ndarray) -> np.ndarray:
+    """
+    Compute oriented bounding boxes in the global frame.
+
+    Parameters
+    ----------
+    poses : np.ndarray
+        Poses of shape (n, 6) with columns x, y, z, h, p, r or (n, 3) with
+        columns x, y, h.
+
+    dims : np.ndarray
+        Bounding box dimensions of shape (n, 4) from `box_dimensions`.
+
+    Returns
+    -------
+    np.ndarray
+        Boxes of shape (n, 6) with columns center x, center y, cos(h), sin(h),
+        half length and half width.
+
+    """
+    poses = np.asarray(poses, dtype=np.float64).reshape(dims.shape[0], -1)
+    h = poses[:, 3 if poses.shape[1] > 3 else 2]
+    c, s = np.cos(h), np.sin(h)
+    return np.stack(
+        [
+            poses[:, 0] + c * dims[:, 2] - s * dims[:, 3],
+            poses[:, 1] + s * dims[:, 2] + c * dims[:, 3],
+            c,
+            s,
+            0.5 * dims[:, 0],
+            0.5 * dims[:, 1],
+        ],
+        axis=1,
+    )
+
+
+def box_aabbs(boxes: np.ndarray) -> np.ndarray:
+    """Return the (n, 4) axis-aligned bounds xmin, ymin, xmax, ymax of boxes."""
+    c, s = np.abs(boxes[:, 2]), np.abs(boxes[:, 3])
+    ex = boxes[:, 4] * c + boxes[:, 5] * s
+    ey = boxes[:, 4] * s + boxes[:, 5] * c
+    return np.stack(
+        [boxes[:, 0] - ex, boxes[:, 1] - ey, boxes[:, 0] + ex, boxes[:, 1] + ey],
+        axis=1,
+    )
+
+
+def aabbs_overlap(aabbs: np.ndarray, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+    """Check if pairs of axis-aligned bounding boxes overlap."""
+    return (
+        (aabbs[i, 0] <= aabbs[j, 2])
+        & (aabbs[j, 0] <= aabbs[i, 2])
+        & (aabbs[i, 1] <= aabbs[j, 3])
+        & (aabbs[j, 1] <= aabbs[i, 3])
+    )
+
+
+def sweep_and_prune(aabbs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find the pairs of overlapping axis-aligned bounding boxes.
+
+    The boxes are sorted by their minimum x-coordinate and each is paired with
+    the following boxes which start before it ends. Pairs are then kept if
+    their y-intervals overlap. Boxes with non-finite bounds are ignored.
+
+    Parameters
+    ----------
+    aabbs : np.ndarray
+        Bounds of shape (n, 4) with columns xmin, ymin, xmax, ymax.
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        The indices i and j of each overlapping pair with i != j.
+
+    """
+    order = np.flatnonzero(np.isfinite(aabbs).all(axis=1))
+    order = order[np.argsort(aabbs[order, 0], kind="stable")]
+    xmin = aabbs[order, 0]
+    ends = np.searchsorted(xmin, aabbs[order, 2], side="right")
+    counts = np.maximum(ends - np.arange(order.shape[0]) - 1, 0)
+    first = np.repeat(np.arange(order.shape[0]), counts)
+    starts = np.repeat(np.cumsum(counts) - counts, counts)
+    second = first + 1 + np.arange(first.shape[0]) - starts
+    i, j = order[first], order[second]
+    keep = aabbs_overlap(aabbs, i, j)
+    return i[keep], j[keep]
+
+
+def boxes_intersect(boxes: np.ndarray, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+    """
+    Check if pairs of oriented boxes intersect with the separating axis test.
+
+    Two rectangles are disjoint if and only if their projections onto one of
+    the four edge normals do not overlap. Touching boxes intersect.
+
+    Parameters
+    ----------
+    boxes : np.ndarray
+        Boxes of shape (n, 6) from `oriented_boxes`.
+
+    i : np.ndarray
+        Indices of the first box of each pair.
+
+    j : np.ndarray
+        Indices of the second box of each pair.
+
+    """
+    a, b = boxes[i], boxes[j]
+    ua, va = a[:, 2:4], np.stack([-a[:, 3], a[:, 2]], axis=1)
+    ub, vb = b[:, 2:4], np.stack([-b[:, 3], b[:, 2]], axis=1)
+    axes = np.stack([ua, va, ub, vb], axis=1)
+
+    def proj(v: np.ndarray) -> np.ndarray:
+        return np.abs((axes * v[:, None]).sum(-1))
+
+    r_a = a[:, 4:5] * proj(ua) + a[:, 5:6] * proj(va)
+    r_b = b[:, 4:5] * proj(ub) + b[:, 5:6] * proj(vb)
+    return ~(proj(b[:, :2] - a[:, :2]) > r_a + r_b).any(axis=1)
+
+
+def collision_pairs(
+    boxes: np.ndarray, groups: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return the indices i < j of all pairs of intersecting oriented boxes.
+
+    If groups is given then only boxes in the same group e.g. the entities of
+    the same scenario are paired.
+    """
+    i, j = sweep_and_prune(box_aabbs(boxes))
+    if groups is not None:
+        same = groups[i] == groups[j]
+        i, j = i[same], j[same]
+    hit = boxes_intersect(boxes, i, j)
+    i, j = i[hit], j[hit]
+    return np.minimum(i, j), np.maximum(i, j)
+
+
+def _xyh(poses: Mapping) -> np.ndarray:
+    """Stack the positions and headings of an entity-indexed mapping of poses."""
+    if isinstance(poses, EntityArrayView):
+        data = poses.data if poses.mask is None else poses.data[poses.mask]
+        return data[:, [0, 1, 3]]
+    return np.array(
+        [(p[0], p[1], p[3 if len(p) > 3 else 2]) for p in poses.values()],
+        dtype=np.float64,
+    ).reshape(-1, 3)
+
+
+def collision_dict(
+    entities: List[Entity],
+    keys: np.ndarray,
+    i: np.ndarray,
+    j: np.ndarray,
+) -> Dict[Entity, List[Entity]]:
+    """
+    Build the collisions of entities from the indices of colliding pairs.
+
+    Each entity indexed by `keys` is mapped to the entities it collides with
+    in index order.
+    """
+    is_key = np.zeros(len(entities), dtype=bool)
+    is_key[keys] = True
+    src, dst = np.concatenate([i, j]), np.concatenate([j, i])
+    keep = is_key[src]
+    src, dst = src[keep], dst[keep]
+    order = np.lexsort((dst, src))
+    collisions = {entities[k]: [] for k in keys}
+    for a, b in zip(src[order].tolist(), dst[order].tolist()):
+        collisions[entities[a]].append(entities[b])
+    return collisions
 
 
 def detect_collisions(
@@ -19,6 +208,9 @@ def detect_collisions(
     the scenario with a list of all other entities that they are
     colliding with.
 
+    Candidate pairs are found by sweeping over the axis-aligned bounds of the
+    boxes and are then checked with a vectorised separating axis test.
+
     Parameters
     ----------
     entities : List[Entity]
@@ -29,21 +221,87 @@ def detect_collisions(
         with each geometry in geoms.
 
     """
-    geom_to_ent = {}
-    for e, pose in (
-        entities.items()
-        if others is None
-        else chain(entities.items(), others.items())
+    ents = list(entities)
+    poses = _xyh(entities)
+    if others is not None:
+        extra = {e: p for e, p in others.items() if e not in entities}
+        ents.extend(extra)
+        poses = np.concatenate([poses, _xyh(extra)])
+    if not ents:
+        return {}
+    boxes = oriented_boxes(poses, box_dimensions(ents))
+    keys = np.arange(len(entities))
+    return collision_dict(ents, keys, *collision_pairs(boxes))
+
+
+class EntityArrayView(Mapping):
+    """
+    A read-only dictionary view of entity-indexed array data.
+
+    Row `i` of the data array holds the value for the `i`'th entity and an
+    optional boolean mask selects which entities are present in the view. No
+    data is copied: values returned are views of the rows of the array.
+    """
+
+    def __init__(
+        self,
+        entities: List[Entity],
+        index: Dict[Entity, int],
+        data: np.ndarray,
+        mask: Optional[np.ndarray] = None,
     ):
-        g = e.get_bounding_box_geom(pose)
-        geom_to_ent[g] = e
-        geom_to_ent[e] = g
-
-    geoms = [geom_to_ent[e] for e in entities]
-    other_geoms = [geom_to_ent[e] for e in others] if others is not None else None
-
-    collisions = detect_geom_collisions(geoms, others=other_geoms)
-    return {
-        e: [geom_to_ent[g_prime] for g_prime in collisions[g]]
-        for e, g in zip(entities, geoms)
-    }
+        """
+        Create the view.
+
+        Parameters
+        ----------
+        entities : List[Entity]
+            The entity for each row of the data.
+
+        index : Dict[Entity, int]
+            The row index of each entity.
+
+        data : np.ndarray
+            The entity-indexed data array with one row per entity.
+
+        mask : Optional[np.ndarray]
+            Boolean array selecting the entities present in the view. If not
+            given then all entities are present.
+
+        """
+        self._entities = entities
+        self._index = index
+        self.data = data
+        self.mask = mask
+
+    def __getitem__(self, entity: Entity) -> np.ndarray:
+        """Get the row of data for the entity."""
+        idx = self._index[entity]
+        if self.mask is not None and not self.mask[idx]:
+            raise KeyError(entity)
+        return self.data[idx]
+
+    def __contains__(self, entity: Entity) -> bool:
+        """Check if the entity is present in the view."""
+        idx = self._index.get(entity)
+        return idx is not None and (self.mask is None or bool(self.mask[idx]))
+
+    def __iter__(self) -> Iterator[Entity]:
+        """Iterate over the entities present in the view."""
+        if self.mask is None:
+            return iter(self._entities)
+        return (self._entities[i] for i in np.flatnonzero(self.mask))
+
+    def __len__(self) -> int:
+        """Return the number of entities present in the view."""
+        if self.mask is None:
+            return len(self._entities)
+        return int(self.mask.sum())
+
+    def __repr__(self) -> str:
+        """Represent the view as a dictionary."""
+        return f"{self.__class__.__name__}({dict(self.items())})"
+
+    def copy(self) -> Dict[Entity, np.ndarray]:
+        """Return a dictionary with the data in the view."""
+        return dict(self.items())
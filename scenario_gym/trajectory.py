@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import hashlib
+import warnings
 from copy import copy
-from typing import Callable, List, Optional, Tuple, Union
+from typing import List, Optional, Sequence, Tuple, Union
 
 import numpy as np
-from scipy.interpolate import interp1d
 
+from scenario_gym.precision import DTypeLike, resolve_dtype
+from scenario_gym.road_network.frenet import FrenetFrame
 from scenario_gym.utils import ArrayLike, NDArray, cached_property
 
 
@@ -20,6 +23,11 @@ class Trajectory:
     # apply changes
     new_t = Trajectory(new_data)
     ```
+
+    Times are stored as float64 while the poses are stored with the precision
+    given by `dtype` (see `scenario_gym.precision`). Interpolation is computed
+    in float64 and the resulting poses are returned with the trajectory's
+    dtype.
     """
 
     _fields = ("t", "x", "y", "z", "h", "p", "r")
@@ -31,7 +39,12 @@ class Trajectory:
     p: Optional[NDArray] = None
     r: Optional[NDArray] = None
 
-    def __init__(self, data: NDArray, fields: Tuple[str] = _fields):
+    def __init__(
+        self,
+        data: NDArray,
+        fields: Tuple[str] = _fields,
+        dtype: Optional[DTypeLike] = None,
+    ):
         """
         Trajectory constructor.
 
@@ -46,6 +59,10 @@ class Trajectory:
             The field names for each column of data. Must contain t, x and y and
             must be a subset of _fields.
 
+        dtype : Optional[DTypeLike]
+            The dtype used to store the poses. By default the global precision
+            is used.
+
         """
         if not all(f in fields for f in ("t", "x", "y")):
             raise ValueError("Trajectory cannot be created with t, x and y values.")
@@ -67,14 +84,7 @@ class Trajectory:
                 if f == "h" and n == 1:
                     d = np.zeros(1)
                 elif f == "h" and n > 1:
-                    t = _data[0]
-                    fn = interp1d(
-                        t,
-                        np.array(_data[1:3]).T,
-                        axis=0,
-                        fill_value="extrapolate",
-                    )
-                    d = np.arctan2(*np.flip(fn(t + 1e-2) - fn(t - 1e-2), axis=1).T)
+                    d = _estimate_heading(_data[0], np.array(_data[1:3]).T)
                     d = _resolve_heading(d)
                 elif f in ("z", "p", "r"):
                     d = np.zeros(n)
@@ -85,15 +95,166 @@ class Trajectory:
             elif f == "h":
                 d = _resolve_heading(d)
             _data.append(d)
-            setattr(self, f, d)
 
         # we will make the data readonly
-        self._data = np.array(_data).T.copy()
-        self._data.flags.writeable = False
+        self._set_arrays(*_split_precision(np.array(_data).T.copy(), dtype))
+
+    def _set_arrays(
+        self, t: NDArray, poses: NDArray, data: Optional[NDArray] = None
+    ) -> None:
+        """
+        Store the times and poses of the trajectory as read-only arrays.
+
+        `data` is the (N, 7) array of which `t` and `poses` are views when the
+        poses are stored in float64.
+        """
+        for arr in (t, poses, data):
+            if arr is not None:
+                arr.flags.writeable = False
+        self.t = t
+        for i, f in enumerate(self._fields[1:]):
+            setattr(self, f, poses[:, i])
+        self._poses = poses
+        self._data = data
+        self._init_cache()
+
+    def _init_cache(self) -> None:
+        """Initialise the interpolation data computed on first use."""
+        self._knots: Optional[NDArray] = None
+        self._values: Optional[NDArray] = None
+        self._cursor = 1
+        self._s_knots: Optional[NDArray] = None
+        self._s_values: Optional[NDArray] = None
+        self._curvature: Optional[NDArray] = None
+        self._digest: Optional[str] = None
+        self._joined: Optional[NDArray] = None
+
+    @classmethod
+    def from_validated(cls, data: NDArray) -> Trajectory:
+        """
+        Create a trajectory from data that is already in the internal format.
+
+        The data must have the columns t, x, y, z, h, p, r, be sorted by unique
+        times, have finite values and resolved headings e.g. the data of another
+        trajectory. The data is not copied or validated and is made read-only.
+
+        Parameters
+        ----------
+        data : np.ndarray
+            The trajectory data as a numpy array of (num_points, 7).
+
+        """
+        if data.ndim != 2 or data.shape[1] != len(cls._fields) or not len(data):
+            raise ValueError(
+                f"Invalid shape: {data.shape}. Expected: (N, {len(cls._fields)})."
+            )
+        return cls._from_arrays(data[:, 0], data[:, 1:], data)
 
-        self._interpolated: Optional[Callable[[ArrayLike], NDArray]] = None
-        self._interpolated_s: Optional[Callable[[ArrayLike], NDArray]] = None
-        self._grad_fn = None
+    @classmethod
+    def _from_arrays(
+        cls, t: NDArray, poses: NDArray, data: Optional[NDArray] = None
+    ) -> Trajectory:
+        """Create a trajectory from validated times and poses without copying."""
+        traj = cls.__new__(cls)
+        traj._set_arrays(t, poses, data)
+        return traj
+
+    @classmethod
+    def from_many(
+        cls,
+        datas: Sequence[NDArray],
+        fields: Tuple[str] = _fields,
+        dtype: Optional[DTypeLike] = None,
+    ) -> List[Trajectory]:
+        """
+        Create many trajectories at once.
+
+        Gives the same trajectories as calling the constructor on each array
+        but the arrays are validated together and the trajectories are views
+        of a single read-only buffer.
+
+        Parameters
+        ----------
+        datas : Sequence[np.ndarray]
+            The data of each trajectory as numpy arrays of (num_points,
+            num_fields).
+
+        fields : List[str]
+            The field names for each column of data. Must contain t, x and y and
+            must be a subset of _fields.
+
+        dtype : Optional[DTypeLike]
+            The dtype used to store the poses. By default the global precision
+            is used.
+
+        """
+        if not all(f in fields for f in ("t", "x", "y")):
+            raise ValueError("Trajectory cannot be created with t, x and y values.")
+        for data in datas:
+            if data.ndim != 2 or data.shape[1] != len(fields) or not len(data):
+                raise ValueError(
+                    f"Invalid shape: {data.shape}. Expected: (N, {len(fields)})."
+                    " Either pass `fields` to specify the columns given or ensure"
+                    f" that columns for all of {cls._fields} are provided."
+                )
+        if not datas:
+            return []
+
+        # sort each trajectory by time and drop repeated times
+        k = len(datas)
+        raw = np.concatenate(datas, axis=0).astype(float, copy=False)
+        group = np.repeat(np.arange(k), [len(data) for data in datas])
+        t = raw[:, fields.index("t")]
+        same = group[1:] == group[:-1]
+        if (same & ~(t[1:] > t[:-1])).any():
+            order = np.lexsort((t, group))
+            raw, group = raw[order], group[order]
+            t = raw[:, fields.index("t")]
+            keep = np.ones(raw.shape[0], dtype=bool)
+            keep[1:] = (group[1:] != group[:-1]) | (t[1:] != t[:-1])
+            raw, group = raw[keep], group[keep]
+        lengths = np.bincount(group, minlength=k)
+        ends = np.cumsum(lengths)
+        starts = ends - lengths
+
+        n = raw.shape[0]
+        if tuple(fields) == cls._fields:
+            out = raw
+        else:
+            out = np.zeros((n, len(cls._fields)))
+            for j, f in enumerate(cls._fields):
+                if f in fields:
+                    out[:, j] = raw[:, fields.index(f)]
+        missing = {}
+        for j, f in enumerate(cls._fields):
+            if f not in fields:
+                missing[f] = np.ones(k, dtype=bool)
+                continue
+            missing[f] = ~np.logical_and.reduceat(np.isfinite(out[:, j]), starts)
+            if f in ("t", "x", "y") and missing[f].any():
+                raise ValueError(
+                    f"Invalid values found for {f}. Values required for xyt."
+                )
+            elif f in ("z", "p", "r") and missing[f].any():
+                out[missing[f][group], j] = 0.0
+
+        # estimate missing headings then resolve all headings
+        h = out[:, 4]
+        for i in np.flatnonzero(missing["h"]):
+            s, e = starts[i], ends[i]
+            if e - s == 1:
+                h[s] = 0.0
+            else:
+                h[s:e] = _estimate_heading(out[s:e, 0], out[s:e, 1:3])
+        out[:, 4] = _resolve_headings(h, starts, ends)
+
+        t, poses, out = _split_precision(out, dtype)
+        return [
+            cls._from_arrays(
+                t[s:e], poses[s:e], out[s:e] if out is not None else None
+            )
+            for s, e in zip(starts, ends)
+        ]
 
     @property
     def data(self) -> NDArray:
@@ -107,12 +268,43 @@ class Trajectory:
         # apply changes
         new_t = Trajectory(new_data)
         ```
+
+        If the poses are not stored in float64 then a float64 array is created
+        from the times and poses on first access and kept.
         """
+        if self._data is None:
+            if self._joined is None:
+                self._joined = _join_precision(self.t, self._poses)
+            return self._joined
         return self._data
 
+    @property
+    def dtype(self) -> np.dtype:
+        """Return the dtype used to store the poses."""
+        return self._poses.dtype
+
+    def astype(self, dtype: DTypeLike) -> Trajectory:
+        """Return the trajectory with the poses stored with the given dtype."""
+        if resolve_dtype(dtype) == self.dtype:
+            return self
+        return self._from_arrays(*_split_precision(self.data, dtype))
+
+    @property
+    def digest(self) -> str:
+        """Return a hash of the trajectory data which is kept by copies."""
+        if self._digest is None:
+            if self._data is not None:
+                data = np.ascontiguousarray(self._data)
+                self._digest = hashlib.sha1(data).hexdigest()
+            else:
+                digest = hashlib.sha1(np.ascontiguousarray(self.t))
+                digest.update(np.ascontiguousarray(self._poses))
+                self._digest = digest.hexdigest()
+        return self._digest
+
     def __len__(self) -> int:
         """Return the number of points in the trajectory."""
-        return len(self.data)
+        return len(self.t)
 
     def __getitem__(self, idx: int) -> NDArray:
         """Get the idx'th point in the trajectory."""
@@ -131,8 +323,8 @@ class Trajectory:
     @cached_property
     def s(self) -> NDArray:
         """Return the distance travelled at each point."""
-        ds = np.linalg.norm(np.diff(self.data[:, [1, 2]], axis=0), axis=1).cumsum()
-        return np.hstack([[0.0], ds])
+        delta = np.diff(self._poses[:, :2], axis=0).astype(float, copy=False)
+        return np.hstack([[0.0], np.linalg.norm(delta, axis=1).cumsum()])
 
     @cached_property
     def arclength(self) -> float:
@@ -169,41 +361,82 @@ class Trajectory:
             range of the trajectory and extrapolate is False then None is returned.
 
         """
-        t = np.array(t)
-        if self._interpolated is None:
-            data = self.data
-            if data.shape[0] == 1:
-                data = np.repeat(data, 2, axis=0)
-                data[-1, 0] += 1e-3
-            self._interpolated = interp1d(
-                data[:, 0],
-                data[:, 1:],
-                bounds_error=False,
-                fill_value="extrapolate",
-                axis=0,
-            )
         if isinstance(extrapolate, tuple):
             ext_bck, ext_fwd = extrapolate
             extrapolate = True
         else:
             ext_bck = ext_fwd = extrapolate
-        if t.ndim == 0:
+        if np.ndim(t) == 0:
+            t = float(t)
             if not extrapolate and (t < self.min_t or t > self.max_t):
                 return None
             elif t < self.min_t and not ext_bck:
-                return self.data[0, 1:]
+                return self._poses[0]
             elif t > self.max_t and not ext_fwd:
-                return self.data[-1, 1:]
-            return self._interpolated(t)
-        poses = self._interpolated(t)
+                return self._poses[-1]
+            pose = self._interpolate_scalar(t)
+            return pose if self._data is not None else pose.astype(self.dtype)
+        t = np.asarray(t)
+        poses = self._interpolate(t).astype(self.dtype, copy=False)
         if not ext_bck:
-            poses = np.where(t[:, None] < self.min_t, self.data[0, None, 1:], poses)
+            poses = np.where(t[:, None] < self.min_t, self._poses[None, 0], poses)
         if not ext_fwd:
-            poses = np.where(
-                t[:, None] > self.max_t, self.data[-1, None, 1:], poses
-            )
+            poses = np.where(t[:, None] > self.max_t, self._poses[None, -1], poses)
         return poses
 
+    def _build_knots(self) -> None:
+        """
+        Store the times and poses used for interpolation.
+
+        The poses are stored in float64 so that interpolation is computed in
+        float64 whatever the dtype of the trajectory.
+        """
+        t, poses = self.t, self._poses
+        if t.shape[0] == 1:
+            t = np.hstack([t, t + 1e-3])
+            poses = np.repeat(poses, 2, axis=0)
+        self._knots = np.ascontiguousarray(t)
+        self._values = np.ascontiguousarray(poses, dtype=float)
+
+    def _interpolate_scalar(self, t: float) -> NDArray:
+        """
+        Linearly interpolate the poses at a single time.
+
+        Times outside of the trajectory are linearly extrapolated from the first
+        or last two points. The segment used by the previous query is checked,
+        followed by the next segment, before searching so that evaluating the
+        trajectory at increasing times is O(1).
+        """
+        if self._knots is None:
+            self._build_knots()
+        x, y = self._knots, self._values
+        n = x.shape[0]
+        i = self._cursor
+        if not ((i == 1 or x[i - 1] < t) and (i == n - 1 or t <= x[i])):
+            i += 1
+            if not (i < n and x[i - 1] < t and (i == n - 1 or t <= x[i])):
+                i = min(max(int(x.searchsorted(t)), 1), n - 1)
+            self._cursor = i
+        x_lo, y_lo = x[i - 1], y[i - 1]
+        return (y[i] - y_lo) / (x[i] - x_lo) * (t - x_lo) + y_lo
+
+    def _interpolate(self, t: NDArray) -> NDArray:
+        """
+        Linearly interpolate the poses at an array of times.
+
+        Returns an array of shape t.shape + (6,). Times outside of the
+        trajectory are linearly extrapolated from the first or last two points.
+        """
+        if self._knots is None:
+            self._build_knots()
+        x, y = self._knots, self._values
+        flat = t.reshape(-1)
+        idx = x.searchsorted(flat).clip(1, x.shape[0] - 1)
+        x_lo, y_lo = x[idx - 1], y[idx - 1]
+        slope = (y[idx] - y_lo) / (x[idx] - x_lo)[:, None]
+        poses = slope * (flat - x_lo)[:, None] + y_lo
+        return poses.reshape(t.shape + y.shape[1:])
+
     def position_at_s(self, s: float) -> NDArray:
         """
         Compute the position of the entity at distance travelled s.
@@ -220,26 +453,58 @@ class Trajectory:
             The position as a numpy array.
 
         """
-        if self._interpolated_s is None:
-            data = self.data
-            s_ = self.s
-            s_, idx = np.unique(s_, return_index=True)
-            data = data[idx]
-            if data.shape[0] == 1:
-                data = np.repeat(data, 2, axis=0)
-                data[-1, 0] += 1e-3
-                s_ = np.hstack([s_[0] - 1e-3, s[0]])
-            self._interpolated_s = interp1d(
-                s_,
-                data,
-                bounds_error=False,
-                fill_value=(data[0, :], data[-1, :]),
-                axis=0,
-            )
-        out = self._interpolated_s(s)
+        if self._s_knots is None:
+            self._build_arc_index()
+        x, y = self._s_knots, self._s_values
+        s_arr = np.asarray(s, dtype=float)
+        flat = s_arr.reshape(-1)
+        idx = x.searchsorted(flat).clip(1, x.shape[0] - 1)
+        x_lo, y_lo = x[idx - 1], y[idx - 1]
+        slope = (y[idx] - y_lo) / (x[idx] - x_lo)[:, None]
+        out = slope * (flat - x_lo)[:, None] + y_lo
+        out = np.where((flat < x[0])[:, None], y[0], out)
+        out = np.where((flat > x[-1])[:, None], y[-1], out)
+        out = out.reshape(s_arr.shape + y.shape[1:])
         out[..., 0] = np.where(s == 0, 0, out[..., 0])
         return out
 
+    def _build_arc_index(self) -> None:
+        """
+        Store the arc-length index of the trajectory.
+
+        The index holds the distance travelled at each unique point and the
+        poses at these points for `position_at_s` and the discrete curvature at
+        each interior point for `curvature_subsample`. The curvature is the
+        change in heading between the segments either side of a point divided
+        by their mean length. The heading of a segment of zero length is taken
+        from the previous segment.
+        """
+        data, s = self.data, self.s
+        keep = np.ones(s.shape[0], dtype=bool)
+        keep[1:] = s[1:] != s[:-1]
+        x, y = s[keep], data[keep]
+        if x.shape[0] == 1:
+            x = np.hstack([x[0] - 1e-3, x[0]])
+            y = np.repeat(y, 2, axis=0)
+            y[-1, 0] += 1e-3
+        self._s_knots, self._s_values = x, y
+
+        ds = np.diff(s)
+        moving = np.flatnonzero(ds > 0)
+        if moving.size == 0:
+            self._curvature = np.zeros(max(0, s.shape[0] - 2))
+            return
+        delta = np.diff(data[:, 1:3], axis=0)
+        seg_h = np.arctan2(delta[moving, 1], delta[moving, 0])
+        # carry the last heading over segments of zero length
+        last = np.searchsorted(moving, np.arange(ds.shape[0]), side="right") - 1
+        seg_h = seg_h[np.maximum(last, 0)]
+        turn = (np.diff(seg_h) + np.pi) % (2 * np.pi) - np.pi
+        length = 0.5 * (ds[:-1] + ds[1:])
+        self._curvature = np.divide(
+            np.abs(turn), length, out=np.zeros_like(turn), where=length > 0
+        )
+
     def velocity_at_t(
         self, t: Union[float, ArrayLike], eps: float = 1e-4
     ) -> NDArray:
@@ -262,15 +527,14 @@ class Trajectory:
         """
         t = np.array(t)
         inside = np.logical_and(self.min_t <= t, t <= self.max_t)
-        v_in = (
-            self.position_at_t(t + eps / 2, extrapolate=True)
-            - self.position_at_t(t - eps / 2, extrapolate=True)
-        ) / eps
+        # interpolate in float64 to avoid cancellation for small eps
+        interpolate = self._interpolate if t.ndim else self._interpolate_scalar
+        v_in = (interpolate(t + eps / 2) - interpolate(t - eps / 2)) / eps
         v_out = np.zeros(t.shape + (6,))
 
         if t.ndim >= 1:
             inside = inside.reshape(-1, 1)
-        return np.where(inside, v_in, v_out)
+        return np.where(inside, v_in, v_out).astype(self.dtype, copy=False)
 
     def is_stationary(self) -> bool:
         """Return True if the trajectory is stationary."""
@@ -278,7 +542,12 @@ class Trajectory:
 
     def __copy__(self) -> Trajectory:
         """Create a copy of the trajectory."""
-        return self.__class__(self.data.copy())
+        if self._data is None:
+            traj = self._from_arrays(self.t.copy(), self._poses.copy())
+        else:
+            traj = self.from_validated(self._data.copy())
+        traj._digest = self._digest
+        return traj
 
     def copy(self) -> Trajectory:
         """Create a copy of the trajectory."""
@@ -302,7 +571,7 @@ class Trajectory:
         """
         if x.ndim == 1:
             x = x[None, :]
-        return self.__class__(self.data + x)
+        return self.__class__(self.data + x, dtype=self.dtype)
 
     def rotate(self, h: float) -> Trajectory:
         """
@@ -330,7 +599,7 @@ class Trajectory:
             )
         ) + xy
         new_data[:, 4] = (new_data[:, 4] + h) % (2.0 * np.pi)
-        return self.__class__(new_data)
+        return self.__class__(new_data, dtype=self.dtype)
 
     def smooth_headings(self) -> Trajectory:
         """
@@ -355,7 +624,7 @@ class Trajectory:
 
         new_data = self.data.copy()
         new_data[:, 4] = d
-        return self.__class__(new_data)
+        return self.__class__(new_data, dtype=self.dtype)
 
     def subsample(
         self,
@@ -397,18 +666,20 @@ class Trajectory:
             n = int(max(1, np.ceil((self.max_t - self.min_t) * points_per_t)))
             ts = np.linspace(self.min_t, self.max_t, n)
             data = self.position_at_t(ts)
-            return self.__class__(np.concatenate([ts[:, None], data], axis=1))
+            return self.__class__(
+                np.concatenate([ts[:, None], data], axis=1), dtype=self.dtype
+            )
 
         n = int(max(1, np.ceil(self.arclength * points_per_s)))
         ss = np.linspace(0, self.arclength, n)
         data = self.position_at_s(ss)
-        return self.__class__(data)
+        return self.__class__(data, dtype=self.dtype)
 
     def curvature_subsample(
         self,
         points_per_s: Optional[float] = None,
         points_per_t: Optional[float] = None,
-        eps: float = 1e-3,
+        eps: Optional[float] = None,
         weight: float = 5.0,
     ) -> np.ndarray:
         """
@@ -422,14 +693,22 @@ class Trajectory:
         points_per_t : Optional[float]
             Number of control points per unit of time.
 
-        eps : float
-            Epsilon parameter for computing gradients of the trajectory.
+        eps : Optional[float]
+            Deprecated and ignored since the curvature is taken from the
+            arc-length index. A `DeprecationWarning` is raised if it is given.
 
         weight : float
             Temperature for sampling distribution. Higher values give points more
             densley sampled around high curvature areas.
 
         """
+        if eps is not None:
+            warnings.warn(
+                "`eps` is deprecated and ignored since the curvature is taken "
+                "from the arc-length index.",
+                DeprecationWarning,
+                stacklevel=2,
+            )
         if points_per_s is not None:
             n = int(np.maximum(1, points_per_s * self.arclength))
         elif points_per_t is not None:
@@ -439,14 +718,12 @@ class Trajectory:
                 "Exactly one of `points_per_s` or `points_per_t` must be supplied."
             )
         s = self.s
-        if self._grad_fn is None:
-            fn = self.position_at_s
-            grads = (fn(s + eps)[:, [1, 2]] - fn(s - eps)[:, [1, 2]]) / (2 * eps)
-            self._grad_fn = interp1d(s, grads, axis=0, fill_value="extrapolate")
-        grad_fn = self._grad_fn
-        second_grad = (grad_fn(s[1:-1] + eps) - grad_fn(s[1:-1] - eps)) / (2 * eps)
-        curv = np.linalg.norm(second_grad, axis=1)
-        dist = np.exp(weight * curv) / np.exp(weight * curv).sum()
+        if self._curvature is None:
+            self._build_arc_index()
+        curv = self._curvature
+        logits = weight * curv
+        dist = np.exp(logits - logits.max(initial=-np.inf))
+        dist /= dist.sum()
         num_points = int(np.clip(n - 2, 1, dist.shape[0]))
         idxs = np.random.choice(
             dist.shape[0],
@@ -455,13 +732,641 @@ class Trajectory:
             p=dist,
         )
         s_vals = s[np.hstack([[0], 1 + np.sort(idxs), [s.shape[0] - 1]])]
-        return self.__class__(fn(s_vals))
+        return self.__class__(self.position_at_s(s_vals), dtype=self.dtype)
+
+    def to_frenet(self, frame: FrenetFrame) -> NDArray:
+        """
+        Transform the trajectory to Frenet coordinates.
+
+        Parameters
+        ----------
+        frame : FrenetFrame
+            The Frenet frame e.g. `lane.frenet` for a lane.
+
+        Returns
+        -------
+        np.ndarray
+            The data with shape (num_points, 7) and columns t, s, d, z, h, p, r
+            where the heading is relative to the frame. See
+            `FrenetFrame.poses_to_frenet`.
+
+        """
+        data = np.empty((len(self), 7))
+        data[:, 0] = self.t
+        data[:, 1:] = frame.poses_to_frenet(self._poses)
+        return data
+
+    @classmethod
+    def from_frenet(
+        cls,
+        data: NDArray,
+        frame: FrenetFrame,
+        dtype: Optional[DTypeLike] = None,
+    ) -> Trajectory:
+        """
+        Create a trajectory from data in Frenet coordinates.
+
+        Parameters
+        ----------
+        data : np.ndarray
+            The data with shape (num_points, 7) and columns t, s, d, z, h, p, r
+            as returned by `to_frenet`.
+
+        frame : FrenetFrame
+            The Frenet frame of the data.
+
+        dtype : Optional[DTypeLike]
+            The dtype used to store the poses. By default the global precision
+            is used.
+
+        """
+        data = np.asarray(data, dtype=float)
+        if data.ndim != 2 or data.shape[1] != len(cls._fields):
+            raise ValueError(
+                f"Invalid shape: {data.shape}. Expected: (N, {len(cls._fields)})."
+            )
+        out = np.empty_like(data)
+        out[:, 0] = data[:, 0]
+        out[:, 1:] = frame.poses_from_frenet(data[:, 1:])
+        return cls(out, dtype=dtype)
 
     def to_json(self) -> List[List[float]]:
         """Write the trajectory to a jsonable list."""
         return self.data.tolist()
 
 
+class TrajectoryBatch:
+    """
+    A packed collection of trajectories with vectorised queries.
+
+    The points of all trajectories are stored in a single (sum_n, 7) array in
+    a ragged (CSR) layout: the points of the i'th trajectory are the rows
+    `offsets[i]:offsets[i + 1]`. Positions and velocities of every trajectory
+    are evaluated with one call rather than looping over the trajectories.
+    Indexing the batch returns a `Trajectory` which is a view of the packed
+    data. As in `Trajectory` the times are stored as float64 and the poses
+    with the precision given by `dtype`.
+    """
+
+    def __init__(
+        self,
+        data: NDArray,
+        offsets: ArrayLike,
+        dtype: Optional[DTypeLike] = None,
+    ):
+        """
+        Create the batch from packed data.
+
+        Parameters
+        ----------
+        data : np.ndarray
+            The points of every trajectory with shape (sum_n, 7) and columns
+            t, x, y, z, h, p, r. Each trajectory's points must be sorted by
+            unique times as in `Trajectory.data`.
+
+        offsets : ArrayLike
+            Array of shape (num_trajectories + 1,) giving the first row of each
+            trajectory and the total number of rows.
+
+        dtype : Optional[DTypeLike]
+            The dtype used to store the poses. By default the global precision
+            is used.
+
+        """
+        offsets = np.asarray(offsets, dtype=np.int64)
+        if data.ndim != 2 or data.shape[1] != len(Trajectory._fields):
+            raise ValueError(
+                f"Invalid shape: {data.shape}. Expected: (N, "
+                f"{len(Trajectory._fields)})."
+            )
+        if (
+            offsets.ndim != 1
+            or offsets.shape[0] == 0
+            or offsets[0] != 0
+            or offsets[-1] != data.shape[0]
+            or (np.diff(offsets) < 1).any()
+        ):
+            raise ValueError("Invalid offsets for the trajectory data.")
+        self._t, self._poses, self._data = _split_precision(data, dtype)
+        for arr in (self._t, self._poses, self._data):
+            if arr is not None:
+                arr.flags.writeable = False
+        self.offsets = offsets
+        self.lengths = np.diff(offsets)
+        starts, ends = offsets[:-1], offsets[1:] - 1
+        self.min_t = self._t[starts]
+        self.max_t = self._t[ends]
+        self._first = self._poses[starts]
+        self._last = self._poses[ends]
+        self._views: List[Optional[Trajectory]] = [None] * len(self)
+        self._time_fn: Optional[_RaggedLinear] = None
+        self._arc: Optional[Tuple[NDArray, _RaggedLinear]] = None
+        self._joined: Optional[NDArray] = None
+
+    @classmethod
+    def from_trajectories(
+        cls,
+        trajectories: Sequence[Trajectory],
+        dtype: Optional[DTypeLike] = None,
+    ) -> TrajectoryBatch:
+        """
+        Pack a sequence of trajectories into a batch.
+
+        By default the poses are stored with the dtype of the trajectories.
+        """
+        lengths = [len(traj) for traj in trajectories]
+        offsets = np.hstack([[0], np.cumsum(lengths, dtype=np.int64)])
+        if trajectories:
+            data = np.concatenate([traj.data for traj in trajectories])
+            if dtype is None:
+                dtype = np.result_type(*(traj.dtype for traj in trajectories))
+        else:
+            data = np.empty((0, len(Trajectory._fields)))
+        return cls(data, offsets, dtype=dtype)
+
+    @classmethod
+    def concatenate(
+        cls,
+        batches: Sequence[TrajectoryBatch],
+        dtype: Optional[DTypeLike] = None,
+    ) -> TrajectoryBatch:
+        """
+        Join batches into one batch with the trajectories of each in order.
+
+        By default the poses are stored with the dtype of the batches.
+        """
+        batches = [batch for batch in batches if len(batch) > 0]
+        if not batches:
+            return cls.from_trajectories([], dtype=dtype)
+        if dtype is None:
+            dtype = np.result_type(*(batch.dtype for batch in batches))
+        starts = np.cumsum([0] + [batch.offsets[-1] for batch in batches[:-1]])
+        offsets = np.concatenate(
+            [[0]] + [batch.offsets[1:] + s for batch, s in zip(batches, starts)]
+        )
+        data = np.concatenate([batch.data for batch in batches])
+        return cls(data, offsets, dtype=dtype)
+
+    @property
+    def data(self) -> NDArray:
+        """
+        Get the packed data of all trajectories.
+
+        If the poses are not stored in float64 then a float64 array is created
+        from the times and poses on first access and kept.
+        """
+        if self._data is None:
+            if self._joined is None:
+                self._joined = _join_precision(self._t, self._poses)
+            return self._joined
+        return self._data
+
+    @property
+    def dtype(self) -> np.dtype:
+        """Return the dtype used to store the poses."""
+        return self._poses.dtype
+
+    def __len__(self) -> int:
+        """Return the number of trajectories."""
+        return self.offsets.shape[0] - 1
+
+    def __getitem__(self, idx: int) -> Trajectory:
+        """Get the idx'th trajectory as a view of the packed data."""
+        traj = self._views[idx]
+        if traj is None:
+            idx = range(len(self))[idx]
+            rows = slice(self.offsets[idx], self.offsets[idx + 1])
+            traj = self._views[idx] = Trajectory._from_arrays(
+                self._t[rows],
+                self._poses[rows],
+                self._data[rows] if self._data is not None else None,
+            )
+        return traj
+
+    def __iter__(self):
+        """Iterate over the trajectories."""
+        return (self[i] for i in range(len(self)))
+
+    @property
+    def is_static(self) -> NDArray:
+        """Return a boolean mask of the trajectories with a single point."""
+        return self.lengths == 1
+
+    def active_mask(self, t: float) -> NDArray:
+        """Return a boolean mask of the trajectories which are defined at t."""
+        return (self.min_t <= t) & (t <= self.max_t)
+
+    def positions_at_t(
+        self,
+        t: Union[float, ArrayLike],
+        extrapolate: Union[bool, Tuple[bool, bool]] = (False, False),
+    ) -> NDArray:
+        """
+        Compute the position of every trajectory at time t.
+
+        Gives the same results as `Trajectory.position_at_t` for each
+        trajectory.
+
+        Parameters
+        ----------
+        t : Union[float, ArrayLike]
+            A single time or a 1d array of times.
+
+        extrapolate : Union[bool, Tuple[bool, bool]]
+            Whether to extrapolate the trajectories if the time given is outside
+            of their range. If False then the poses of such trajectories are
+            nan. If a Tuple is given then first and second elements correspond
+            to whether to extrapolate before and after the trajectory
+            respectively or to fix them.
+
+        Returns
+        -------
+        np.ndarray
+            The poses with shape (num_trajectories, 6) for a single time or
+            (num_times, num_trajectories, 6) for an array of times.
+
+        """
+        t = np.asarray(t, dtype=float)
+        poses = self._interpolate(t).astype(self.dtype, copy=False)
+        return self._bound(t[..., None], poses, extrapolate)
+
+    def positions_at_each_t(
+        self,
+        t: ArrayLike,
+        extrapolate: Union[bool, Tuple[bool, bool]] = (False, False),
+    ) -> NDArray:
+        """
+        Compute the position of each trajectory at its own time.
+
+        Gives the same results as `Trajectory.position_at_t` for each
+        trajectory e.g. for trajectories of different scenarios which are at
+        different times.
+
+        Parameters
+        ----------
+        t : ArrayLike
+            The time of each trajectory with shape (num_trajectories,).
+
+        extrapolate : Union[bool, Tuple[bool, bool]]
+            Whether to extrapolate the trajectories as in `positions_at_t`.
+
+        Returns
+        -------
+        np.ndarray
+            The poses with shape (num_trajectories, 6).
+
+        """
+        t = np.asarray(t, dtype=float)
+        if t.shape != (len(self),):
+            raise ValueError(f"Expected {len(self)} times not {t.shape}.")
+        if len(self) == 0:
+            return np.empty((0, 6), dtype=self.dtype)
+        if self._time_fn is None:
+            self._build_knots()
+        poses = self._time_fn(t, np.arange(len(self)))
+        return self._bound(t, poses.astype(self.dtype, copy=False), extrapolate)
+
+    def _bound(
+        self,
+        t: NDArray,
+        poses: NDArray,
+        extrapolate: Union[bool, Tuple[bool, bool]],
+    ) -> NDArray:
+        """Fix or remove the poses at times outside of each trajectory."""
+        if isinstance(extrapolate, tuple):
+            ext_bck, ext_fwd = extrapolate
+            extrapolate = True
+        else:
+            ext_bck = ext_fwd = extrapolate
+        if not ext_bck:
+            poses = np.where((t < self.min_t)[..., None], self._first, poses)
+        if not ext_fwd:
+            poses = np.where((t > self.max_t)[..., None], self._last, poses)
+        if not extrapolate:
+            inside = (self.min_t <= t) & (t <= self.max_t)
+            poses = np.where(inside[..., None], poses, np.nan)
+        return poses
+
+    def velocities_at_t(self, t: float, eps: float = 1e-4) -> NDArray:
+        """
+        Compute the velocity of every trajectory at time t.
+
+        Gives the same results as `Trajectory.velocity_at_t` for each
+        trajectory: velocities are zero outside of the range of a trajectory.
+
+        Parameters
+        ----------
+        t : float
+            The time at which the velocities are returned.
+
+        eps : float
+            The epsilon used to compute the velocity.
+
+        Returns
+        -------
+        np.ndarray
+            The velocities with shape (num_trajectories, 6).
+
+        """
+        # interpolate in float64 to avoid cancellation for small eps
+        v = (
+            self._interpolate(np.asarray(t + eps / 2, dtype=float))
+            - self._interpolate(np.asarray(t - eps / 2, dtype=float))
+        ) / eps
+        v = np.where(self.active_mask(t)[:, None], v, 0.0)
+        return v.astype(self.dtype, copy=False)
+
+    @property
+    def nbytes(self) -> int:
+        """Return the memory used by the packed data and cached tables."""
+        arrays = (self._t, self._poses) if self._data is None else (self._data,)
+        nbytes = sum(
+            a.nbytes for a in arrays + (self.offsets, self._first, self._last)
+        )
+        if self._time_fn is not None:
+            nbytes += self._time_fn.nbytes
+        if self._arc is not None:
+            nbytes += self._arc[0].nbytes + self._arc[1].nbytes
+        if self._joined is not None:
+            nbytes += self._joined.nbytes
+        return nbytes
+
+    def prepare(self) -> None:
+        """Build the interpolation tables now rather than on the first query."""
+        if self._time_fn is None and len(self) > 0:
+            self._build_knots()
+
+    def _build_knots(self) -> None:
+        """
+        Store the times and poses used for interpolation.
+
+        Single point trajectories are given a second point as in `Trajectory`.
+        """
+        t, poses, lengths = self._t, self._poses, self.lengths
+        if (lengths == 1).any():
+            single = self.offsets[:-1][lengths == 1]
+            t = np.insert(t, single + 1, t[single] + 1e-3)
+            poses = np.insert(poses, single + 1, poses[single], axis=0)
+            lengths = np.maximum(lengths, 2)
+        self._time_fn = _RaggedLinear(t, poses, lengths)
+
+    def _interpolate(self, t: NDArray) -> NDArray:
+        """
+        Linearly interpolate the poses of every trajectory.
+
+        Returns an array of shape t.shape + (num_trajectories, 6). Times outside
+        of a trajectory are linearly extrapolated from its first or last two
+        points.
+        """
+        if len(self) == 0:
+            return np.empty(t.shape + (0, 6))
+        if self._time_fn is None:
+            self._build_knots()
+        return self._time_fn(t[..., None], np.arange(len(self)))
+
+    def _build_arc_index(self) -> None:
+        """
+        Store the distance travelled at each point and the arc-length index.
+
+        The index matches `Trajectory.position_at_s` for each trajectory.
+        """
+        data, starts, ends = self.data, self.offsets[:-1], self.offsets[1:]
+        n = data.shape[0]
+        ds = np.zeros(n)
+        ds[1:] = np.linalg.norm(np.diff(data[:, 1:3], axis=0), axis=1)
+        ds[starts] = 0.0
+        s = np.empty(n)
+        for i, j in zip(starts, ends):
+            np.cumsum(ds[i:j], out=s[i:j])
+
+        keep = np.ones(n, dtype=bool)
+        keep[1:] = s[1:] != s[:-1]
+        keep[starts] = True
+        x, y = s[keep], data[keep]
+        group = np.repeat(np.arange(len(self)), self.lengths)[keep]
+        lengths = np.bincount(group, minlength=len(self))
+        if (lengths == 1).any():
+            single = (np.cumsum(lengths) - lengths)[lengths == 1]
+            x = np.insert(x, single, x[single] - 1e-3)
+            y = np.insert(y, single, y[single], axis=0)
+            y[single + np.arange(1, single.shape[0] + 1), 0] += 1e-3
+            lengths = np.maximum(lengths, 2)
+        self._arc = (s, _RaggedLinear(x, y, lengths))
+
+    @property
+    def s(self) -> NDArray:
+        """Return the distance travelled at each point of every trajectory."""
+        if self._arc is None:
+            self._build_arc_index()
+        return self._arc[0]
+
+    @property
+    def arclength(self) -> NDArray:
+        """Return the total distance travelled by each trajectory."""
+        return self.s[self.offsets[1:] - 1]
+
+    def _positions_at_s(self, s: NDArray, group: NDArray) -> NDArray:
+        """
+        Compute the positions at distances travelled along the trajectories.
+
+        Gives the same results as `Trajectory.position_at_s` of the trajectory
+        given by `group` for each distance in `s`.
+        """
+        if self._arc is None:
+            self._build_arc_index()
+        out = self._arc[1].clamped(s, group)
+        out[..., 0] = np.where(s == 0, 0, out[..., 0])
+        return out
+
+    def _split(self, data: NDArray, lengths: NDArray) -> List[NDArray]:
+        """Split packed data into the data of each trajectory."""
+        return np.split(data, np.cumsum(lengths)[:-1])
+
+    def subsample(
+        self,
+        points_per_s: Optional[float] = None,
+        points_per_t: Optional[float] = None,
+    ) -> List[Trajectory]:
+        """
+        Subsample every trajectory.
+
+        Gives the same trajectories as `Trajectory.subsample` for each
+        trajectory. Exactly one of `points_per_s` or `points_per_t` must be
+        passed.
+
+        Parameters
+        ----------
+        points_per_s : Optional[float]
+            Number of control points per unit of arc.
+
+        points_per_t : Optional[float]
+            Number of control points per unit of time.
+
+        """
+        if (points_per_s is None) == (points_per_t is None):
+            raise ValueError(
+                "Exactly one of `points_per_s` or `points_per_t` must be supplied."
+            )
+        if len(self) == 0:
+            return []
+        if points_per_t:
+            num = np.maximum(
+                1, np.ceil((self.max_t - self.min_t) * points_per_t)
+            ).astype(int)
+            ts, group = _ragged_linspace(self.min_t, self.max_t, num)
+            if self._time_fn is None:
+                self._build_knots()
+            poses = self._time_fn.clamped(ts, group)
+            data = np.concatenate([ts[:, None], poses], axis=1)
+        else:
+            lengths = self.arclength
+            num = np.maximum(1, np.ceil(lengths * points_per_s)).astype(int)
+            ss, group = _ragged_linspace(np.zeros(len(self)), lengths, num)
+            data = self._positions_at_s(ss, group)
+        return Trajectory.from_many(self._split(data, num), dtype=self.dtype)
+
+    def smooth_headings(self) -> List[Trajectory]:
+        """
+        Smooth the headings of every trajectory.
+
+        Gives the same trajectories as `Trajectory.smooth_headings` for each
+        trajectory.
+        """
+        if len(self) == 0:
+            return []
+        s = self.s
+        group = np.repeat(np.arange(len(self)), self.lengths)
+        delta = (
+            self._positions_at_s(s + 1e-2, group)[:, 1:3]
+            - self._positions_at_s(s - 1e-2, group)[:, 1:3]
+        )
+        h = np.arctan2(delta[:, 1], delta[:, 0])
+        data = self.data.copy()
+        data[:, 4] = _resolve_headings(h, self.offsets[:-1], self.offsets[1:])
+        return Trajectory.from_many(
+            self._split(data, self.lengths), dtype=self.dtype
+        )
+
+
+class _RaggedLinear:
+    """
+    Linear interpolation of many piecewise linear functions at once.
+
+    The knots of every function are offset so that the knots of all functions
+    can be searched in a single sorted array. The results are the same as
+    `interp1d` for each function.
+    """
+
+    def __init__(self, x: NDArray, y: NDArray, lengths: NDArray):
+        """
+        Store the knots of the functions.
+
+        Parameters
+        ----------
+        x : np.ndarray
+            The concatenated knots of the functions with shape (N,). The knots
+            of each function must be increasing.
+
+        y : np.ndarray
+            The values at the knots with shape (N, m).
+
+        lengths : np.ndarray
+            The number of knots of each function. Must be at least two.
+
+        """
+        self.x = np.ascontiguousarray(x)
+        self.y = np.ascontiguousarray(y)
+        self.last = np.cumsum(lengths) - 1
+        self.first = self.last - lengths + 1
+        self._lo = self.x.min()
+        self._span = self.x.max() - self._lo + 1.0
+        self._offset = np.arange(len(lengths)) * self._span
+        self._keys = (self.x - self._lo) + np.repeat(self._offset, lengths)
+
+    @property
+    def nbytes(self) -> int:
+        """Return the memory used by the knots."""
+        return self.x.nbytes + self.y.nbytes + self._keys.nbytes
+
+    def __call__(self, xq: NDArray, group: NDArray) -> NDArray:
+        """
+        Evaluate the functions given by `group` at `xq`.
+
+        The two arrays are broadcast together and values are linearly
+        extrapolated outside of the knots of each function.
+        """
+        xq, group = np.broadcast_arrays(xq, group)
+        query = np.clip(xq, self._lo, self._lo + self._span - 1.0) - self._lo
+        idx = self._keys.searchsorted(query + self._offset[group])
+        # adding the offsets can round a query onto a neighbouring knot so the
+        # index is corrected to the first knot of the function not below xq
+        first, last = self.first[group], self.last[group]
+        idx = idx.clip(first, last + 1)
+        idx -= (idx > first) & (self.x[idx - 1] >= xq)
+        idx += (idx <= last) & (self.x[np.minimum(idx, last)] < xq)
+        idx = idx.clip(first + 1, last)
+        x_lo, y_lo = self.x[idx - 1], self.y[idx - 1].astype(float, copy=False)
+        slope = (self.y[idx] - y_lo) / (self.x[idx] - x_lo)[..., None]
+        return slope * (xq - x_lo)[..., None] + y_lo
+
+    def clamped(self, xq: NDArray, group: NDArray) -> NDArray:
+        """Evaluate the functions fixing the values outside of the knots."""
+        out = self(xq, group)
+        xq, group = np.broadcast_arrays(xq, group)
+        first, last = self.first[group], self.last[group]
+        out = np.where((xq < self.x[first])[..., None], self.y[first], out)
+        return np.where((xq > self.x[last])[..., None], self.y[last], out)
+
+
+def _ragged_linspace(
+    start: NDArray, stop: NDArray, num: NDArray
+) -> Tuple[NDArray, NDArray]:
+    """
+    Concatenate `np.linspace(start[i], stop[i], num[i])` for every i.
+
+    Returns the values and the index i of each value.
+    """
+    group = np.repeat(np.arange(num.shape[0]), num)
+    ends = np.cumsum(num)
+    i = np.arange(ends[-1]) - np.repeat(ends - num, num)
+    step = (stop - start) / np.maximum(num - 1, 1)
+    values = i * step[group] + start[group]
+    multi = num > 1
+    values[ends[multi] - 1] = stop[multi]
+    return values, group
+
+
+def _split_precision(
+    data: NDArray, dtype: Optional[DTypeLike] = None
+) -> Tuple[NDArray, NDArray, Optional[NDArray]]:
+    """
+    Split (N, 7) float64 data into times and poses stored with the dtype.
+
+    Returns the times, the poses and the data of which they are views if the
+    poses are stored in float64 otherwise None.
+    """
+    if resolve_dtype(dtype) == np.float64:
+        return data[:, 0], data[:, 1:], data
+    return data[:, 0].copy(), data[:, 1:].astype(resolve_dtype(dtype)), None
+
+
+def _join_precision(t: NDArray, poses: NDArray) -> NDArray:
+    """Join times and poses into a read-only (N, 7) float64 array."""
+    data = np.empty((t.shape[0], 7))
+    data[:, 0] = t
+    data[:, 1:] = poses
+    data.flags.writeable = False
+    return data
+
+
+def _estimate_heading(t: NDArray, xy: NDArray) -> NDArray:
+    """Estimate the heading at each time from the direction of travel."""
+    from scipy.interpolate import interp1d
+
+    fn = interp1d(t, xy, axis=0, fill_value="extrapolate")
+    return np.arctan2(*np.flip(fn(t + 1e-2) - fn(t - 1e-2), axis=1).T)
+
+
 def _resolve_heading(h: NDArray) -> NDArray:
     """Update heading so that there are no large jumps."""
     deltas = np.diff(h) % (2 * np.pi)
@@ -469,6 +1374,17 @@ def _resolve_heading(h: NDArray) -> NDArray:
     return np.hstack([h[0], deltas]).cumsum()
 
 
+def _resolve_headings(h: NDArray, starts: NDArray, ends: NDArray) -> NDArray:
+    """Resolve the headings of many trajectories as in `_resolve_heading`."""
+    deltas = np.empty(h.shape[0])
+    deltas[1:] = np.diff(h) % (2 * np.pi)
+    deltas = np.where(deltas > np.pi, deltas - 2 * np.pi, deltas)
+    deltas[starts] = h[starts]
+    for i, j in zip(starts, ends):
+        np.cumsum(deltas[i:j], out=deltas[i:j])
+    return deltas
+
+
 def is_stationary(data: np.ndarray) -> bool:
     """
     Check if an entity is stationary for the entire scenario.
@@ -0,0 +1,406 @@
+from copy import deepcopy
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+
+from scenario_gym.action import TeleportAction
+from scenario_gym.agent import (
+    Agent,
+    PIDAgent,
+    ReplayTrajectoryAgent,
+    _create_agent,
+)
+from scenario_gym.controller import PIDController, ReplayTrajectoryController
+from scenario_gym.entity import BatchReplayEntity, Entity
+from scenario_gym.metrics import Metric
+from scenario_gym.profiling import span
+from scenario_gym.scenario import Scenario
+from scenario_gym.scenario_gym import ScenarioGym
+from scenario_gym.sensor import EgoLocalizationSensor
+from scenario_gym.state import TERMINAL_CONDITIONS, State
+from scenario_gym.state.utils import collision_dict, collision_pairs, oriented_boxes
+from scenario_gym.trajectory import TrajectoryBatch
+
+# agents whose step is batched across gyms and the controller they must use
+_BATCHED_AGENTS = {
+    ReplayTrajectoryAgent: ReplayTrajectoryController,
+    PIDAgent: PIDController,
+}
+
+
+class _EnvBatch(NamedTuple):
+    """The packed trajectories of the entities of a gym that are batched."""
+
+    replay: Optional[TrajectoryBatch]
+    agents: TrajectoryBatch
+    agent_ids: List[int]
+
+
+def _is_batched(agent: Agent) -> bool:
+    """Return True if the step of the agent can be batched across gyms."""
+    return (
+        _BATCHED_AGENTS.get(type(agent)) is type(agent.controller)
+        and type(agent.sensor) is EgoLocalizationSensor
+    )
+
+
+class VectorScenarioGym:
+    """
+    Runs a batch of independent scenarios in lockstep in a single process.
+
+    Holds `num_envs` gyms which are all stepped together. Scenarios are taken
+    in order from the list of scenarios given (cycling back to the start when
+    they are exhausted) and each gym is automatically reset with the next
+    scenario when its current scenario finishes. The metric values of each
+    finished scenario are stored in `results`.
+
+    The gyms are stepped together rather than one after another. The poses of
+    the replayed entities of every gym are computed from a single batch of
+    trajectories. Replay and PID agents are also stepped together with their
+    targets taken from a batch of the agents' trajectories and their
+    controllers vectorised with `Controller.step_many`. The sensors of these
+    agents are not called since their policies do not use the observation.
+    Other agents are stepped individually. After the actions and callbacks of
+    every gym the collisions of every gym are detected at once when they are
+    first needed and the terminal conditions are checked together. Gyms
+    whose step or state step is overridden are stepped individually.
+
+    The trajectories of a gym are packed when it loads a scenario so a reset
+    only repacks that gym. The work of each gym is timed with its profiler
+    and the work shared by the gyms with the active profiler e.g. the
+    collisions are timed by the profiler of the gym that first needs them.
+    """
+
+    def __init__(
+        self,
+        num_envs: int,
+        scenarios: Sequence[Union[str, Scenario]],
+        create_agent: Callable[[Scenario, Entity], Optional[Agent]] = _create_agent,
+        metrics: Optional[List[Metric]] = None,
+        **kwargs,
+    ):
+        """
+        Init the gyms.
+
+        Parameters
+        ----------
+        num_envs : int
+            The number of scenarios run at once.
+
+        scenarios : Sequence[Union[str, Scenario]]
+            Scenario objects or filepaths of the scenarios to run.
+
+        create_agent : Callable[[Scenario, Entity], Optional[Agent]]
+            A function that returns an agent to control a given entity.
+
+        metrics : Optional[List[Metric]]
+            Metrics to measure. Each gym uses its own copy of the metrics.
+
+        kwargs:
+            Keyword arguments for the ScenarioGym constructor of each gym.
+
+        """
+        if num_envs < 1:
+            raise ValueError("num_envs must be at least 1.")
+        if not scenarios:
+            raise ValueError("At least one scenario must be given.")
+        self.num_envs = num_envs
+        self.scenarios = list(scenarios)
+        self.create_agent = create_agent
+        self.gyms = [
+            ScenarioGym(
+                metrics=deepcopy(metrics) if metrics is not None else None,
+                **kwargs,
+            )
+            for _ in range(num_envs)
+        ]
+        self.results: List[Tuple[Union[str, Scenario], Dict[str, Any]]] = []
+        self._next_idx = 0
+        self._current: List[Optional[Union[str, Scenario]]] = [None] * num_envs
+        self._batched: Optional[List[int]] = None
+        self._pieces: List[Optional[_EnvBatch]] = [None] * num_envs
+
+    @property
+    def states(self) -> List[State]:
+        """Get the current state of each gym."""
+        return [gym.state for gym in self.gyms]
+
+    def _load_next(self, idx: int) -> None:
+        """Load the next scenario in the gym at idx."""
+        scenario = self.scenarios[self._next_idx % len(self.scenarios)]
+        self._next_idx += 1
+        gym = self.gyms[idx]
+        if isinstance(scenario, Scenario):
+            gym.set_scenario(scenario, create_agent=self.create_agent)
+        else:
+            gym.load_scenario(scenario, create_agent=self.create_agent)
+        self._current[idx] = scenario
+        self._pieces[idx] = None
+        self._batched = None
+
+    def _pack(self, idx: int) -> _EnvBatch:
+        """Pack the trajectories of the replayed entities and agents of a gym."""
+        state = self.gyms[idx].state
+        non_agents = state.non_agents
+        replay = None
+        if type(non_agents) is BatchReplayEntity and not non_agents.timestep:
+            replay = non_agents.batch
+        agents = [a for a in state.agents.values() if _is_batched(a)]
+        return _EnvBatch(
+            replay,
+            TrajectoryBatch.from_trajectories([a.trajectory for a in agents]),
+            [id(a) for a in agents],
+        )
+
+    def _prepare(self) -> None:
+        """
+        Combine the trajectories of the gyms that are stepped together.
+
+        The trajectories of each gym are packed when it loads a scenario and
+        the packed trajectories of the replayed entities of every gym are
+        joined into one batch with the gym and state index of each and
+        similarly for the trajectories of the batched agents.
+        """
+        self._batched = [
+            idx for idx, gym in enumerate(self.gyms) if gym.has_default_step()
+        ]
+        pieces = []
+        for idx in self._batched:
+            if self._pieces[idx] is None:
+                self._pieces[idx] = self._pack(idx)
+            pieces.append(self._pieces[idx])
+        self._replay_gyms = np.array([p.replay is not None for p in pieces])
+        replays = [self.gyms[idx].state.non_agents for idx in self._batched]
+        replays = [r for r, p in zip(replays, pieces) if p.replay is not None]
+        counts = [len(p.replay) if p.replay is not None else 0 for p in pieces]
+        self._replay_offsets = np.cumsum([0] + counts)
+        self._replay = TrajectoryBatch.concatenate([r.batch for r in replays])
+        self._replay_env = np.repeat(np.arange(len(pieces)), counts)
+        self._replay_idx = np.concatenate(
+            [r.indices for r in replays] + [np.empty(0, dtype=int)]
+        )
+        self._replay_always = np.concatenate(
+            [r._always for r in replays] + [np.empty(0, dtype=bool)]
+        )
+        self._agents = TrajectoryBatch.concatenate([p.agents for p in pieces])
+        self._agent_env = np.repeat(
+            np.arange(len(pieces)), [len(p.agent_ids) for p in pieces]
+        )
+        self._agent_rows = {
+            agent: row
+            for row, agent in enumerate(a for p in pieces for a in p.agent_ids)
+        }
+
+    def reset(self) -> List[State]:
+        """Load a new scenario into every gym and return the states."""
+        self._next_idx = 0
+        self.results.clear()
+        for idx in range(self.num_envs):
+            self._load_next(idx)
+        return self.states
+
+    def step(self) -> np.ndarray:
+        """
+        Step every gym by one timestep.
+
+        Any gym whose scenario finished is reset with the next scenario after
+        its metrics are recorded.
+
+        Returns
+        -------
+        np.ndarray
+            Boolean array of shape (num_envs,) indicating which gyms finished
+            their scenario on this step.
+
+        """
+        if any(gym.state is None for gym in self.gyms):
+            self.reset()
+        if self._batched is None:
+            self._prepare()
+        batched = set(self._batched)
+        for idx, gym in enumerate(self.gyms):
+            if idx not in batched:
+                gym.step()
+        if self._batched:
+            self._step_batched([self.gyms[idx] for idx in self._batched])
+        dones = np.array([gym.state.is_done for gym in self.gyms])
+        for idx in np.flatnonzero(dones):
+            gym = self.gyms[idx]
+            for agent in gym.state.agents.values():
+                agent.finish(gym.state)
+            self.results.append((self._current[idx], gym.get_metrics()))
+            self._load_next(idx)
+        return dones
+
+    def _step_batched(self, gyms: List[ScenarioGym]) -> None:
+        """Step the gyms from `_prepare` together."""
+        states = [gym.state for gym in gyms]
+        for gym, state in zip(gyms, states):
+            state.next_t = state.t + gym.timestep
+        next_t = np.array([state.next_t for state in states], dtype=float)
+
+        # poses of the replayed entities of every gym
+        with span("replay", "positions_at_each_t"):
+            t = next_t[self._replay_env]
+            replay_poses = self._replay.positions_at_each_t(t)
+            replay_active = self._replay_always | (
+                (self._replay.min_t <= t) & (t <= self._replay.max_t)
+            )
+            targets = self._agents.positions_at_each_t(next_t[self._agent_env])
+
+        # agents: batched agents are grouped by controller class
+        new_poses: List[Dict[Entity, Any]] = [{} for _ in gyms]
+        groups: Dict[type, List[Tuple[Any, ...]]] = {}
+        for k, (gym, state) in enumerate(zip(gyms, states)):
+            with gym._profiling():
+                for entity, agent in state.agents.items():
+                    if entity in state.poses:
+                        row = self._agent_rows.get(id(agent))
+                        if row is None:
+                            pose = gym._agent_step(entity, agent)
+                            if pose is not None:
+                                new_poses[k][entity] = pose
+                            elif gym.persist:
+                                new_poses[k][entity] = state.poses[entity]
+                            continue
+                        pos = targets[row]
+                        if type(agent) is ReplayTrajectoryAgent:
+                            action = TeleportAction(pose=pos)
+                        else:
+                            action = TeleportAction(x=pos[0], y=pos[1], z=pos[2])
+                        agent.last_action = action
+                        groups.setdefault(type(agent.controller), []).append(
+                            (agent.controller, state, action, k, entity)
+                        )
+                    elif entity.trajectory.min_t >= state.t:
+                        # the agent is initialised at its start position
+                        new_poses[k][entity] = entity.trajectory.position_at_t(
+                            state.next_t
+                        )
+        for Controller_, group in groups.items():
+            controllers, group_states, actions, envs, entities = zip(*group)
+            with span("controller", Controller_, num_agents=len(group)):
+                poses = Controller_.step_many(controllers, group_states, actions)
+            for k, entity, pose in zip(envs, entities, poses):
+                new_poses[k][entity] = pose
+
+        # update the poses of each state then its actions and callbacks
+        offsets = self._replay_offsets
+        for k, (gym, state) in enumerate(zip(gyms, states)):
+            with gym._profiling():
+                with span("non_agents", state.non_agents):
+                    if self._replay_gyms[k]:
+                        rows = slice(offsets[k], offsets[k + 1])
+                        active = replay_active[rows]
+                        poses = replay_poses[rows][active]
+                        idxs = self._replay_idx[rows][active]
+                    else:
+                        poses, idxs = state.non_agents.step_array(state)
+                state._clear_cache()
+                with span("state", "poses"):
+                    state.update_pose_array(
+                        state.next_t, *gym._pose_arrays(new_poses[k], poses, idxs)
+                    )
+                with span("state", "actions"):
+                    state.update_actions()
+                state.update_callbacks()
+
+        # collisions are detected for every gym at once when first needed
+        def detect_collisions() -> None:
+            self._detect_collisions(states)
+
+        for state in states:
+            state._collision_source = detect_collisions
+
+        # terminal conditions
+        max_length = TERMINAL_CONDITIONS["max_length"]
+        ends = np.array([state.t + state.dt for state in states]) > np.array(
+            [state.scenario.length for state in states]
+        )
+        for gym, end, state in zip(gyms, ends, states):
+            with gym._profiling(), span("state", "terminal"):
+                state.is_done = any(
+                    end if cond is max_length else cond(state)
+                    for cond in state.terminal_conditions
+                )
+
+        for gym, state in zip(gyms, states):
+            with gym._profiling():
+                gym._step_metrics()
+                if gym.viewer is not None:
+                    with span("render", gym.viewer):
+                        state.last_keystroke = gym.render()
+            state._collision_source = None
+
+    @staticmethod
+    def _detect_collisions(states: List[State]) -> None:
+        """
+        Detect the collisions in every state at once.
+
+        The boxes of the entities present in the states whose collisions have
+        not yet been computed are tested together and the collisions of each
+        state are cached.
+        """
+        states = [state for state in states if state._collisions is None]
+        with span("state", "collisions", num_states=len(states)):
+            idxs = [np.flatnonzero(state._active) for state in states]
+            groups = np.repeat(
+                np.arange(len(states)), [idx.shape[0] for idx in idxs]
+            )
+            rows = np.concatenate(idxs) if idxs else np.empty(0, dtype=int)
+            if rows.shape[0]:
+                boxes = oriented_boxes(
+                    np.concatenate([s._poses[idx] for s, idx in zip(states, idxs)]),
+                    np.concatenate(
+                        [s._box_dims[idx] for s, idx in zip(states, idxs)]
+                    ),
+                )
+                i, j = collision_pairs(boxes, groups)
+            else:
+                i = j = rows
+            order = np.argsort(groups[i], kind="stable")
+            i, j = i[order], j[order]
+            bounds = np.searchsorted(groups[i], np.arange(len(states) + 1))
+            for k, (state, idx) in enumerate(zip(states, idxs)):
+                pairs = slice(bounds[k], bounds[k + 1])
+                state._collisions = collision_dict(
+                    state.all_entities, idx, rows[i[pairs]], rows[j[pairs]]
+                )
+
+    def run(
+        self, num_scenarios: int
+    ) -> List[Tuple[Union[str, Scenario], Dict[str, Any]]]:
+        """
+        Step the gyms until a number of scenarios have finished.
+
+        Parameters
+        ----------
+        num_scenarios : int
+            The number of scenarios to complete.
+
+        Returns
+        -------
+        List[Tuple[Union[str, Scenario], Dict[str, Any]]]
+            The scenario and metric values of each finished scenario in the
+            order that they finished.
+
+        """
+        self.reset()
+        while len(self.results) < num_scenarios:
+            self.step()
+        return self.results[:num_scenarios]
+
+    def close(self) -> None:
+        """Close all gyms."""
+        for gym in self.gyms:
+            gym.close()
@@ -14,6 +14,7 @@ from shapely.geometry.base import BaseGeometry
 from shapely.strtree import STRtree
 
 from scenario_gym.entity import Entity, Pedestrian, Vehicle
+from scenario_gym.profiling import span
 from scenario_gym.road_network import RoadNetwork
 from scenario_gym.state import State
 
@@ -258,10 +259,12 @@ class OpenCVViewer(Viewer):
             self.build_kd_tree(state)
 
         key = None
-        self.draw_frame(state, e_ref=self.entity_ref)
+        with span("render", "draw_frame"):
+            self.draw_frame(state, e_ref=self.entity_ref)
 
         if self.headless_rendering:
-            self.video_writer.write(self._frame)
+            with span("render", "encode"):
+                self.video_writer.write(self._frame)
         else:
             cv2.imshow(self.window_name, self._frame)
             wait_time = 0 if self.fps == 0 else 1000 // self.fps
@@ -1,3 +1,11 @@
 from scenario_gym.xosc_interface.catalogs import read_catalog, write_catalogs
 from scenario_gym.xosc_interface.read import import_scenario
-from scenario_gym.xosc_interface.write import write_scenario
+
+
+def __getattr__(name: str):
+    """Import the writing functions when used since they need scenariogeneration."""
+    if name == "write_scenario":
+        from scenario_gym.xosc_interface.write import write_scenario
+
+        return write_scenario
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -5,7 +5,6 @@ from typing import Dict, List, Optional, Tuple, Type
 
 from lxml import etree
 from lxml.etree import Element
-from scenariogeneration import xosc
 
 from scenario_gym.catalog_entry import Catalog, CatalogEntry
 from scenario_gym.entity import DEFAULT_ENTITY_TYPES, Entity
@@ -86,6 +85,8 @@ def read_catalog(
 
 def write_catalogs(dirname: str, entries: List[CatalogEntry]) -> None:
     """Create catalog files for a list of catalog entries."""
+    from scenariogeneration import xosc
+
     c_to_e = defaultdict(list)
     for entry in entries:
         c_to_e[entry.catalog].append(entry)
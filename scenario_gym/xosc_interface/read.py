@@ -8,6 +8,7 @@ from lxml import etree
 from lxml.etree import Element
 
 from scenario_gym.entity import Entity, Pedestrian, Vehicle
+from scenario_gym.profiling import traced
 from scenario_gym.road_network import RoadNetwork
 from scenario_gym.scenario import Scenario, ScenarioAction
 from scenario_gym.scenario.actions import UserDefinedAction
@@ -17,6 +18,7 @@ from scenario_gym.utils import load_properties_from_xml
 from .catalogs import load_object, read_catalog
 
 
+@traced("load", "import_scenario")
 def import_scenario(
     osc_file: str,
     relabel: bool = True,
@@ -120,6 +122,8 @@ def import_scenario(
                     raise e
 
     # Read init actions:
+    # trajectories are created together once all have been read
+    trajectory_data: Dict[str, np.ndarray] = {}
     for private in osc_root.iterfind("Storyboard/Init/Actions/Private"):
         entity_ref = private.attrib["entityRef"]
         for wp in private.iterfind(
@@ -128,7 +132,7 @@ def import_scenario(
             tp = traj_point_from_time_and_position(0, wp)
             # Add a single-waypoint trajectory:
             if entity_ref in entities:
-                entities[entity_ref].trajectory = Trajectory(np.stack([tp], axis=0))
+                trajectory_data[entity_ref] = np.stack([tp], axis=0)
 
     # Read maneuver actions:
     actions = []
@@ -148,12 +152,12 @@ def import_scenario(
                 "Action/PrivateAction/RoutingAction/FollowTrajectoryAction"
             )
             if traj_action is not None:
-                trajectory = read_trajectory_event(
+                traj_data = read_trajectory_data(
                     traj_action,
                     road_network=road_network,
                 )
-                if trajectory is not None:
-                    entity.trajectory = trajectory
+                if traj_data is not None:
+                    trajectory_data[entity_ref] = traj_data
                     continue
 
             user_action = event.find("Action/UserDefinedAction")
@@ -167,6 +171,10 @@ def import_scenario(
                     )
                 )
 
+    trajectories = Trajectory.from_many(list(trajectory_data.values()))
+    for entity_ref, trajectory in zip(trajectory_data, trajectories):
+        entities[entity_ref].trajectory = trajectory
+
     header = osc_root.find("FileHeader")
     if header is not None:
         properties, files = load_properties_from_xml(header)
@@ -194,6 +202,17 @@ def read_trajectory_event(
     road_network: Optional[RoadNetwork] = None,
 ) -> Optional[Trajectory]:
     """Read a trajectory event from a ManeuverGroup."""
+    traj_data = read_trajectory_data(trajectory_action, road_network=road_network)
+    if traj_data is None:
+        return None
+    return Trajectory(traj_data)
+
+
+def read_trajectory_data(
+    trajectory_action: Element,
+    road_network: Optional[RoadNetwork] = None,
+) -> Optional[np.ndarray]:
+    """Read the points of a trajectory event from a ManeuverGroup."""
     # trajectory points
     trajectory_points = []
     vertices = trajectory_action.findall(
@@ -213,8 +232,7 @@ def read_trajectory_event(
         traj_data[:, 3] = road_network.elevation_at_point(
             traj_data[:, 1], traj_data[:, 2]
         )
-
-    return Trajectory(traj_data)
+    return traj_data
 
 
 def load_user_defined_action(
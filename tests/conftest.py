@@ -1,9 +1,15 @@
 import importlib
+import json
 import os
+import platform
+import subprocess
+import time
+import timeit
 import warnings
 from pathlib import Path
-from typing import Callable, Dict
+from typing import Any, Callable, Dict, List, Optional
 
+import numpy as np
 import pytest as pt
 
 
@@ -15,6 +21,123 @@ def pytest_addoption(parser):
         dest="speed_tests",
         help="Enable tests in test_speeds.py",
     )
+    parser.addoption(
+        "--benchmark_json",
+        default=None,
+        dest="benchmark_json",
+        help="Write the results of the speed tests to this json file.",
+    )
+    parser.addoption(
+        "--benchmark_baseline",
+        default=None,
+        dest="benchmark_baseline",
+        help="Fail speed tests which are slower than the results in this file.",
+    )
+    parser.addoption(
+        "--benchmark_tolerance",
+        default=1.5,
+        type=float,
+        dest="benchmark_tolerance",
+        help="Allowed slowdown relative to the baseline before a test fails.",
+    )
+
+
+class Benchmark:
+    """
+    Times functions and records the results for the speed tests.
+
+    Each result is identified by its name and parameters. If a baseline is
+    given then a benchmark fails when its fastest time is slower than the
+    fastest time of the baseline by more than the tolerance factor.
+    """
+
+    def __init__(
+        self,
+        baseline: Optional[Dict[str, Any]] = None,
+        tolerance: float = 1.5,
+    ):
+        self.tolerance = tolerance
+        self.results: List[Dict[str, Any]] = []
+        self.baseline = {}
+        if baseline is not None:
+            self.baseline = {
+                self.key(r["name"], r["params"]): r for r in baseline["results"]
+            }
+
+    @staticmethod
+    def key(name: str, params: Dict[str, Any]) -> str:
+        """Get a unique key for a benchmark."""
+        return name + json.dumps(params, sort_keys=True)
+
+    def __call__(
+        self,
+        name: str,
+        fn: Callable[[], Any],
+        repeat: int = 5,
+        number: int = 1,
+        **params,
+    ) -> Dict[str, Any]:
+        """Time a function and record the result under the name and params."""
+        fn()  # warm up caches before timing
+        times = np.array(timeit.repeat(fn, repeat=repeat, number=number)) / number
+        result = {
+            "name": name,
+            "params": params,
+            "repeat": repeat,
+            "number": number,
+            "min": float(times.min()),
+            "mean": float(times.mean()),
+            "std": float(times.std()),
+        }
+        self.results.append(result)
+        print(f"{name} {params}: {1e3 * result['min']:.4f}ms")
+
+        base = self.baseline.get(self.key(name, params))
+        if base is not None and result["min"] > self.tolerance * base["min"]:
+            pt.fail(
+                f"{name} {params} took {result['min']:.4g}s which is slower than "
+                f"the baseline {base['min']:.4g}s."
+            )
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the results with information about the environment."""
+        try:
+            commit = subprocess.run(
+                ["git", "rev-parse", "HEAD"],
+                cwd=os.path.dirname(__file__),
+                capture_output=True,
+                text=True,
+            ).stdout.strip()
+        except OSError:
+            commit = None
+        return {
+            "commit": commit or None,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "results": self.results,
+        }
+
+
+@pt.fixture(scope="session")
+def benchmark(request):
+    """Record the timings of speed tests and write them to a json file."""
+    baseline = None
+    path = request.config.getoption("benchmark_baseline")
+    if path is not None:
+        with open(path, "r") as f:
+            baseline = json.load(f)
+    bench = Benchmark(
+        baseline=baseline,
+        tolerance=request.config.getoption("benchmark_tolerance"),
+    )
+    yield bench
+    path = request.config.getoption("benchmark_json")
+    if path is not None and bench.results:
+        with open(path, "w") as f:
+            json.dump(bench.to_dict(), f, indent=2)
 
 
 @pt.fixture(scope="session")
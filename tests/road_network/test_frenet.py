@@ -0,0 +1,96 @@
+import numpy as np
+import pytest as pt
+from shapely.geometry import LineString, Point
+
+from scenario_gym.road_network import FrenetFrame, RoadNetwork
+from scenario_gym.state import State
+from scenario_gym.trajectory import Trajectory
+from scenario_gym.xosc_interface import import_scenario
+
+
+@pt.fixture
+def road_network(all_road_networks):
+    """Load the 6-way road network."""
+    return RoadNetwork.create_from_json(
+        all_road_networks["dRisk Unity 6-lane Intersection"]
+    )
+
+
+def test_straight_line():
+    """Test the transform along a simple polyline."""
+    frame = FrenetFrame(
+        LineString([[0.0, 0.0], [10.0, 0.0], [10.0, 0.0], [10.0, 5.0]])
+    )
+    assert len(frame) == 2 and frame.length == 15.0
+
+    xy = np.array([[2.0, 1.0], [5.0, -2.0], [-3.0, 1.0], [9.0, 8.0], [11.0, 3.0]])
+    sd = frame.to_frenet(xy)
+    expected = [[2.0, 1.0], [5.0, -2.0], [-3.0, 1.0], [18.0, 1.0], [13.0, -1.0]]
+    assert np.allclose(sd, expected)
+    assert np.allclose(frame.from_frenet(sd), xy)
+    assert frame.to_frenet(xy[None]).shape == (1, 5, 2)
+
+    poses = np.zeros((2, 6))
+    poses[:, :2] = [[2.0, 1.0], [11.0, 3.0]]
+    poses[:, 3] = [0.5, -3.0]
+    frenet = frame.poses_to_frenet(poses)
+    assert np.allclose(frenet[:, 3], [0.5, 2 * np.pi - 3.0 - np.pi / 2])
+    assert np.allclose(frame.poses_from_frenet(frenet), poses)
+
+    with pt.raises(ValueError):
+        FrenetFrame(np.ones((3, 2)))
+
+
+@pt.mark.parametrize("max_brute_force", [0, 10**6])
+def test_matches_project(road_network, max_brute_force, monkeypatch):
+    """Test that the transform matches projecting onto the lane centers."""
+    monkeypatch.setattr(FrenetFrame, "_max_brute_force", max_brute_force)
+    rng = np.random.default_rng(0)
+    for lane in road_network.lanes[:20]:
+        center = lane.center
+        xy = np.array(
+            [
+                center.interpolate(s).coords[0]
+                for s in rng.uniform(0, center.length, 50)
+            ]
+        ) + rng.normal(size=(50, 2))
+        frame = FrenetFrame(center)
+        sd = frame.to_frenet(xy)
+        inside = (sd[:, 0] > 0) & (sd[:, 0] < center.length)
+        s = [center.project(Point(p)) for p in xy[inside]]
+        d = [center.distance(Point(p)) for p in xy[inside]]
+        assert np.allclose(sd[inside, 0], s)
+        assert np.allclose(np.abs(sd[inside, 1]), d)
+        assert np.isnan(frame.to_frenet([np.nan, 0.0])).all()
+
+
+def test_trajectory_frenet(road_network):
+    """Test transforming trajectories to and from a lane's frame."""
+    lane = road_network.lanes[0]
+    frame = lane.frenet
+    assert lane.frenet is frame
+    data = np.zeros((20, 7))
+    data[:, 0] = np.arange(20) * 0.1
+    data[:, 1] = np.linspace(0.0, 0.9 * frame.length, 20)
+    data[:, 2] = 0.3
+    traj = Trajectory.from_frenet(data, frame)
+    assert np.allclose(traj.to_frenet(frame)[:, :3], data[:, :3], atol=1e-6)
+
+
+def test_state_frenet(all_scenarios):
+    """Test the Frenet poses of the state."""
+    scenario = import_scenario(
+        all_scenarios["3e39a079-5653-440c-bcbe-24dc9f6bf0e6"]
+    )
+    state = State(scenario)
+    state.reset(0.0)
+    frame = scenario.road_network.lanes[0].frenet
+    poses = state.frenet_pose_array(frame)
+    active = state.active_mask
+    assert poses.shape == state.pose_array.shape
+    assert np.isnan(poses[~active]).all() and not np.isnan(poses[active]).any()
+    for pose, frenet in zip(state.pose_array[active], poses[active]):
+        assert np.allclose(frenet, frame.poses_to_frenet(pose))
+    back = state.pose_array_from_frenet(frame, poses)
+    assert back.dtype == state.dtype
+    assert np.isnan(back[~active]).all()
@@ -0,0 +1,211 @@
+"""Generators of synthetic road networks and scenarios for benchmarks."""
+from typing import List, Optional
+
+import numpy as np
+from shapely.geometry import LineString, Point
+
+from scenario_gym.catalog_entry import BoundingBox
+from scenario_gym.entity import Vehicle
+from scenario_gym.entity.vehicle import VehicleCatalogEntry
+from scenario_gym.road_network import Intersection, Lane, Road, RoadNetwork
+from scenario_gym.scenario import Scenario
+from scenario_gym.trajectory import Trajectory
+
+LANE_WIDTH = 3.5
+
+
+def _road(road_id: str, center: LineString) -> Road:
+    """Create a two lane road along a center line."""
+    lanes = []
+    for side, offset in (("left", LANE_WIDTH / 2), ("right", -LANE_WIDTH / 2)):
+        lane_center = center.parallel_offset(abs(offset), side)
+        lanes.append(
+            Lane(
+                f"{road_id}_{side}",
+                lane_center.buffer(LANE_WIDTH / 2, cap_style=2),
+                lane_center,
+                [],
+                [],
+                "driving",
+            )
+        )
+    return Road(road_id, center.buffer(LANE_WIDTH, cap_style=2), center, lanes)
+
+
+def grid_road_network(size: int = 4, spacing: float = 100.0) -> RoadNetwork:
+    """
+    Create a road network of a square grid of roads.
+
+    Parameters
+    ----------
+    size : int
+        The number of junctions along each side of the grid.
+
+    spacing : float
+        The distance between adjacent junctions.
+
+    """
+    roads, intersections = [], []
+    half = LANE_WIDTH
+    for i in range(size):
+        for j in range(size):
+            x, y = i * spacing, j * spacing
+            connecting = []
+            if i + 1 < size:
+                roads.append(
+                    _road(
+                        f"road_x_{i}_{j}",
+                        LineString([(x + half, y), (x + spacing - half, y)]),
+                    )
+                )
+                connecting.append(roads[-1].id)
+            if j + 1 < size:
+                roads.append(
+                    _road(
+                        f"road_y_{i}_{j}",
+                        LineString([(x, y + half), (x, y + spacing - half)]),
+                    )
+                )
+                connecting.append(roads[-1].id)
+            intersections.append(
+                Intersection(
+                    f"junction_{i}_{j}",
+                    Point(x, y).buffer(half, cap_style=3),
+                    [],
+                    connecting,
+                )
+            )
+    return RoadNetwork(
+        roads=roads, intersections=intersections, name=f"grid_{size}"
+    )
+
+
+def roundabout_road_network(
+    radius: float = 30.0,
+    num_arms: int = 4,
+    arm_length: float = 100.0,
+    resolution: int = 16,
+) -> RoadNetwork:
+    """
+    Create a road network of a roundabout with straight arms.
+
+    Parameters
+    ----------
+    radius : float
+        The radius of the center line of the roundabout.
+
+    num_arms : int
+        The number of roads leaving the roundabout.
+
+    arm_length : float
+        The length of each arm.
+
+    resolution : int
+        The number of points used for each section of the ring.
+
+    """
+    roads, intersections = [], []
+    angles = np.linspace(0.0, 2 * np.pi, num_arms + 1)
+    for k in range(num_arms):
+        theta = np.linspace(angles[k], angles[k + 1], resolution)
+        ring = np.stack([radius * np.cos(theta), radius * np.sin(theta)], axis=1)
+        roads.append(_road(f"ring_{k}", LineString(ring)))
+        direction = np.array([np.cos(angles[k]), np.sin(angles[k])])
+        start = (radius + LANE_WIDTH) * direction
+        end = (radius + LANE_WIDTH + arm_length) * direction
+        roads.append(_road(f"arm_{k}", LineString([start, end])))
+        intersections.append(
+            Intersection(
+                f"junction_{k}",
+                Point(*(radius * direction)).buffer(LANE_WIDTH),
+                [],
+                [f"ring_{k}", f"ring_{(k - 1) % num_arms}", f"arm_{k}"],
+            )
+        )
+    return RoadNetwork(
+        roads=roads, intersections=intersections, name=f"roundabout_{num_arms}"
+    )
+
+
+def _vehicle_entry() -> VehicleCatalogEntry:
+    """Create a catalog entry for a car."""
+    return VehicleCatalogEntry(
+        None,
+        "car",
+        "car",
+        "Vehicle",
+        BoundingBox(2.0, 4.5, 1.3, 0.0),
+        {},
+        [],
+        None,
+        None,
+        None,
+        None,
+        None,
+        None,
+    )
+
+
+def synthetic_scenario(
+    num_entities: int,
+    duration: float,
+    road_network: Optional[RoadNetwork] = None,
+    dt: float = 0.1,
+    seed: int = 0,
+) -> Scenario:
+    """
+    Create a scenario of vehicles driving along the lanes of a road network.
+
+    Each vehicle drives along a random lane at a random constant speed,
+    turning back at the end of the lane, so that it moves for the full
+    duration. Vehicles may overlap.
+
+    Parameters
+    ----------
+    num_entities : int
+        The number of vehicles including the ego.
+
+    duration : float
+        The length of the scenario in seconds.
+
+    road_network : Optional[RoadNetwork]
+        The road network. If not given then a grid road network is used.
+
+    dt : float
+        The time between the points of each trajectory.
+
+    seed : int
+        Seed for the random number generator.
+
+    """
+    rng = np.random.default_rng(seed)
+    if road_network is None:
+        road_network = grid_road_network()
+    lanes: List[Lane] = road_network.lanes
+    entry = _vehicle_entry()
+    ts = np.arange(0.0, duration + dt / 2, dt)
+
+    entities = []
+    for idx in range(num_entities):
+        points = np.array(lanes[rng.integers(len(lanes))].center.coords)
+        dists = np.linalg.norm(np.diff(points, axis=0), axis=1).cumsum()
+        dists = np.hstack([0.0, dists])
+        length = dists[-1]
+        speed = rng.uniform(5.0, 15.0)
+        s = (rng.uniform(0.0, 2 * length) + speed * ts) % (2 * length)
+        s = np.where(s > length, 2 * length - s, s)
+        xy = np.stack(
+            [np.interp(s, dists, points[:, 0]), np.interp(s, dists, points[:, 1])],
+            axis=1,
+        )
+        traj = Trajectory(
+            np.concatenate([ts[:, None], xy], axis=1), fields=["t", "x", "y"]
+        )
+        ref = "ego" if idx == 0 else f"vehicle_{idx}"
+        entities.append(Vehicle(entry, traj, ref=ref))
+
+    return Scenario(
+        entities,
+        name=f"synthetic_{num_entities}_{int(duration)}",
+        road_network=road_network,
+    )
@@ -1,6 +1,29 @@
 """Test package and module versions (file named so as to always run first)."""
+import subprocess
+import sys
 
 
 def test_scenario_gym():
     """Test importing the package."""
     import scenario_gym  # noqa F401
+
+
+def test_lazy_imports():
+    """Test that heavy optional dependencies are not imported with the package."""
+    code = (
+        "import sys\n"
+        "import scenario_gym\n"
+        "scenario_gym.ScenarioGym()\n"
+        "print(' '.join(sys.modules))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout.split()
+    for module in (
+        "matplotlib",
+        "scenariogeneration",
+        "pyxodr",
+        "cv2",
+        "scipy.interpolate",
+    ):
+        assert module not in out, f"{module} was imported."
@@ -1,7 +1,12 @@
+from copy import deepcopy
+
 import numpy as np
+import pytest as pt
 
 from scenario_gym import ScenarioGym
+from scenario_gym.action import VehicleAction
 from scenario_gym.agent import PIDAgent
+from scenario_gym.controller import PIDController, VehicleController
 
 
 def test_pid_controller(all_scenarios):
@@ -23,3 +28,41 @@ def test_pid_controller(all_scenarios):
         create_agent=create_agent,
     )
     gym.rollout(render=False)
+
+
+@pt.mark.parametrize("Controller", [PIDController, VehicleController])
+def test_step_many(all_scenarios, Controller):
+    """Test that stepping controllers together matches stepping each one."""
+    states, controllers, actions = [], [], []
+    for i, path in enumerate(
+        [
+            all_scenarios["a98d5c7d-76aa-49bf-b88c-97db5d5c7433"],
+            all_scenarios["a5e43fe4-646a-49ba-82ce-5f0063776566"],
+        ]
+    ):
+        gym = ScenarioGym(timestep=0.1)
+        gym.load_scenario(path)
+        gym.step()
+        state = gym.state
+        state.next_t = state.t + 0.1
+        ego = state.scenario.entities[0]
+        controller = Controller(ego, max_speed=5.0 if i else None)
+        controller.reset(state)
+        controller.speed = 4.0 + i
+        if Controller is PIDController:
+            action = gym.state.agents[ego].last_action
+        else:
+            action = VehicleAction(2.0 - 4.0 * i, 0.1)
+        states.append(state)
+        controllers.append(controller)
+        actions.append(action)
+
+    copies = deepcopy(controllers, {id(c.entity): c.entity for c in controllers})
+    expected = [c.step(s, a) for c, s, a in zip(copies, states, actions)]
+    poses = Controller.step_many(controllers, states, actions)
+    assert np.allclose(poses, expected)
+    for controller, other in zip(controllers, copies):
+        assert np.isclose(controller.speed, other.speed)
+        if Controller is PIDController:
+            assert np.isclose(controller.e_lon_int, other.e_lon_int)
+            assert np.isclose(controller.e_lat_prev, other.e_lat_prev)
@@ -76,6 +76,39 @@ def test_batch_entity(example_catalog_entry):
     assert np.allclose(poses[e1][:2], np.zeros(2)), "Entity 1 should be at origin."
     assert e2 not in poses, "Entity 2 should not be returned."
 
+    batch.add_entities([e1, e2], [e1.trajectory, e2.trajectory], indices=[3, 5])
+    poses, idxs = batch.step_array(fake_state)
+    assert (idxs == [3]).all(), "Only entity 1 should be returned."
+    assert np.allclose(poses[:, :2], np.zeros((1, 2)))
+
+    fake_state.next_t = 1.0
+    poses, idxs = batch.step_array(fake_state)
+    assert (idxs == [3, 5]).all() and np.allclose(poses[1, :2], [1.5, 0.0])
+
+
+def test_batch_entity_timestep(example_catalog_entry):
+    """Test that poses are taken at the nearest multiple of the timestep."""
+    trajs = [
+        Trajectory(
+            np.array([[0.0, 0.0, 0.0], [2.0, 2.0, 0.0]]), fields=["t", "x", "y"]
+        ),
+        Trajectory(
+            np.array([[1.0, 0.0, 1.0], [4.0, 3.0, 1.0]]), fields=["t", "x", "y"]
+        ),
+    ]
+    entities = [
+        Entity(example_catalog_entry, trajectory=traj, ref=f"entity_{i}")
+        for i, traj in enumerate(trajs)
+    ]
+    batch = BatchReplayEntity(timestep=0.5)
+    batch.add_entities(entities, trajs)
+    assert batch.max_t == 4.0
+    for t, expected in ((1.2, 1.0), (1.3, 1.5), (-1.0, 0.0), (10.0, 3.5)):
+        poses = batch.fn(t)
+        assert np.allclose(
+            poses[:, 0], [min(expected, 2.0), max(expected - 1.0, 0.0)]
+        )
+
 
 def test_static_entity(example_catalog_entry):
     """Test creating a static entity."""
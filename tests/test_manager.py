@@ -1,8 +1,13 @@
+import csv
+import json
+
 import numpy as np
 
-from scenario_gym.manager import ScenarioManager
+from scenario_gym.manager import ScenarioManager, _scenario_ids
 from scenario_gym.metrics import Metric
+from scenario_gym.results import CSVSink, JSONLSink, Manifest
 from scenario_gym.scenario_gym import ScenarioGym
+from scenario_gym.xosc_interface import import_scenario
 
 
 class EgoMaxSpeedMetric(Metric):
@@ -88,3 +93,117 @@ def test_viewer_params(all_scenarios):
     gym.load_scenario(s)
     gym.render()
     assert gym.viewer.mag != 2, "Parameter should not be passed."
+
+
+def test_run_scenarios_workers(all_scenarios):
+    """Test running scenarios in a process pool."""
+    files = [
+        all_scenarios[s]
+        for s in (
+            "3fee6507-fd24-432f-b781-ca5676c834ef",
+            "41dac6fa-6f83-461e-a145-08692da5f3c7",
+            "9c324146-be03-4d4e-8112-eaf36af15c17",
+        )
+    ]
+    manager = ScenarioManager()
+    manager.add_metric(EgoMaxSpeedMetric())
+    serial = manager.run_scenarios(files)
+    parallel = manager.run_scenarios(files, workers=2)
+    assert len(parallel) == 3, "Should have returned results for 3 scenarios."
+    assert np.allclose(serial, parallel), "Results should be in input order."
+
+
+def test_iter_scenarios(all_scenarios, tmp_path):
+    """Test streaming results and writing them to sinks."""
+    files = [
+        all_scenarios[s]
+        for s in (
+            "3fee6507-fd24-432f-b781-ca5676c834ef",
+            "41dac6fa-6f83-461e-a145-08692da5f3c7",
+            "9c324146-be03-4d4e-8112-eaf36af15c17",
+        )
+    ]
+    manager = ScenarioManager()
+    manager.add_metric(EgoMaxSpeedMetric())
+
+    jsonl_path = str(tmp_path / "results.jsonl")
+    with JSONLSink(jsonl_path, flush_every=2) as sink:
+        outputs = list(manager.iter_scenarios(files, sink=sink))
+    assert [s for s, _ in outputs] == files, "Results should be in input order."
+    with open(jsonl_path) as f:
+        records = [json.loads(line) for line in f]
+    assert [r["scenario"] for r in records] == files
+    assert np.allclose(
+        [r["EgoMaxSpeedMetric"] for r in records], [res[0] for _, res in outputs]
+    )
+
+    csv_path = str(tmp_path / "results.csv")
+    sink = CSVSink(csv_path)
+    outputs = list(
+        manager.iter_scenarios(files, workers=2, ordered=False, sink=sink)
+    )
+    assert sorted(s for s, _ in outputs) == sorted(files)
+    with open(csv_path) as f:
+        rows = list(csv.DictReader(f))
+    assert sorted(r["scenario"] for r in rows) == sorted(files)
+
+
+def test_resume_scenarios(all_scenarios, tmp_path):
+    """Test resuming a batch of scenarios from a manifest."""
+    files = [
+        all_scenarios[s]
+        for s in (
+            "3fee6507-fd24-432f-b781-ca5676c834ef",
+            "41dac6fa-6f83-461e-a145-08692da5f3c7",
+            "9c324146-be03-4d4e-8112-eaf36af15c17",
+        )
+    ]
+    manifest_path = str(tmp_path / "manifest.jsonl")
+    manager = ScenarioManager()
+    manager.add_metric(EgoMaxSpeedMetric())
+    first = manager.run_scenarios(files[:2], manifest=manifest_path)
+    with open(manifest_path, "a") as f:
+        f.write('{"scenario": "incomplete')
+
+    manifest = Manifest(manifest_path)
+    assert len(manifest) == 2 and files[0] in manifest and files[2] not in manifest
+
+    manager = ScenarioManager()
+    manager.add_metric(EgoMaxSpeedMetric())
+    results = manager.run_scenarios(files, workers=2, manifest=manifest_path)
+    assert np.allclose(results[:2], first), "Completed results should be reused."
+    assert len(Manifest(manifest_path)) == 3, "New results should be recorded."
+
+    resumed = manager.run_scenarios(files, manifest=manifest_path)
+    assert resumed == results, "Fresh and resumed results should be equal."
+    assert all(type(v) is float for r in results for v in r)
+
+
+def test_unnamed_scenarios(all_scenarios, tmp_path):
+    """Test that unnamed and repeated scenarios are recorded separately."""
+    path = all_scenarios["3fee6507-fd24-432f-b781-ca5676c834ef"]
+    first = import_scenario(path)
+    second = import_scenario(all_scenarios["41dac6fa-6f83-461e-a145-08692da5f3c7"])
+    first.name = second.name = None
+    scenarios = [first, second, path, path]
+
+    manifest_path = str(tmp_path / "manifest.jsonl")
+    jsonl_path = str(tmp_path / "results.jsonl")
+    manager = ScenarioManager()
+    manager.add_metric(EgoMaxSpeedMetric())
+    with JSONLSink(jsonl_path) as sink:
+        results = manager.run_scenarios(
+            scenarios, sink=sink, manifest=manifest_path
+        )
+    with open(jsonl_path) as f:
+        ids = [json.loads(line)["scenario"] for line in f]
+    assert len(set(ids)) == 4, "Each scenario should have its own identifier."
+    assert len(Manifest(manifest_path)) == 4
+    assert not np.allclose(results[0], results[1])
+
+    resumed = manager.run_scenarios(scenarios, manifest=manifest_path)
+    assert np.allclose(resumed, results), "Results should be resumed by id."
+
+    reordered = [path, second, path, first]
+    assert _scenario_ids(reordered) == [ids[2], ids[1], ids[3], ids[0]]
+    assert set(_scenario_ids(scenarios[1:])) <= set(ids)
@@ -0,0 +1,195 @@
+from typing import Dict
+
+import numpy as np
+import pytest as pt
+
+from scenario_gym import ScenarioGym
+from scenario_gym.precision import get_precision, precision, resolve_dtype
+from scenario_gym.sensor import RasterizedMapSensor
+from scenario_gym.state.history import PoseHistory
+from scenario_gym.trajectory import Trajectory, TrajectoryBatch
+from scenario_gym.xosc_interface import import_scenario
+
+
+def precision_deviation(path: str, dtype=np.float32) -> Dict[str, float]:
+    """
+    Measure the deviation of a rollout in reduced precision from float64.
+
+    The scenario is rolled out with the poses stored in float64 and in `dtype`
+    and the maximum absolute differences of the recorded times, positions and
+    headings, the final velocities and the distances travelled are returned.
+    The deviation of the positions relative to their magnitude is returned
+    as `xyz_rel`.
+    """
+    states = []
+    for dt in (np.float64, dtype):
+        gym = ScenarioGym(dtype=dt)
+        gym.load_scenario(path)
+        gym.rollout()
+        states.append(gym.state)
+    ref, low = states
+    assert low.pose_array.dtype == dtype
+
+    dev = dict.fromkeys(("t", "xyz", "xyz_rel", "h", "velocity", "distance"), 0.0)
+    for e, e_low in zip(ref.all_entities, low.all_entities):
+        poses, other = ref.recorded_poses(e), low.recorded_poses(e_low)
+        assert poses.shape == other.shape
+        if not len(poses):
+            continue
+        delta = np.abs(poses - other)
+        dev["t"] = max(dev["t"], delta[:, 0].max())
+        dev["xyz"] = max(dev["xyz"], delta[:, 1:4].max())
+        rel = delta[:, 1:4] / np.maximum(1.0, np.abs(poses[:, 1:4]))
+        dev["xyz_rel"] = max(dev["xyz_rel"], rel.max())
+        dev["h"] = max(dev["h"], delta[:, 4].max())
+    active = ref.active_mask
+    dev["velocity"] = np.abs(
+        ref.velocity_array[active] - low.velocity_array[active]
+    ).max()
+    dev["distance"] = np.abs(ref.distance_array - low.distance_array).max()
+    return dev
+
+
+def test_resolve_dtype():
+    """Test setting the global precision."""
+    assert get_precision() == np.float64
+    with precision("float32"):
+        assert resolve_dtype() == np.float32
+        assert Trajectory(np.zeros((2, 3)), fields=["t", "x", "y"]).x.dtype == (
+            np.float32
+        )
+    assert resolve_dtype() == np.float64
+    assert resolve_dtype(np.float32) == np.float32
+    with pt.raises(ValueError):
+        resolve_dtype(np.int32)
+
+
+def test_float32_trajectory():
+    """Test trajectories storing poses in float32."""
+    rng = np.random.default_rng(0)
+    data = rng.normal(size=(20, 3)) * 100.0
+    data[:, 0] = 1e5 + np.arange(20) * 0.1
+    traj = Trajectory(data, fields=["t", "x", "y"])
+    low = Trajectory(data, fields=["t", "x", "y"], dtype=np.float32)
+    assert low.dtype == np.float32 and low.t.dtype == np.float64
+    assert np.array_equal(low.t, traj.t)
+    assert low.data.dtype == np.float64 and not low.data.flags.writeable
+    assert low.data is low.data
+    assert np.allclose(low.data, traj.data, atol=1e-4)
+
+    ts = np.linspace(1e5 - 1.0, 1e5 + 3.0, 50)
+    assert low.position_at_t(ts).dtype == np.float32
+    assert low.position_at_t(1e5 + 0.55).dtype == np.float32
+    assert np.allclose(low.position_at_t(ts), traj.position_at_t(ts), atol=1e-4)
+    assert np.allclose(low.velocity_at_t(ts), traj.velocity_at_t(ts), atol=1e-2)
+    assert np.allclose(low.s, traj.s, atol=1e-3)
+
+    assert low.copy().dtype == np.float32
+    assert low.translate(np.ones(7)).dtype == np.float32
+    assert low.subsample(points_per_t=5.0).dtype == np.float32
+    assert low.astype(np.float64).dtype == np.float64
+    assert low.digest != traj.digest
+
+    batch = TrajectoryBatch.from_trajectories([low, low.translate(np.ones(7))])
+    assert batch.dtype == np.float32 and batch[0].dtype == np.float32
+    assert np.array_equal(batch[0].data, low.data)
+    assert batch.positions_at_t(ts).dtype == np.float32
+    full = TrajectoryBatch.from_trajectories([traj, traj], dtype=np.float64)
+    batch.prepare()
+    full.prepare()
+    assert batch.nbytes < full.nbytes
+    assert batch.data is batch.data
+    assert [
+        t.dtype
+        for t in Trajectory.from_many(
+            [data], fields=["t", "x", "y"], dtype="float32"
+        )
+    ] == [np.float32]
+
+
+def test_float32_history():
+    """Test recording poses in float32."""
+    for max_length in (None, 2):
+        history = PoseHistory(2, capacity=1, max_length=max_length, dtype="float32")
+        for t in range(3):
+            history.append(
+                1e5 + t * 0.1, np.full((2, 6), t + 0.1), np.ones(2, bool)
+            )
+        poses = history.get(0)
+        assert poses.dtype == np.float64 and not poses.flags.writeable
+        assert np.array_equal(poses[:, 0], 1e5 + np.arange(3)[-len(poses) :] * 0.1)
+        assert np.allclose(poses[:, 1:], np.arange(3)[-len(poses) :, None] + 0.1)
+        assert np.shares_memory(poses, history.get(0))
+
+
+@pt.mark.parametrize("max_length", [None, 3])
+def test_float32_history_views(max_length):
+    """Test that converted float32 histories match a float64 history."""
+    rng = np.random.default_rng(0)
+    low = PoseHistory(3, capacity=2, max_length=max_length, dtype="float32")
+    full = PoseHistory(3, capacity=2, max_length=max_length, dtype="float64")
+
+    def check():
+        for i in range(3):
+            assert np.array_equal(low.get(i), full.get(i))
+
+    def append(t):
+        poses = rng.normal(size=(3, 6)).astype(np.float32)
+        active = rng.uniform(size=3) < 0.8
+        low.append(t, poses, active)
+        full.append(t, poses, active)
+
+    for t in range(10):
+        append(t)
+        check()
+    snapshot = low.snapshot(), full.snapshot()
+    for t in range(10, 15):
+        append(t)
+    check()
+    low.restore(snapshot[0])
+    full.restore(snapshot[1])
+    check()
+    if max_length is None:
+        ts = np.arange(10, 20.0)
+        poses = rng.normal(size=(10, 3, 6)).astype(np.float32)
+        active = rng.uniform(size=(10, 3)) < 0.8
+        counts = low.extend(ts, poses, active)
+        full.extend(ts, poses, active)
+        for row in counts:
+            low.rewind(row)
+            full.rewind(row)
+            check()
+        low.rewind(counts[2])
+        full.rewind(counts[2])
+        check()
+        append(30.0)
+        check()
+
+
+def test_float32_map_sensor(all_scenarios):
+    """Test the map sensor in float32."""
+    scenario = import_scenario(
+        all_scenarios["3e39a079-5653-440c-bcbe-24dc9f6bf0e6"]
+    )
+    gym = ScenarioGym(dtype=np.float32)
+    gym.set_scenario(scenario)
+    ego = gym.state.scenario.entities[0]
+    outs = []
+    for dtype in (np.float64, np.float32):
+        sensor = RasterizedMapSensor(ego, height=30, width=30, n=61, dtype=dtype)
+        obs = sensor.reset(gym.state)
+        assert sensor._get_coords(obs.pose).dtype == dtype
+        outs.append(obs.map)
+    assert outs[1].dtype == bool
+    assert (outs[0] != outs[1]).mean() < 1e-2
+
+
+def test_float32_deviation(all_scenarios):
+    """Test that rollouts in float32 stay close to those in float64."""
+    for path in all_scenarios.values():
+        dev = precision_deviation(path)
+        assert dev["t"] == 0.0
+        assert dev["xyz_rel"] < 1e-6
+        assert dev["h"] < 1e-5
+        assert dev["velocity"] < 1e-2
+        assert dev["distance"] < 1e-3
@@ -0,0 +1,127 @@
+import json
+
+import pytest as pt
+
+from scenario_gym.agent import PIDAgent, ReplayTrajectoryAgent, _create_agent
+from scenario_gym.callback import StateCallback
+from scenario_gym.metrics import EgoAvgSpeed, EgoMaxSpeed
+from scenario_gym.profiling import Profiler, Tracer
+from scenario_gym.scenario_gym import ScenarioGym
+from scenario_gym.xosc_interface import import_scenario
+
+
+@pt.fixture
+def scenario(all_scenarios):
+    """Load a single scenario."""
+    return import_scenario(all_scenarios["a5e43fe4-646a-49ba-82ce-5f0063776566"])
+
+
+def create_agent(scenario, entity):
+    """Control the ego with a PID agent."""
+    if entity.ref == "ego":
+        return PIDAgent(entity)
+    return _create_agent(scenario, entity)
+
+
+class NullCallback(StateCallback):
+    """Callback that does nothing."""
+
+    def __call__(self, state):
+        """Do nothing."""
+
+
+def test_profile(scenario):
+    """Test that each phase of the step is timed."""
+    gym = ScenarioGym(
+        metrics=[EgoAvgSpeed(), EgoMaxSpeed()],
+        state_callbacks=[NullCallback()],
+    )
+    gym.set_scenario(scenario, create_agent=create_agent)
+    assert gym.profiler is None
+
+    with gym.profile() as profiler:
+        gym.rollout()
+    assert gym.profiler is None
+
+    summary = profiler.summary()
+    steps = summary["step"]["step"]["calls"]
+    assert steps > 0
+    for phase, name in [
+        ("sensor", "EgoLocalizationSensor"),
+        ("policy", "PIDAgent"),
+        ("controller", "PIDController"),
+        ("non_agents", "BatchReplayEntity"),
+        ("state", "poses"),
+        ("state", "actions"),
+        ("state", "terminal"),
+        ("callback", "NullCallback"),
+        ("metric", "EgoAvgSpeed"),
+        ("metric", "EgoMaxSpeed"),
+    ]:
+        timing = summary[phase][name]
+        assert timing["calls"] == steps, (phase, name)
+        assert timing["total"] >= 0.0
+        assert timing["mean"] * steps == pt.approx(timing["total"])
+
+    totals = profiler.phase_totals()
+    assert set(totals) == set(summary)
+    assert "EgoAvgSpeed" in profiler.report()
+
+    # results are unchanged by profiling
+    values = gym.get_metrics()
+    gym.rollout()
+    assert gym.get_metrics() == values
+
+
+def test_profile_fast_replay(scenario):
+    """Test profiling a fast replay rollout."""
+    profiler = Profiler()
+    gym = ScenarioGym(metrics=[EgoAvgSpeed()], fast_replay=True, profile=True)
+    gym.set_scenario(scenario)
+    assert all(
+        isinstance(agent, ReplayTrajectoryAgent)
+        for agent in gym.state.agents.values()
+    )
+    with gym.profile(profiler):
+        gym.rollout()
+    assert isinstance(gym.profiler, Profiler) and gym.profiler is not profiler
+    summary = profiler.summary()
+    assert summary["replay"]["position_at_t"]["calls"] > 0
+    assert (
+        summary["state"]["terminal"]["calls"]
+        == summary["metric"]["EgoAvgSpeed"]["calls"]
+    )
+
+
+def test_tracer(all_scenarios, tmp_path):
+    """Test recording a timeline of a rollout."""
+    tracer = Tracer()
+    gym = ScenarioGym(metrics=[EgoAvgSpeed()])
+    with gym.profile(tracer):
+        gym.load_scenario(all_scenarios["a5e43fe4-646a-49ba-82ce-5f0063776566"])
+        gym.rollout(render=True, video_path=str(tmp_path / "video.mp4"))
+
+    names = {(e["cat"], e["name"]) for e in tracer.events}
+    for key in [
+        ("load", "import_scenario"),
+        ("load", "RoadNetwork.create_from_file"),
+        ("step", "step"),
+        ("policy", "ReplayTrajectoryAgent"),
+        ("metric", "EgoAvgSpeed"),
+        ("render", "encode"),
+    ]:
+        assert key in names, key
+    steps = [e for e in tracer.events if e["cat"] == "step"]
+    assert len(steps) == tracer.summary()["step"]["step"]["calls"]
+    assert all(e["ph"] == "X" and e["dur"] >= 0 for e in tracer.events)
+    assert all("entity" in e["args"] for e in tracer.events if e["cat"] == "policy")
+
+    path = tmp_path / "trace.json"
+    tracer.save(str(path))
+    with open(path) as f:
+        data = json.load(f)
+    ts = [e["ts"] for e in data["traceEvents"]]
+    assert len(ts) == len(tracer.events) and ts == sorted(ts)
+
+    tracer.reset()
+    assert not tracer.events and not tracer.summary()
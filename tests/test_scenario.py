@@ -134,6 +134,19 @@ def test_translate(example_scenario):
     assert a_new.t == a_old.t + shift[0]
 
 
+def test_subsample(example_scenario):
+    """Test subsampling and smoothing all entities of a scenario."""
+    new_scenario = example_scenario.subsample(points_per_s=2.0)
+    smoothed = example_scenario.smooth_headings()
+    for e, e_new, e_smooth in zip(
+        example_scenario.entities, new_scenario.entities, smoothed.entities
+    ):
+        expected = e.trajectory.subsample(points_per_s=2.0)
+        assert np.array_equal(e_new.trajectory.data, expected.data)
+        expected = e.trajectory.smooth_headings()
+        assert np.array_equal(e_smooth.trajectory.data, expected.data)
+
+
 def test_to_dict(example_scenario, all_scenarios):
     """Test writing and reading the scenario from a dictionary."""
     base_dir = os.path.join(
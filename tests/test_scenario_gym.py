@@ -3,7 +3,11 @@ import multiprocessing as mp
 import numpy as np
 import pytest as pt
 
+from scenario_gym.entity import BatchReplayEntity, ReplayCache
+from scenario_gym.manager import ScenarioManager
+from scenario_gym.metrics import EgoDistanceTravelled, EgoMaxSpeed
 from scenario_gym.scenario_gym import ScenarioGym
+from scenario_gym.state import State
 from scenario_gym.trajectory import Trajectory
 from scenario_gym.xosc_interface import import_scenario
 
@@ -158,3 +162,137 @@ def test_multi_process_scenarios(all_scenarios):
 
     with mp.Pool(num_processes) as p:
         p.starmap(_render_scenario, zip(scenarios, all_scenarios.values()))
+
+
+def test_run_scenarios_workers(all_scenarios):
+    """Test running scenarios in a process pool."""
+    paths = [
+        all_scenarios["a5e43fe4-646a-49ba-82ce-5f0063776566"],
+        all_scenarios["3fee6507-fd24-432f-b781-ca5676c834ef"],
+    ]
+    ScenarioGym.run_scenarios(paths, timestep=0.075, workers=2)
+
+    manager = ScenarioManager(
+        timestep=0.075, metrics=[EgoMaxSpeed(), EgoDistanceTravelled()]
+    )
+    serial = list(manager.iter_scenarios(paths, workers=1))
+    parallel = list(manager.iter_scenarios(paths, workers=2, ordered=False))
+    assert sorted(s for s, _ in parallel) == sorted(paths)
+    assert len(serial) == 2 and serial[0][1] != serial[1][1]
+    parallel = dict(parallel)
+    for path, result in serial:
+        assert np.allclose(parallel[path], result), "Results should match."
+
+
+@pt.mark.parametrize("persist", [False, True])
+@pt.mark.parametrize("max_history", [None, 5])
+def test_fast_replay(vanishing_scenario, persist, max_history):
+    """Test that the fast replay rollout matches the stepped rollout."""
+    scenario = vanishing_scenario
+    metrics = [EgoMaxSpeed(), EgoDistanceTravelled()]
+    kwargs = dict(
+        timestep=0.1, metrics=metrics, persist=persist, max_history=max_history
+    )
+    gym = ScenarioGym(**kwargs)
+    gym.set_scenario(scenario)
+    gym.rollout()
+    expected = gym.get_metrics()
+    expected_poses = gym.state.recorded_poses()
+
+    fast_gym = ScenarioGym(fast_replay=True, **kwargs)
+    fast_gym.set_scenario(scenario)
+    assert fast_gym.is_replay_only()
+    fast_gym.rollout()
+    assert fast_gym.state.is_done
+    assert fast_gym.state.t == gym.state.t
+
+    metrics = fast_gym.get_metrics()
+    assert all(np.allclose(metrics[k], v) for k, v in expected.items())
+    for e, poses in fast_gym.state.recorded_poses().items():
+        assert np.array_equal(poses, expected_poses[e]), f"Wrong poses for {e.ref}."
+    active = gym.state.active_mask
+    assert np.array_equal(fast_gym.state.active_mask, active)
+    for name in ("pose_array", "velocity_array", "distance_array"):
+        fast, stepped = getattr(fast_gym.state, name), getattr(gym.state, name)
+        assert np.array_equal(fast[active], stepped[active]), name
+
+
+def test_fast_replay_overrides(scenario):
+    """Test that gyms overriding the step are not replayed in bulk."""
+
+    class StepGym(ScenarioGym):
+        def step(self):
+            super().step()
+
+    class StepState(State):
+        def step_pose_array(self, poses, active):
+            super().step_pose_array(poses, active)
+
+    gym = StepGym(fast_replay=True)
+    gym.set_scenario(scenario)
+    assert not gym.is_replay_only()
+
+    gym = ScenarioGym(fast_replay=True)
+    gym.set_scenario(scenario)
+    assert gym.is_replay_only()
+    gym.state.__class__ = StepState
+    assert not gym.is_replay_only()
+
+
+def test_step_overrides(scenario):
+    """Test that the dict-based steps are called if they are overridden."""
+    calls = []
+
+    class StepState(State):
+        def step(self, new_poses):
+            calls.append("state")
+            super().step(new_poses)
+
+    class StepReplay(BatchReplayEntity):
+        def step(self, state):
+            calls.append("non_agents")
+            return super().step(state)
+
+    gym = ScenarioGym(timestep=0.1)
+    gym.set_scenario(scenario)
+    other = ScenarioGym(timestep=0.1)
+    other.set_scenario(scenario)
+    other.state.__class__ = StepState
+    other.state.non_agents.__class__ = StepReplay
+    assert not other.has_default_step()
+    for _ in range(5):
+        gym.step()
+        other.step()
+        assert np.array_equal(other.state.active_mask, gym.state.active_mask)
+        active = gym.state.active_mask
+        assert np.allclose(
+            other.state.pose_array[active], gym.state.pose_array[active]
+        )
+    assert calls == ["non_agents", "state"] * 5
+
+
+def test_replay_cache(scenario, all_scenarios):
+    """Test that reloading a scenario reuses the cached trajectory batches."""
+    cache = ReplayCache()
+    gym = ScenarioGym(timestep=0.1, replay_cache=cache)
+    gym.set_scenario(scenario)
+    gym.rollout()
+    expected = gym.state.recorded_poses()
+    assert len(cache) == 2 and cache.misses == 2 and cache.hits == 0
+
+    gym.set_scenario(scenario)
+    gym.rollout()
+    assert cache.hits == 2 and cache.misses == 2
+    for e, poses in gym.state.recorded_poses().items():
+        assert np.allclose(poses, expected[e])
+
+    path = all_scenarios["3fee6507-fd24-432f-b781-ca5676c834ef"]
+    gym.load_scenario(path)
+    gym.load_scenario(path)
+    assert cache.misses == 4 and cache.hits == 4
+
+    small = ReplayCache(max_bytes=cache.nbytes // 2)
+    gym = ScenarioGym(timestep=0.1, replay_cache=small)
+    gym.set_scenario(scenario)
+    gym.load_scenario(path)
+    assert 0 < small.nbytes <= small.max_bytes and len(small) < 4
@@ -1,14 +1,38 @@
-import time
+"""
+Speed tests and micro-benchmarks.
 
+Enable with --speed_tests. Timings are printed (use -s to see them) and can be
+written to a json file with --benchmark_json to compare across commits. With
+--benchmark_baseline set to a previous results file, a test fails if it is
+slower than the baseline by more than --benchmark_tolerance.
+"""
+import subprocess
+import sys
+
+import numpy as np
 import pytest as pt
 
 import scenario_gym
 from scenario_gym.callback import StateCallback
+from scenario_gym.metrics.rss import RSSDistances
 from scenario_gym.scenario_gym import ScenarioGym
+from scenario_gym.sensor.map import RasterizedMapSensor
+from scenario_gym.state import detect_collisions
+from scenario_gym.trajectory import Trajectory
 from scenario_gym.xosc_interface import import_scenario
+from tests.synthetic import (
+    grid_road_network,
+    roundabout_road_network,
+    synthetic_scenario,
+)
 
 speed_test = pt.mark.skipif("not config.getoption('speed_tests')")
 
+MAPS = {
+    "grid": grid_road_network,
+    "roundabout": roundabout_road_network,
+}
+
 
 @pt.fixture
 def paths(all_scenarios):
@@ -26,106 +50,220 @@ def paths(all_scenarios):
     return paths
 
 
-@speed_test
-def test_gym_speed(paths):
-    """
-    Load and runs scenarios to test rollout speed..
+def stepped_gym(scenario, steps=10, **kwargs) -> ScenarioGym:
+    """Load a scenario and take a few steps."""
+    gym = ScenarioGym(timestep=0.1, **kwargs)
+    gym.set_scenario(scenario)
+    for _ in range(steps):
+        gym.step()
+    return gym
 
-    Use -s with pytest to see the result.
-    """
-    n = 10
-    gym = ScenarioGym(timestep=1.0 / 30.0)
-    start = time.time()
-    for _ in range(n):
+
+def rollout_paths(gym, paths, **kwargs):
+    """Return a function rolling out every scenario."""
+
+    def run():
         for s in paths:
-            gym.load_scenario(s)
-            gym.rollout()
-    t = (time.time() - start) / (n * len(paths))
-    total_length = sum(import_scenario(p).length for p in paths)
-    num_steps = [int(import_scenario(p).length * 30) for p in paths]
-    print(
-        "Completed in {:.4}s per scenario, {:.4}\u03BCs per step.".format(
-            t, 1e6 * len(paths) * t / sum(num_steps)
-        )
-    )
-    print("Running at {}x real time.".format(int(total_length / t)))
+            gym.load_scenario(s, **kwargs.get("load", {}))
+            gym.rollout(**kwargs.get("rollout", {}))
+
+    return run
 
 
 @speed_test
-def test_collision_speed(paths):
-    """
-    Test the speed with collisions.
+def test_gym_speed(paths, benchmark):
+    """Load and run the scenarios."""
+    gym = ScenarioGym(timestep=1.0 / 30.0)
+    benchmark("gym_rollout", rollout_paths(gym, paths), repeat=3)
 
-    Use -s with pytest to see the result.
-    """
+
+@speed_test
+def test_collision_speed(paths, benchmark):
+    """Run the scenarios checking collisions at every step."""
 
     class CollisionCallback(StateCallback):
         def __call__(self, state):
             state.collisions()
 
-    n = 10
     gym = ScenarioGym(timestep=1.0 / 30.0, state_callbacks=[CollisionCallback()])
-    start = time.time()
-    for _ in range(n):
-        for s in paths:
-            gym.load_scenario(s)
-            gym.rollout()
-    t = (time.time() - start) / (n * len(paths))
-    total_length = sum(import_scenario(p).length for p in paths)
-    num_steps = [int(import_scenario(p).length * 30) for p in paths]
-    print(
-        "Completed in {:.4}s per scenario, {:.4}\u03BCs per step.".format(
-            t, 1e6 * len(paths) * t / sum(num_steps)
-        )
-    )
-    print("Running at {}x real time.".format(int(total_length / t)))
+    benchmark("gym_rollout_collisions", rollout_paths(gym, paths), repeat=3)
 
 
 @speed_test
-def test_render_speed(paths):
-    """Load scenarios with rendering."""
-    n = 2
-
+def test_render_speed(paths, tmp_path, benchmark):
+    """Run the scenarios with rendering."""
     gym = ScenarioGym(timestep=1.0 / 30.0)
-    start = time.time()
-    for _ in range(n):
-        for s in paths:
+
+    def run():
+        for i, s in enumerate(paths):
             gym.load_scenario(s)
-            gym.rollout(render=True)
-    t = (time.time() - start) / (n * len(paths))
-    total_length = sum(import_scenario(p).length for p in paths)
-    num_steps = [int(import_scenario(p).length * 30) for p in paths]
-    print(
-        "Completed in {:.4}s per scenario, {:.4}\u03BCs per step.".format(
-            t, 1e6 * len(paths) * t / sum(num_steps)
-        )
-    )
-    print("Running at {}x real time.".format(int(total_length / t)))
+            gym.rollout(render=True, video_path=str(tmp_path / f"{i}.mp4"))
+
+    benchmark("gym_rollout_render", run, repeat=1)
 
 
 @speed_test
-def test_sensor_speed(paths):
-    """Measures speed when running with RasterizedMapSensor."""
-    n = 10
+def test_sensor_speed(paths, benchmark):
+    """Run the scenarios with a RasterizedMapSensor on the ego."""
 
-    def create_agent(ref, entity):
-        if ref == "ego":
+    def create_agent(scenario, entity):
+        if entity.ref == "ego":
             controller = scenario_gym.controller.ReplayTrajectoryController(entity)
-            sensor = scenario_gym.sensor.RasterizedMapSensor(entity, freq=1)
+            sensor = RasterizedMapSensor(entity, freq=1)
             return scenario_gym.agent.ReplayTrajectoryAgent(
                 entity, controller, sensor
             )
 
     gym = ScenarioGym(timestep=1.0 / 30.0)
-    start = time.time()
-    for _ in range(n):
-        for s in paths:
-            gym.load_scenario(s, create_agent=create_agent)
-            gym.rollout()
-    t = (time.time() - start) / (n * len(paths))
-    num_steps = [int(import_scenario(p).length * 30) for p in paths]
-    print(
-        "Completed in {:.4}s per scenario, {:.4}s per step.".format(
-            t, len(paths) * t / sum(num_steps)
+    benchmark(
+        "gym_rollout_sensor",
+        rollout_paths(gym, paths, load={"create_agent": create_agent}),
+        repeat=1,
+    )
+
+
+@speed_test
+@pt.mark.parametrize("map_type", list(MAPS))
+@pt.mark.parametrize("num_entities", [10, 100])
+def test_synthetic_rollout(map_type, num_entities, benchmark):
+    """Rollout synthetic scenarios of different sizes."""
+    scenario = synthetic_scenario(num_entities, 20.0, MAPS[map_type]())
+    gym = ScenarioGym(timestep=0.1)
+
+    def run():
+        gym.set_scenario(scenario)
+        gym.rollout()
+
+    benchmark(
+        "synthetic_rollout",
+        run,
+        repeat=3,
+        map_type=map_type,
+        num_entities=num_entities,
+    )
+
+
+@speed_test
+@pt.mark.parametrize("num_points", [100, 10000])
+@pt.mark.parametrize("num_t", [1, 1000])
+def test_position_at_t(num_points, num_t, benchmark):
+    """Evaluate trajectories at single times and arrays of times."""
+    t = np.linspace(0.0, 100.0, num_points)
+    data = np.stack([t, np.cos(t), np.sin(t)], axis=1)
+    traj = Trajectory(data, fields=["t", "x", "y"])
+    ts = np.random.default_rng(0).uniform(-1.0, 101.0, num_t)
+    ts = ts[0] if num_t == 1 else ts
+    benchmark(
+        "position_at_t",
+        lambda: traj.position_at_t(ts),
+        repeat=5,
+        number=100,
+        num_points=num_points,
+        num_t=num_t,
+    )
+
+
+@speed_test
+@pt.mark.parametrize("num_entities", [10, 100, 500])
+def test_detect_collisions(num_entities, benchmark):
+    """Detect collisions between many entities."""
+    scenario = synthetic_scenario(num_entities, 5.0, grid_road_network(size=3))
+    poses = {e: e.trajectory.position_at_t(2.0) for e in scenario.entities}
+    benchmark(
+        "detect_collisions",
+        lambda: detect_collisions(poses),
+        repeat=5,
+        number=10,
+        num_entities=num_entities,
+    )
+
+
+@speed_test
+@pt.mark.parametrize("num_entities", [10, 100, 500])
+def test_state_collisions(num_entities, benchmark):
+    """Step a dense scenario and find collisions with the state's grid."""
+    gym = stepped_gym(synthetic_scenario(num_entities, 5.0, grid_road_network(3)))
+
+    def run():
+        gym.step()
+        gym.state.collisions()
+
+    benchmark(
+        "state_collisions", run, repeat=5, number=10, num_entities=num_entities
+    )
+
+
+@speed_test
+@pt.mark.parametrize("map_type", list(MAPS))
+def test_rasterized_map_sensor(map_type, benchmark):
+    """Rasterize the map around the ego."""
+    gym = stepped_gym(synthetic_scenario(20, 10.0, MAPS[map_type]()))
+    sensor = RasterizedMapSensor(gym.state.scenario.ego, freq=1)
+    sensor.reset(gym.state)
+    sensor._step(gym.state)
+    benchmark(
+        "rasterized_map_sensor",
+        lambda: sensor._step(gym.state),
+        repeat=5,
+        number=10,
+        map_type=map_type,
+    )
+
+
+@speed_test
+@pt.mark.parametrize("num_entities", [10, 100])
+def test_rss_distances(num_entities, benchmark):
+    """Compute the RSS distances between the ego and other entities."""
+    callback = RSSDistances()
+    gym = stepped_gym(
+        synthetic_scenario(num_entities, 10.0), state_callbacks=[callback]
+    )
+    benchmark(
+        "rss_distances",
+        lambda: callback(gym.state),
+        repeat=5,
+        number=10,
+        num_entities=num_entities,
+    )
+
+
+@speed_test
+def test_import_scenario(paths, benchmark):
+    """Import scenarios from OpenSCENARIO."""
+    benchmark(
+        "import_scenario",
+        lambda: [import_scenario(p) for p in paths],
+        repeat=3,
+    )
+
+
+@speed_test
+@pt.mark.parametrize("num_entities", [10, 100])
+def test_viewer_render(num_entities, tmp_path, benchmark):
+    """Render frames with the OpenCV viewer."""
+    from scenario_gym.viewer.opencv import OpenCVViewer
+
+    gym = stepped_gym(synthetic_scenario(num_entities, 10.0))
+    viewer = OpenCVViewer(fps=10)
+    viewer.reset(str(tmp_path / "video.mp4"))
+    viewer.render(gym.state)
+    try:
+        benchmark(
+            "opencv_render",
+            lambda: viewer.render(gym.state),
+            repeat=5,
+            number=10,
+            num_entities=num_entities,
         )
+    finally:
+        viewer.close()
+
+
+@speed_test
+def test_import_time(benchmark):
+    """Import the package in a new process."""
+    benchmark(
+        "import_scenario_gym",
+        lambda: subprocess.run([sys.executable, "-c", "import scenario_gym"]),
+        repeat=5,
     )
@@ -1,9 +1,18 @@
+from copy import deepcopy
+
 import numpy as np
 import pytest as pt
+from shapely.geometry import Point
 
-from scenario_gym.scenario.actions import UpdateStateVariableAction
+from scenario_gym.scenario.actions import (
+    ScenarioAction,
+    UpdateStateVariableAction,
+    UserDefinedAction,
+)
 from scenario_gym.scenario_gym import ScenarioGym
-from scenario_gym.state import State
+from scenario_gym.state import State, detect_collisions
+from scenario_gym.state.grid import SpatialHashGrid
+from scenario_gym.state.history import PoseHistory
 from scenario_gym.xosc_interface import import_scenario
 
 
@@ -207,6 +216,50 @@ def test_state_actions(scenario):
     ), "Action not applied."
 
 
+def test_action_schedule(scenario):
+    """Test that scheduled and polled actions are applied at the right time."""
+
+    class PolledAction(ScenarioAction):
+        def trigger_condition(self, state: State) -> bool:
+            return state.t >= 4.0
+
+        def _apply(self, state, entity) -> None:
+            pass
+
+    scenario = scenario.copy()
+    ts = np.linspace(1.0, 8.0, 50)
+    for t in ts[::-1]:
+        scenario.add_action(
+            UserDefinedAction(t, "UserDefined", "ego", {}), inplace=True
+        )
+    scenario.add_action(PolledAction("Polled", "ego", {}), inplace=True)
+
+    gym = ScenarioGym(timestep=0.1)
+    gym.set_scenario(scenario)
+    state = gym.state
+    actions = state.scenario.actions
+    assert len(actions) == len(scenario.actions)
+    assert state.unapplied_actions == [
+        a for a in actions if np.isnan(state.action_apply_times[a])
+    ]
+
+    times = [state.t]
+    while not state.is_done:
+        gym.step()
+        times.append(state.t)
+    times = np.array(times)
+    assert not state.unapplied_actions, "All actions should be applied."
+
+    for action in actions:
+        if isinstance(action, UpdateStateVariableAction):
+            expected = times[times > action.t][0]
+        elif isinstance(action, UserDefinedAction):
+            expected = times[times >= action.t][0]
+        else:
+            expected = times[times >= 4.0][0]
+        assert state.action_apply_times[action] == expected
+
+
 def test_to_scenario(all_scenarios) -> None:
     """
     Rollout a single scenario and write to a new scenario.
@@ -256,3 +309,211 @@ def test_to_scenario(all_scenarios) -> None:
             np.allclose(traj1.position_at_t(10.0), traj2.position_at_t(10.0)),
         ]
     ), "Recorded and true trajectories differ."
+
+
+def test_pose_arrays(scenario):
+    """Test that the pose arrays match the dictionary views."""
+    gym = ScenarioGym(timestep=0.1)
+    gym.set_scenario(scenario)
+    for _ in range(5):
+        gym.step()
+
+    state = gym.state
+    n = len(state.all_entities)
+    assert state.pose_array.shape == (n, 6)
+    assert state.active_mask.sum() == len(state.poses)
+    for e, idx in state.entity_indices.items():
+        if state.active_mask[idx]:
+            assert np.allclose(state.poses[e], state.pose_array[idx])
+            assert np.allclose(state.velocities[e], state.velocity_array[idx])
+        else:
+            assert e not in state.poses
+        assert np.allclose(state.distances[e], state.distance_array[idx])
+
+    poses = state.poses.copy()
+    assert isinstance(poses, dict) and len(poses) == len(state.poses)
+
+
+def test_recorded_poses(scenario):
+    """Test that recorded poses are read-only views matching the rollout."""
+    gym = ScenarioGym(timestep=0.1)
+    gym.set_scenario(scenario)
+    ego = gym.state.scenario.entities[0]
+
+    ts, poses = [gym.state.t], [gym.state.poses[ego].copy()]
+    for _ in range(100):
+        gym.step()
+        ts.append(gym.state.t)
+        poses.append(gym.state.poses[ego].copy())
+
+    recorded = gym.state.recorded_poses(ego)
+    assert recorded.shape == (101, 7), "Wrong number of recorded poses."
+    assert np.allclose(recorded[:, 0], ts), "Wrong recorded times."
+    assert np.allclose(recorded[:, 1:], poses), "Wrong recorded poses."
+    with pt.raises(ValueError):
+        recorded[0, 0] = 1.0
+
+
+def test_max_history(scenario):
+    """Test bounding and disabling the recorded pose history."""
+    full = ScenarioGym(timestep=0.1)
+    full.set_scenario(scenario)
+    gym = ScenarioGym(timestep=0.1, max_history=10)
+    gym.set_scenario(scenario)
+    for _ in range(50):
+        full.step()
+        gym.step()
+
+    ego = gym.state.scenario.entities[0]
+    recorded = gym.state.recorded_poses(ego)
+    assert recorded.shape == (10, 7), "History should be bounded."
+    assert np.allclose(
+        recorded, full.state.recorded_poses(ego)[-10:]
+    ), "History should contain the most recent poses."
+    with pt.raises(ValueError):
+        gym.state.to_scenario()
+
+    gym = ScenarioGym(timestep=0.1, max_history=0)
+    gym.set_scenario(scenario)
+    gym.step()
+    assert gym.state.recorded_poses(ego).shape == (0, 7), "History not disabled."
+    with pt.raises(ValueError):
+        gym.state.to_scenario()
+
+
+def test_snapshot_restore(scenario):
+    """Test restoring the state to a snapshot and branching from it."""
+    gym = ScenarioGym(timestep=0.1)
+    gym.set_scenario(scenario)
+    for _ in range(5):
+        gym.step()
+
+    state = gym.state
+    ego = state.scenario.entities[0]
+    snapshot = state.snapshot()
+    t, distance = state.t, state.distances[ego]
+    assert snapshot.entity_state is not state.entity_state
+
+    for _ in range(30):
+        gym.step()
+    branch_view = state.recorded_poses(ego)
+    branch = branch_view.copy()
+    assert "var" in state.entity_state[ego], "Action should be applied."
+
+    state.restore(snapshot)
+    assert state.t == t and state.distances[ego] == distance
+    assert state.recorded_poses(ego).shape[0] == 6
+    assert not state.entity_state[ego], "Action should not be applied."
+
+    for _ in range(30):
+        gym.step()
+    assert np.allclose(state.recorded_poses(ego), branch), "Branches differ."
+
+    state.restore(snapshot)
+    new_poses = state.poses.copy()
+    new_poses[ego] = np.zeros(6)
+    state.next_t = state.t + 0.1
+    state.step(new_poses)
+    assert np.allclose(state.recorded_poses(ego)[-1, 1:], 0.0)
+    assert np.allclose(
+        branch_view, branch
+    ), "Restoring should not modify other branches."
+
+
+def test_spatial_hash_grid():
+    """Test that the grid finds the pairs of boxes sharing a cell."""
+    rng = np.random.default_rng(0)
+    grid = SpatialHashGrid(40, cell_size=2.0)
+    lo = rng.uniform(-10.0, 10.0, (40, 2))
+    for _ in range(20):
+        lo += rng.normal(scale=0.5, size=lo.shape)
+        aabbs = np.hstack([lo, lo + rng.uniform(0.0, 3.0, lo.shape)])
+        active = rng.uniform(size=40) < 0.8
+        aabbs[rng.integers(40)] = np.nan
+        grid.update(aabbs, active)
+
+        cells = np.floor(aabbs / 2.0)
+        present = active & np.isfinite(aabbs).all(axis=1)
+        assert len(grid) == present.sum()
+        expected = {
+            (i, j)
+            for i in np.flatnonzero(present)
+            for j in np.flatnonzero(present)
+            if i < j
+            and (cells[i, :2] <= cells[j, 2:]).all()
+            and (cells[j, :2] <= cells[i, 2:]).all()
+        }
+        assert set(zip(*map(np.ndarray.tolist, grid.candidate_pairs()))) == expected
+
+        for bounds in ([-3.0, -2.0, 4.0, 1.0], [-100.0, -100.0, 100.0, 100.0]):
+            found = grid.query(bounds)
+            hits = (
+                present
+                & (aabbs[:, 0] <= bounds[2])
+                & (aabbs[:, 2] >= bounds[0])
+                & (aabbs[:, 1] <= bounds[3])
+                & (aabbs[:, 3] >= bounds[1])
+            )
+            assert set(np.flatnonzero(hits)) <= set(found.tolist())
+            assert present[found].all()
+
+
+def test_state_collisions(scenario):
+    """Test collisions and nearby entities found with the grid."""
+    gym = ScenarioGym(timestep=0.1)
+    gym.set_scenario(scenario)
+    state = gym.state
+    rng = np.random.default_rng(0)
+    while not state.is_done:
+        assert state.collisions() == detect_collisions(state.poses)
+        idxs = np.flatnonzero(state.active_mask)
+        x, y = state.pose_array[idxs[0], :2] + rng.normal(size=2)
+        r = rng.uniform(0.0, 50.0)
+        dist = np.hypot(*(state.pose_array[idxs, :2] - [x, y]).T)
+        assert state.get_entities_in_radius(x, y, r) == [
+            state.all_entities[i] for i in idxs[dist <= r]
+        ]
+        gym.step()
+
+
+def test_entities_in_radius_offset_box(scenario):
+    """Test finding entities whose pose is outside of their bounding box."""
+    entity = scenario.entities[0]
+    entity.catalog_entry = deepcopy(entity.catalog_entry)
+    entity.catalog_entry.bounding_box.center_x = 60.0
+    gym = ScenarioGym(timestep=0.1)
+    gym.set_scenario(scenario)
+    state = gym.state
+    x, y = state.poses[entity][:2]
+    assert entity in state.get_entities_in_radius(x, y, 1.0)
+    assert entity in state.get_entities_in_area(Point(x, y).buffer(1.0))
+
+
+@pt.mark.parametrize("max_length", [None, 0, 3])
+def test_history_extend(max_length):
+    """Test recording many timesteps of poses at once."""
+    rng = np.random.default_rng(0)
+    ts = np.arange(10) * 0.1
+    poses = rng.normal(size=(10, 4, 6))
+    active = rng.uniform(size=(10, 4)) < 0.7
+    expected = PoseHistory(4, capacity=2, max_length=max_length)
+    for t, pose, act in zip(ts, poses, active):
+        expected.append(t, pose, act)
+
+    history = PoseHistory(4, capacity=2, max_length=max_length)
+    history.append(ts[0], poses[0], active[0])
+    snapshot = history.snapshot()
+    counts = history.extend(ts[1:], poses[1:], active[1:])
+    assert np.array_equal(counts[-1], expected._counts)
+    for i in range(4):
+        assert np.array_equal(history.get(i), expected.get(i))
+
+    if max_length is None:
+        history.rewind(counts[3])
+        assert len(history.get(0)) == counts[3, 0]
+        assert np.array_equal(history.get(0), expected.get(0)[: counts[3, 0]])
+        history.restore(snapshot)
+        assert len(history.get(1)) == int(active[0, 1])
+    elif max_length:
+        with pt.raises(ValueError):
+            history.rewind(counts[3])
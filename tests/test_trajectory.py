@@ -1,7 +1,7 @@
 import numpy as np
 import pytest as pt
 
-from scenario_gym.trajectory import Trajectory, _resolve_heading
+from scenario_gym.trajectory import Trajectory, TrajectoryBatch, _resolve_heading
 
 
 def test_trajectory():
@@ -228,6 +228,42 @@ def test_position_at_t():
     ), "Incorrect extrapolation."
 
 
+@pt.mark.parametrize("n", [1, 2, 10])
+def test_position_at_t_matches_interp1d(n):
+    """Test that interpolation matches scipy in any order of queries."""
+    from scipy.interpolate import interp1d
+
+    rng = np.random.default_rng(n)
+    data = np.concatenate(
+        [np.sort(rng.uniform(0.0, 10.0, (n, 1)), axis=0), rng.normal(size=(n, 6))],
+        axis=1,
+    )
+    traj = Trajectory(data)
+    data = traj.data
+    ref_data = np.repeat(data, 2, axis=0) if n == 1 else data
+    if n == 1:
+        ref_data[-1, 0] += 1e-3
+    ref = interp1d(
+        ref_data[:, 0], ref_data[:, 1:], axis=0, fill_value="extrapolate"
+    )
+
+    knots = data[:, 0]
+    ts = np.concatenate(
+        [
+            np.linspace(-2.0, 12.0, 57),  # increasing
+            np.linspace(12.0, -2.0, 31),  # decreasing
+            rng.uniform(-2.0, 12.0, 50),  # random
+            knots,
+            knots[::-1],
+        ]
+    )
+    for t in ts:
+        assert np.array_equal(traj.position_at_t(t, extrapolate=True), ref(t))
+    assert np.array_equal(traj.position_at_t(ts, extrapolate=True), ref(ts))
+    grid = ts[:56].reshape(7, 8)
+    assert np.array_equal(traj.position_at_t(grid, extrapolate=True), ref(grid))
+
+
 def test_position_at_s():
     """Test the position at s method."""
     traj = Trajectory(
@@ -341,9 +377,126 @@ def test_curvature_subsample():
         0
     ], "More points should be in the final part of the trajectory."
 
+    with pt.warns(DeprecationWarning):
+        traj.curvature_subsample(points_per_s=5, eps=1e-2)
+
 
 def test_invalid_set():
     """Test that we cannot explitly set the data attribute."""
     traj = Trajectory(np.zeros((10, 3)), fields=["t", "x", "y"])
     with pt.raises(AttributeError):
         traj.data = np.ones((10, 3))
+
+
+def test_trajectory_batch():
+    """Test that batched queries match those of each trajectory."""
+    rng = np.random.default_rng(0)
+    trajs = []
+    for n in (1, 2, 10, 1, 25):
+        t = np.sort(rng.uniform(0.0, 10.0, n))
+        data = np.stack([t, rng.normal(size=n), rng.normal(size=n)], axis=1)
+        trajs.append(Trajectory(data, fields=["t", "x", "y"]))
+    batch = TrajectoryBatch.from_trajectories(trajs)
+    assert len(batch) == len(trajs)
+    assert batch.data.shape == (sum(len(traj) for traj in trajs), 7)
+    assert (batch.is_static == [len(traj) == 1 for traj in trajs]).all()
+
+    for t in rng.uniform(-2.0, 12.0, 50):
+        mask = batch.active_mask(t)
+        for ext in ((False, False), (True, False), True, False):
+            poses = batch.positions_at_t(t, extrapolate=ext)
+            for i, traj in enumerate(trajs):
+                pose = traj.position_at_t(t, extrapolate=ext)
+                if pose is None:
+                    assert not mask[i] and np.isnan(poses[i]).all()
+                else:
+                    assert np.array_equal(poses[i], pose)
+        vels = batch.velocities_at_t(t)
+        for i, traj in enumerate(trajs):
+            assert np.array_equal(vels[i], traj.velocity_at_t(t))
+
+    ts = rng.uniform(-2.0, 12.0, 20)
+    poses = batch.positions_at_t(ts)
+    assert poses.shape == (20, len(trajs), 6)
+    for i, traj in enumerate(trajs):
+        assert np.array_equal(poses[:, i], traj.position_at_t(ts))
+        assert np.array_equal(batch[i].data, traj.data)
+        assert np.array_equal(batch[i].position_at_t(ts), traj.position_at_t(ts))
+    assert len(TrajectoryBatch.from_trajectories([]).positions_at_t(1.0)) == 0
+
+    ts = rng.uniform(-2.0, 12.0, len(trajs))
+    for ext in ((False, False), True, False):
+        poses = batch.positions_at_each_t(ts, extrapolate=ext)
+        for i, traj in enumerate(trajs):
+            pose = traj.position_at_t(ts[i], extrapolate=ext)
+            if pose is None:
+                assert np.isnan(poses[i]).all()
+            else:
+                assert np.array_equal(poses[i], pose)
+    with pt.raises(ValueError):
+        batch.positions_at_each_t(ts[:2])
+
+    joined = TrajectoryBatch.concatenate(
+        [batch, TrajectoryBatch.from_trajectories([]), batch]
+    )
+    assert len(joined) == 2 * len(trajs)
+    assert np.array_equal(joined.data, np.concatenate([batch.data, batch.data]))
+    for i, traj in enumerate(trajs + trajs):
+        assert np.array_equal(joined[i].data, traj.data)
+    assert len(TrajectoryBatch.concatenate([])) == 0
+
+
+def test_from_many():
+    """Test that bulk construction matches the constructor."""
+    rng = np.random.default_rng(0)
+    datas = []
+    for n in (1, 2, 5, 20, 1):
+        data = rng.normal(size=(n, 7))
+        data[:, 0] = rng.integers(0, 10, n)  # repeated and unsorted times
+        datas.append(data)
+    datas[1][:, 4] = np.nan
+    datas[3][:, 4] = np.nan
+    datas[2][0, 3] = np.nan
+
+    trajs = Trajectory.from_many(datas)
+    base = trajs[0].data.base
+    for data, traj in zip(datas, trajs):
+        assert np.array_equal(traj.data, Trajectory(data).data)
+        assert traj.data.base is base and not traj.data.flags.writeable
+    trajs = Trajectory.from_many([d[:, :3] for d in datas], fields=["t", "x", "y"])
+    for data, traj in zip(datas, trajs):
+        expected = Trajectory(data[:, :3], fields=["t", "x", "y"])
+        assert np.array_equal(traj.data, expected.data)
+    assert Trajectory.from_many([]) == []
+
+    datas[0][0, 1] = np.nan
+    with pt.raises(ValueError):
+        Trajectory.from_many(datas)
+    with pt.raises(ValueError):
+        Trajectory.from_many([np.zeros((2, 3))])
+
+    traj = Trajectory.from_validated(trajs[3].data)
+    assert np.array_equal(traj.position_at_t(2.5), trajs[3].position_at_t(2.5))
+
+
+def test_batch_subsample():
+    """Test that bulk subsampling and smoothing match each trajectory."""
+    rng = np.random.default_rng(0)
+    datas = [rng.normal(size=(n, 3)).cumsum(axis=0) for n in (1, 2, 10, 30)]
+    datas.append(np.zeros((5, 3)))  # stationary
+    datas.append(np.repeat(rng.normal(size=(4, 3)), 2, axis=0))  # repeated points
+    for data in datas:
+        data[:, 0] = np.arange(data.shape[0]) * 0.3
+    trajs = [Trajectory(data, fields=["t", "x", "y"]) for data in datas]
+    batch = TrajectoryBatch.from_trajectories(trajs)
+    assert np.array_equal(batch.arclength, [traj.arclength for traj in trajs])
+
+    for kwargs in ({"points_per_s": 3.0}, {"points_per_t": 7.0}):
+        for traj, new in zip(trajs, batch.subsample(**kwargs)):
+            assert np.array_equal(new.data, traj.subsample(**kwargs).data)
+    for traj, new in zip(trajs, batch.smooth_headings()):
+        assert np.array_equal(new.data, traj.smooth_headings().data)
+
+    with pt.raises(ValueError):
+        batch.subsample()
+    assert TrajectoryBatch.from_trajectories([]).subsample(points_per_s=1.0) == []
@@ -6,6 +6,7 @@ from scenario_gym.entity import Entity
 from scenario_gym.scenario import Scenario
 from scenario_gym.scenario_gym import ScenarioGym
 from scenario_gym.state import detect_collisions
+from scenario_gym.state.utils import box_dimensions, collision_pairs, oriented_boxes
 from scenario_gym.trajectory import Trajectory
 
 
@@ -59,3 +60,48 @@ def test_detect_collisions(collision_scenario):
         others={hazard: gym.state.poses[hazard]},
     )
     assert collisions[ego], "Collision at end of scenario not found."
+
+
+def test_detect_collisions_matches_polygons():
+    """Test that collisions match intersecting the bounding box polygons."""
+    rng = np.random.default_rng(0)
+    entities = []
+    for i in range(60):
+        box = BoundingBox(*rng.uniform(0.5, 4.0, 2), *rng.uniform(-1.0, 1.0, 2))
+        ce = CatalogEntry("car", "car", "car", "car", box, {}, [])
+        entities.append(Entity(ce, ref=f"entity_{i}"))
+    poses = np.zeros((60, 6))
+    poses[:, :2] = rng.uniform(0.0, 25.0, (60, 2))
+    poses[:, 3] = rng.uniform(-np.pi, np.pi, 60)
+    # touching boxes intersect
+    box = BoundingBox(2.0, 4.0, 0.5, 0.0)
+    for e in entities[:2]:
+        e.catalog_entry = CatalogEntry("car", "car", "car", "car", box, {}, [])
+    poses[:2] = 0.0
+    poses[:2, :2] = [[50.0, 50.0], [54.0, 50.0]]
+
+    geoms = [e.get_bounding_box_geom(p) for e, p in zip(entities, poses)]
+    collisions = detect_collisions(dict(zip(entities, poses)))
+    assert entities[1] in collisions[entities[0]]
+    for i, e in enumerate(entities):
+        expected = [
+            entities[j]
+            for j, g in enumerate(geoms)
+            if j != i and g.distance(geoms[i]) < 1e-9
+        ]
+        assert collisions[e] == expected
+
+    collisions = detect_collisions(
+        dict(zip(entities[:5], poses[:5])),
+        others=dict(zip(entities[3:], poses[3:])),
+    )
+    assert list(collisions) == entities[:5]
+    assert not any(e in l for e, l in collisions.items())
+    assert detect_collisions({}) == {}
+
+    boxes = oriented_boxes(poses, box_dimensions(entities))
+    groups = np.arange(60) % 3
+    i, j = collision_pairs(boxes)
+    same = groups[i] == groups[j]
+    grouped = collision_pairs(boxes, groups)
+    assert set(zip(*grouped)) == set(zip(i[same], j[same])) and not same.all()
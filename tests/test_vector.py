@@ -0,0 +1,162 @@
+import numpy as np
+import pytest as pt
+
+from scenario_gym.agent import PIDAgent, ReplayTrajectoryAgent, _create_agent
+from scenario_gym.controller import ReplayTrajectoryController
+from scenario_gym.metrics import EgoMaxSpeed
+from scenario_gym.profiling import Profiler
+from scenario_gym.scenario_gym import ScenarioGym
+from scenario_gym.sensor import EgoLocalizationSensor
+from scenario_gym.vector import VectorScenarioGym
+
+
+def test_vector_gym(all_scenarios):
+    """Test running scenarios in lockstep with automatic resets."""
+    paths = [
+        all_scenarios["a5e43fe4-646a-49ba-82ce-5f0063776566"],
+        all_scenarios["3fee6507-fd24-432f-b781-ca5676c834ef"],
+        all_scenarios["41dac6fa-6f83-461e-a145-08692da5f3c7"],
+    ]
+    vec = VectorScenarioGym(2, paths, timestep=0.1, metrics=[EgoMaxSpeed()])
+    states = vec.reset()
+    assert len(states) == 2 and states[0] is not states[1]
+
+    results = vec.run(len(paths))
+    assert len(results) == len(paths), "Wrong number of results."
+    assert all(p in paths for p, _ in results), "Unknown scenario returned."
+
+    for path, metrics in results:
+        gym = ScenarioGym(timestep=0.1, metrics=[EgoMaxSpeed()])
+        gym.load_scenario(path)
+        gym.rollout()
+        assert np.allclose(
+            metrics["ego_max_speed"], gym.get_metrics()["ego_max_speed"]
+        ), "Metrics should match the serial rollout."
+
+    dones = vec.step()
+    assert dones.shape == (2,)
+    assert all(gym.state is not None for gym in vec.gyms)
+
+
+class CustomAgent(ReplayTrajectoryAgent):
+    """A replay agent which is not batched across gyms."""
+
+    pass
+
+
+def create_pid_agent(scenario, entity):
+    """Create a PID agent for the ego."""
+    if entity.ref == "ego":
+        return PIDAgent(entity, max_steer=0.1)
+
+
+def create_custom_agent(scenario, entity):
+    """Create a replay agent for the ego and a custom agent for another."""
+    if entity.ref == "ego":
+        return _create_agent(scenario, entity)
+    if entity is scenario.entities[1]:
+        return CustomAgent(
+            entity,
+            ReplayTrajectoryController(entity),
+            EgoLocalizationSensor(entity),
+        )
+
+
+def refs(collisions):
+    """Return the collisions by entity reference."""
+    return {e.ref: [other.ref for other in es] for e, es in collisions.items()}
+
+
+@pt.mark.parametrize(
+    "create_agent", [_create_agent, create_pid_agent, create_custom_agent]
+)
+def test_vector_step(all_scenarios, create_agent):
+    """Test that stepping the gyms together matches stepping them serially."""
+    paths = [
+        all_scenarios["a5e43fe4-646a-49ba-82ce-5f0063776566"],
+        all_scenarios["3fee6507-fd24-432f-b781-ca5676c834ef"],
+        all_scenarios["41dac6fa-6f83-461e-a145-08692da5f3c7"],
+    ]
+    kwargs = {"timestep": 0.1, "terminal_conditions": ["max_length", "collision"]}
+    vec = VectorScenarioGym(len(paths), paths, create_agent=create_agent, **kwargs)
+    vec.reset()
+    serial = []
+    for path in paths:
+        gym = ScenarioGym(**kwargs)
+        gym.load_scenario(path, create_agent=create_agent)
+        serial.append(gym)
+
+    running = np.ones(len(paths), dtype=bool)
+    for _ in range(10):
+        dones = vec.step()
+        for idx in np.flatnonzero(running):
+            serial[idx].step()
+            assert dones[idx] == serial[idx].state.is_done
+        running &= ~dones
+        for idx in np.flatnonzero(running):
+            state, other = serial[idx].state, vec.gyms[idx].state
+            assert other.t == state.t
+            assert (other.active_mask == state.active_mask).all()
+            active = state.active_mask
+            assert np.allclose(other.pose_array[active], state.pose_array[active])
+            assert np.allclose(
+                other.velocity_array[active], state.velocity_array[active]
+            )
+            assert refs(other.collisions()) == refs(state.collisions())
+            for agent, other_agent in zip(
+                state.agents.values(), other.agents.values()
+            ):
+                assert np.allclose(
+                    other_agent.last_action.pose, agent.last_action.pose
+                )
+
+
+def test_vector_profile(all_scenarios):
+    """Test that the batched gyms and the shared work are profiled."""
+    paths = [
+        all_scenarios["a5e43fe4-646a-49ba-82ce-5f0063776566"],
+        all_scenarios["3fee6507-fd24-432f-b781-ca5676c834ef"],
+    ]
+    vec = VectorScenarioGym(
+        2,
+        paths,
+        timestep=0.1,
+        terminal_conditions=["max_length", "collision"],
+        metrics=[EgoMaxSpeed()],
+        profile=True,
+    )
+    vec.reset()
+    profiler = Profiler()
+    with profiler.activate():
+        vec.step()
+    for gym in vec.gyms:
+        summary = gym.profiler.summary()
+        assert {"non_agents", "state", "metric"} <= set(summary)
+        assert {"poses", "actions", "terminal"} <= set(summary["state"])
+    assert {"replay", "controller"} <= set(profiler.summary())
+    collisions = [
+        gym.profiler.summary()["state"].get("collisions", {}).get("calls", 0)
+        for gym in vec.gyms
+    ]
+    assert sum(collisions) == 1, "Collisions should be detected once."
+
+
+def test_vector_repack(all_scenarios):
+    """Test that loading a scenario only repacks the gym that loaded it."""
+    paths = [
+        all_scenarios["a5e43fe4-646a-49ba-82ce-5f0063776566"],
+        all_scenarios["3fee6507-fd24-432f-b781-ca5676c834ef"],
+    ]
+    vec = VectorScenarioGym(2, paths, timestep=0.1)
+    vec.reset()
+    vec.step()
+    pieces = list(vec._pieces)
+    assert all(piece is not None for piece in pieces)
+
+    vec._load_next(1)
+    assert vec._pieces[0] is pieces[0] and vec._pieces[1] is None
+    vec.step()
+    assert vec._pieces[0] is pieces[0] and vec._pieces[1] is not None
+    assert len(vec._replay) == sum(
+        len(gym.state.non_agents.batch) for gym in vec.gyms
+    )